@@ -5,6 +5,7 @@ Tout le code source d'IDPS est contenu dans ce dossier
 from middleware.idps.module import IDPSModule
 from middleware.idps.handler import main as idps_main
 from middleware.idps.orchestrator import IDPSOrchestrator
+from middleware.idps.async_orchestrator import IDPSAsyncOrchestrator
 from middleware.idps.scheduler import main as idps_scheduler_main
 
-__all__ = ['IDPSModule', 'idps_main', 'IDPSOrchestrator', 'idps_scheduler_main']
+__all__ = ['IDPSModule', 'idps_main', 'IDPSOrchestrator', 'IDPSAsyncOrchestrator', 'idps_scheduler_main']
@@ -0,0 +1,338 @@
+"""
+Orchestrateur asyncio pour le micro-middleware IDPS
+
+Chaque fichier suit le pipeline de `IDPSOrchestrator`, mais les étapes ne
+bloquent plus l'exécution des autres fichiers :
+- la préparation (lecture, validation, transformation), liée au CPU, s'exécute
+  dans un pool de processus (`PROCESSING_WORKERS`) ou, à défaut, dans un thread ;
+- les chargements, logs d'audit et métriques passent par l'engine asynchrone
+  (psycopg async), au plus `DB_MAX_LOAD_CONNECTIONS` chargements simultanés ;
+- l'archivage et le registre des fichiers traités sont délégués à des threads.
+
+Jusqu'à N fichiers sont ainsi préparés pendant que M chargements sont en cours
+en base. `run()` reste l'API synchrone : il exécute `run_async()` dans sa
+propre boucle asyncio.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+
+from middleware.idps.orchestrator import IDPSOrchestrator, _init_preparation_worker, _prepare_file_in_worker
+from middleware.idps.config.files_config import IDPSFilesConfig
+from middleware.idps.config.database_config import IDPSDatabaseConfig
+from middleware.idps.config.sqlalchemy_config import dispose_async_engines
+from middleware.idps.repository.async_database_repository import IDPSAsyncDatabaseRepository
+from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.models.ingestion_result import IngestionResult
+from middleware.idps.models.preparation_result import PreparationResult
+from middleware.idps.models.ingestion_metrics import IngestionMetrics
+from middleware.exceptions import ArchiveError
+
+logger = logging.getLogger(__name__)
+
+
+class IDPSAsyncOrchestrator(IDPSOrchestrator):
+    """
+    Variante asyncio de l'orchestrateur IDPS
+    Recouvre la préparation des fichiers (CPU) et leurs chargements en base (E/S)
+    """
+
+    def __init__(
+        self,
+        files_config: Optional[IDPSFilesConfig] = None,
+        db_config: Optional[IDPSDatabaseConfig] = None
+    ):
+        """
+        Initialise l'orchestrateur IDPS asynchrone
+
+        Args:
+            files_config: Configuration des fichiers (charge depuis env si None)
+            db_config: Configuration de la base de données (charge depuis env si None)
+        """
+        super().__init__(files_config, db_config)
+        self._async_repository = None
+
+    @property
+    def async_repository(self) -> IDPSAsyncDatabaseRepository:
+        """Repository asynchrone (créé au premier accès, adossé au repository synchrone)"""
+        if self._async_repository is None:
+            self._async_repository = IDPSAsyncDatabaseRepository(self.idps_repository)
+        return self._async_repository
+
+    def run(self) -> List[IngestionResult]:
+        """
+        Exécute le processus complet d'ingestion IDPS (API synchrone)
+
+        Returns:
+            Liste des résultats d'ingestion
+        """
+        return asyncio.run(self._run_and_dispose())
+
+    async def _run_and_dispose(self) -> List[IngestionResult]:
+        """Exécute `run_async` puis libère les connexions asynchrones, liées à cette boucle"""
+        try:
+            return await self.run_async()
+        finally:
+            await dispose_async_engines()
+
+    async def run_async(self) -> List[IngestionResult]:
+        """
+        Exécute le processus complet d'ingestion IDPS dans la boucle asyncio courante
+
+        Returns:
+            Liste des résultats d'ingestion, dans l'ordre des fichiers détectés
+        """
+        logger.info("Démarrage du processus d'ingestion IDPS (asynchrone)")
+
+        detected_files = await asyncio.to_thread(self.file_detection_service.detect_files)
+        if not detected_files:
+            logger.info("Aucun nouveau fichier IDPS détecté")
+            return []
+
+        logger.info(f"{len(detected_files)} fichier(s) IDPS détecté(s)")
+        results = await self.process_files_async(detected_files)
+        self._report_run(results)
+        return results
+
+    async def process_files_async(self, detected_files: List[IDPSFileInfo]) -> List[IngestionResult]:
+        """
+        Traite des fichiers en recouvrant préparations et chargements
+
+        Un fichier est chargé dès que sa préparation est terminée, pendant que les
+        suivants sont encore préparés. En mode flux (`CSV_STREAMING`), voir
+        `_process_streaming_files`.
+
+        Args:
+            detected_files: Fichiers à traiter
+
+        Returns:
+            Liste des résultats d'ingestion, dans l'ordre des fichiers
+        """
+        # Initialiser le repository (et le schéma) hors de la boucle, avant les premiers chargements
+        await asyncio.to_thread(lambda: self.async_repository)
+
+        if self.files_config.streaming_enabled:
+            return await self._process_streaming_files(detected_files)
+
+        load_slots = asyncio.Semaphore(max(1, self.db_config.max_load_connections))
+        workers = min(max(1, self.files_config.processing_workers), len(detected_files))
+        logger.info(
+            f"Traitement asynchrone: {workers} préparation(s) simultanée(s), "
+            f"{self.db_config.max_load_connections} chargement(s) simultané(s)"
+        )
+        with self._preparation_executor(workers) as executor:
+            prepare = _prepare_file_in_worker if isinstance(executor, ProcessPoolExecutor) else self.prepare_file
+            loop = asyncio.get_running_loop()
+
+            async def ingest(file_info: IDPSFileInfo) -> IngestionResult:
+                try:
+                    prepared = await loop.run_in_executor(executor, prepare, file_info)
+                except Exception as e:
+                    # Échec du worker lui-même (ex: processus interrompu)
+                    prepared = PreparationResult(
+                        file_info, time.time(), error_message=self._describe_exception(file_info, e)
+                    )
+                async with load_slots:
+                    return await self.load_prepared_file_async(prepared)
+
+            return list(await asyncio.gather(*(ingest(file_info) for file_info in detected_files)))
+
+    async def _process_streaming_files(self, detected_files: List[IDPSFileInfo]) -> List[IngestionResult]:
+        """
+        Traite des fichiers en flux, au plus `DB_MAX_LOAD_CONNECTIONS` à la fois
+
+        Chaque fichier suit le pipeline synchrone par blocs, dans un thread. Les
+        transformateurs et parseurs d'horodatage gardent un état propre au fichier en
+        cours : chaque thread emprunte donc un orchestrateur qui lui est réservé.
+
+        Args:
+            detected_files: Fichiers à traiter
+
+        Returns:
+            Liste des résultats d'ingestion, dans l'ordre des fichiers
+        """
+        slots = min(max(1, self.db_config.max_load_connections), len(detected_files))
+        orchestrators: asyncio.Queue = asyncio.Queue()
+        orchestrators.put_nowait(self)
+        for _ in range(slots - 1):
+            orchestrators.put_nowait(self._streaming_orchestrator())
+
+        async def process_streaming(file_info: IDPSFileInfo) -> IngestionResult:
+            orchestrator = await orchestrators.get()
+            try:
+                return await asyncio.to_thread(orchestrator.process_file, file_info)
+            finally:
+                orchestrators.put_nowait(orchestrator)
+
+        return list(await asyncio.gather(*(process_streaming(file_info) for file_info in detected_files)))
+
+    def _streaming_orchestrator(self) -> IDPSOrchestrator:
+        """
+        Orchestrateur d'un thread de traitement en flux
+
+        Validation, transformation et parseurs lui sont propres ; le repository, la
+        détection (registre des fichiers traités), l'archivage et la mise en
+        quarantaine sont ceux de cet orchestrateur.
+        """
+        orchestrator = IDPSOrchestrator(self.files_config, self.db_config)
+        orchestrator.idps_repository = self.idps_repository
+        orchestrator.file_detection_service = self.file_detection_service
+        orchestrator.file_archive_service = self.file_archive_service
+        orchestrator.reject_file_service = self.reject_file_service
+        return orchestrator
+
+    def _preparation_executor(self, workers: int) -> Executor:
+        """
+        Pool d'exécution des préparations
+
+        Processus 'spawn' (comme `_run_parallel`) si plusieurs préparations
+        simultanées sont demandées ; sinon un thread, qui libère seulement la
+        boucle asyncio pendant la préparation.
+        """
+        if workers > 1:
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_preparation_worker,
+                initargs=(self.files_config, self.db_config)
+            )
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix='idps-prepare')
+
+    async def load_prepared_file_async(self, prepared: PreparationResult) -> IngestionResult:
+        """
+        Charge un fichier préparé en base puis finalise son traitement (voir `load_prepared_file`)
+
+        Args:
+            prepared: Résultat de `prepare_file`
+
+        Returns:
+            IngestionResult contenant le résultat du traitement
+        """
+        file_info = prepared.file_info
+        metrics = prepared.metrics or IngestionMetrics(file_size_bytes=file_info.size)
+
+        if prepared.is_error:
+            if prepared.rejected_rows:
+                # Motifs des rejets conservés pour le diagnostic ; un échec d'écriture est déjà journalisé
+                try:
+                    await asyncio.to_thread(self.reject_file_service.write_rejects, file_info, prepared.rejected_rows)
+                except ArchiveError:
+                    pass
+            return await self._handle_error_async(
+                file_info, prepared.error_message, prepared.rows_processed, metrics, prepared.start_time
+            )
+
+        try:
+            # Mise en quarantaine des lignes rejetées (avant chargement : aucune ligne n'est perdue)
+            if prepared.rejected_rows:
+                with metrics.measure('archive'):
+                    await asyncio.to_thread(self.reject_file_service.write_rejects, file_info, prepared.rejected_rows)
+
+            with metrics.measure('load'):
+                rows_inserted = await self.async_repository.insert_events(
+                    prepared.data, file_info.category, self.async_repository.use_staging(file_info.size)
+                )
+
+            if not prepared.data:
+                logger.warning(f"Aucune ligne insérée pour {file_info.path.name}")
+                return await self._handle_error_async(
+                    file_info, "Aucune ligne insérée", prepared.rows_transformed, metrics, prepared.start_time
+                )
+
+            return await self._handle_success_async(
+                file_info, prepared.rows_processed, rows_inserted,
+                prepared.start_time, prepared.unparseable_timestamps, metrics,
+                rows_rejected=len(prepared.rejected_rows),
+                rows_duplicate=len(prepared.data) - rows_inserted
+            )
+
+        except Exception as e:
+            return await self._handle_error_async(
+                file_info, self._describe_exception(file_info, e), 0, metrics, prepared.start_time
+            )
+
+    async def _handle_success_async(
+        self,
+        file_info: IDPSFileInfo,
+        rows_processed: int,
+        rows_inserted: int,
+        start_time: float,
+        unparseable_timestamps: int,
+        metrics: IngestionMetrics,
+        rows_rejected: int = 0,
+        rows_duplicate: int = 0
+    ) -> IngestionResult:
+        """Finalise un traitement réussi (voir `_handle_success`) : archivage en thread, audit asynchrone"""
+        status = await asyncio.to_thread(
+            self._archive_success, file_info, metrics, unparseable_timestamps, rows_rejected, rows_duplicate
+        )
+
+        with metrics.measure('audit'):
+            await self.async_repository.insert_audit_log(
+                file_info=file_info,
+                status=status,
+                rows_processed=rows_processed,
+                error_message=self._audit_note(rows_rejected, rows_duplicate),
+                records_inserted=rows_inserted,
+            )
+
+        processing_time = time.time() - start_time
+        await self._record_metrics_async(file_info, status, metrics, rows_processed, processing_time)
+        return self._success_result(
+            file_info, status, rows_processed, rows_inserted, processing_time, metrics, rows_rejected, rows_duplicate
+        )
+
+    async def _handle_error_async(
+        self,
+        file_info: IDPSFileInfo,
+        error_message: str,
+        rows_processed: int,
+        metrics: IngestionMetrics,
+        start_time: Optional[float] = None
+    ) -> IngestionResult:
+        """Gère les erreurs de traitement (voir `_handle_error`)"""
+        try:
+            await asyncio.to_thread(self._archive_error, file_info, metrics)
+
+            with metrics.measure('audit'):
+                await self.async_repository.insert_audit_log(
+                    file_info=file_info,
+                    status='error',
+                    rows_processed=rows_processed,
+                    error_message=error_message,
+                    records_inserted=0
+                )
+        except Exception as e:
+            logger.error(f"Erreur lors de la gestion d'erreur: {e}")
+
+        processing_time = time.time() - start_time if start_time is not None else None
+        await self._record_metrics_async(file_info, 'error', metrics, rows_processed, processing_time or 0.0)
+
+        return IngestionResult(
+            file_info=file_info,
+            status='error',
+            rows_processed=rows_processed,
+            rows_inserted=0,
+            error_message=error_message,
+            processing_time=processing_time,
+            metrics=metrics
+        )
+
+    async def _record_metrics_async(
+        self,
+        file_info: IDPSFileInfo,
+        status: str,
+        metrics: IngestionMetrics,
+        rows_processed: int,
+        processing_time: float
+    ) -> None:
+        """Complète et enregistre les métriques du traitement (voir `_record_metrics`)"""
+        self._complete_metrics(metrics, rows_processed, processing_time)
+
+        try:
+            await self.async_repository.insert_ingestion_metrics(file_info, status, metrics)
+        except Exception as e:
+            logger.warning(f"Impossible d'enregistrer les métriques d'ingestion de {file_info.name}: {e}")
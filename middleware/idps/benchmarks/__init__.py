@@ -0,0 +1,3 @@
+"""
+Benchmarks du micro-middleware IDPS
+"""
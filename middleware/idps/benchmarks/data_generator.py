@@ -0,0 +1,170 @@
+"""
+Générateur de fichiers IDPS synthétiques
+
+Produit des fichiers `SYNTHETIC-IDPS-TG-EID-{TYPE}-{YYYY-MM-DD}.csv` réalistes pour
+les cinq types de fichiers, avec les particularités gérées par `_read_and_validate_csv` :
+ligne de préambule, BOM devant l'en-tête, lignes de séparation `----;----`,
+cellules indentées par des tabulations, `infos_comment` au format JSON et
+ligne de compteur finale. Les lignes sont écrites au fil de l'eau : la mémoire
+utilisée ne dépend pas du nombre de lignes (jusqu'à plusieurs millions).
+
+Le préfixe `SYNTHETIC-` distingue les fichiers générés des fichiers réels, qui
+commencent toujours par `IDPS-` ; il n'est omis qu'avec `--ingestible`, pour
+alimenter le pipeline (qui ne détecte que les noms réels).
+
+Usage:
+    python -m middleware.idps.benchmarks.data_generator <répertoire> [nb_lignes] [--seed N] [--ingestible]
+"""
+import argparse
+import json
+import random
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from middleware.idps.file_pattern import IDPSFilePatternMatcher
+from middleware.utils.logger import setup_logger
+
+logger = setup_logger('benchmark_data_generator')
+
+# Types de fichiers IDPS, dans un ordre stable (reproductibilité)
+FILE_TYPES = tuple(sorted(IDPSFilePatternMatcher.WORKFLOW_TYPES)) + tuple(sorted(IDPSFilePatternMatcher.ERROR_TYPES))
+
+WORKFLOW_COLUMNS = ['Timestamp', 'Service', 'Type de document', 'Code de destination', 'Request ID']
+ERROR_COLUMNS = WORKFLOW_COLUMNS + ['infos_comment']
+
+DOCUMENT_TYPES = ('CNI', 'PASS', 'TS', 'CDS')
+SERVICES = ('Enrôlement', 'PERSO', 'Contrôle qualité', 'Supervision')
+ERROR_MESSAGES = (
+    "Photo non conforme",
+    "Empreinte illisible",
+    "Échec de personnalisation de la puce",
+    "Délai de supervision dépassé",
+    "Données biographiques incomplètes",
+)
+
+# Proportion de cellules indentées par une tabulation et fréquence des lignes de séparation
+TAB_INDENT_RATIO = 0.05
+SEPARATOR_EVERY = 5000
+
+# Préfixe des fichiers générés (jamais porté par un fichier réel)
+SYNTHETIC_FILE_PREFIX = 'SYNTHETIC-'
+
+
+class SyntheticFilePatternMatcher(IDPSFilePatternMatcher):
+    """Matcher des fichiers IDPS synthétiques (nom réel précédé de `SYNTHETIC_FILE_PREFIX`)"""
+
+    PATTERN = re.compile(re.escape(SYNTHETIC_FILE_PREFIX) + IDPSFilePatternMatcher.PATTERN.pattern)
+
+
+class IDPSSyntheticFileGenerator:
+    """Générateur déterministe (graine fixe) de fichiers CSV IDPS"""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        separator: str = ';',
+        file_date: Optional[datetime] = None,
+        prefix: str = SYNTHETIC_FILE_PREFIX
+    ):
+        """
+        Initialise le générateur
+
+        Args:
+            seed: Graine du générateur aléatoire (mêmes fichiers pour une même graine)
+            separator: Séparateur CSV
+            file_date: Date des fichiers générés (2025-11-11 par défaut)
+            prefix: Préfixe des noms de fichiers ('' : noms réels, détectés par le pipeline)
+        """
+        self.seed = seed
+        self.separator = separator
+        self.file_date = file_date or datetime(2025, 11, 11)
+        self.prefix = prefix
+
+    def file_name(self, file_type: str, file_date: datetime) -> str:
+        """Retourne le nom de fichier IDPS (préfixé) pour un type et une date"""
+        return f"{self.prefix}IDPS-TG-EID-{file_type}-{file_date.strftime('%Y-%m-%d')}.csv"
+
+    def generate_file(self, output_dir: Path, file_type: str, rows: int) -> Path:
+        """
+        Génère un fichier IDPS
+
+        Args:
+            output_dir: Répertoire de destination (créé si nécessaire)
+            file_type: Type de fichier (WO-BACKLOG, WO-FINISH, QC-ERROR, PERSO-ERROR, SUP-ERROR)
+            rows: Nombre de lignes de données
+
+        Returns:
+            Chemin du fichier généré
+        """
+        if file_type not in FILE_TYPES:
+            raise ValueError(f"Type de fichier IDPS inconnu: {file_type}")
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        file_path = output_dir / self.file_name(file_type, self.file_date)
+
+        is_error = file_type in IDPSFilePatternMatcher.ERROR_TYPES
+        columns = ERROR_COLUMNS if is_error else WORKFLOW_COLUMNS
+        separator_line = self.separator.join('-' * len(column) for column in columns) + '\n'
+        # Graine dérivée du type : chaque fichier est reproductible indépendamment des autres
+        rng = random.Random(f"{self.seed}-{file_type}")
+        start = self.file_date
+
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(f"Export IDPS {file_type} du {self.file_date.strftime('%d/%m/%Y')}\n")
+            f.write('\ufeff' + self.separator.join(columns) + '\n')
+            f.write(separator_line)
+
+            for i in range(rows):
+                if i and i % SEPARATOR_EVERY == 0:
+                    f.write(separator_line)
+                f.write(self.separator.join(self._build_row(rng, start, i, rows, is_error)) + '\n')
+
+            # Ligne de compteur finale
+            f.write(f"{rows}\n")
+
+        logger.info(f"Fichier synthétique généré: {file_path.name} ({rows} lignes)")
+        return file_path
+
+    def generate_all(self, output_dir: Path, rows: int) -> List[Path]:
+        """Génère un fichier de `rows` lignes pour chacun des cinq types IDPS"""
+        return [self.generate_file(output_dir, file_type, rows) for file_type in FILE_TYPES]
+
+    def _build_row(self, rng: random.Random, start: datetime, index: int, rows: int, is_error: bool) -> List[str]:
+        """Construit les cellules d'une ligne de données"""
+        # Timestamps croissants répartis sur la journée du fichier
+        timestamp = start + timedelta(milliseconds=int(index * 86_400_000 / max(rows, 1)))
+        cells = [
+            timestamp.strftime('%Y-%m-%d %H:%M:%S.') + f"{timestamp.microsecond // 1000:03d}",
+            rng.choice(SERVICES),
+            rng.choice(DOCUMENT_TYPES),
+            f"TG{rng.randrange(100):02d}",
+            f"REQ{rng.randrange(10 ** 10):010d}",
+        ]
+        if is_error:
+            cells.append(json.dumps(
+                {"raw": rng.choice(ERROR_MESSAGES), "code": rng.randrange(100, 999)},
+                ensure_ascii=False
+            ))
+
+        return [f"\t{cell}" if rng.random() < TAB_INDENT_RATIO else cell for cell in cells]
+
+
+def main():
+    """Point d'entrée : génère les cinq types de fichiers dans un répertoire"""
+    parser = argparse.ArgumentParser(description="Génère des fichiers IDPS synthétiques")
+    parser.add_argument('output_dir', type=Path, help="Répertoire de destination")
+    parser.add_argument('rows', type=int, nargs='?', default=1000, help="Nombre de lignes par fichier")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du générateur aléatoire")
+    parser.add_argument('--ingestible', action='store_true',
+                        help=f"Noms de fichiers réels, sans le préfixe {SYNTHETIC_FILE_PREFIX} (détectés par le pipeline)")
+    args = parser.parse_args()
+
+    prefix = '' if args.ingestible else SYNTHETIC_FILE_PREFIX
+    IDPSSyntheticFileGenerator(seed=args.seed, prefix=prefix).generate_all(args.output_dir, args.rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+Benchmark étape par étape du pipeline d'ingestion IDPS
+
+Génère des fichiers synthétiques pour les cinq types IDPS (voir `data_generator`)
+puis mesure séparément chaque étape du pipeline de `IDPSOrchestrator` :
+détection, validation (lecture CSV + schéma IDPS), transformation générique,
+mapping `IDPSTransformer`, transformation fusionnée `IDPSFusedTransformer`
+(utilisée par l'orchestrateur, son résultat est comparé à celui des deux
+étapes précédentes) et, sur demande, chargement via le repository : insertion
+directe dans la table cible, puis chargement via table de staging et fusion
+ensembliste (les événements du fichier sont supprimés avant chaque chargement
+pour que les deux modes insèrent les mêmes lignes).
+
+Les fichiers générés portent le préfixe `SYNTHETIC-`, qu'aucun fichier réel ne
+porte : seuls leurs événements sont supprimés. `--load` écrit dans la base
+configurée par l'environnement ; il est refusé hors `DB_BACKEND=sqlite`, sauf
+avec `--allow-database` (base de test dédiée).
+
+Avec `--memory`, le pic d'allocation Python de chaque étape est mesuré via
+tracemalloc (les durées sont alors pénalisées par le traçage : ne pas comparer
+des durées obtenues avec et sans cette option).
+
+Usage:
+    python -m middleware.idps.benchmarks.pipeline_stages [--sizes 1000 100000] [--memory] [--load [--allow-database]] [--output resultats.json]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete
+
+from middleware.idps.benchmarks.data_generator import (
+    FILE_TYPES,
+    SYNTHETIC_FILE_PREFIX,
+    IDPSSyntheticFileGenerator,
+    SyntheticFilePatternMatcher,
+)
+from middleware.idps.config.database_config import IDPSDatabaseConfig
+from middleware.idps.config.sqlalchemy_config import get_session
+from middleware.idps.models.error_event_model import IDPSErrorEventModel
+from middleware.idps.models.workflow_event_model import IDPSWorkflowEventModel
+from middleware.idps.config.files_config import IDPSFilesConfig
+from middleware.idps.orchestrator import IDPSOrchestrator
+from middleware.utils.logger import setup_logger
+
+logger = setup_logger('benchmark_pipeline_stages')
+
+STAGES = ('detection', 'validation', 'transformation', 'mapping', 'fused_transform', 'load', 'staged_load')
+
+# Étapes mesurées uniquement avec --load
+LOAD_STAGES = ('load', 'staged_load')
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+@dataclass
+class StageMeasurement:
+    """Mesure d'une étape du pipeline pour une taille de fichier donnée"""
+    stage: str
+    rows_per_file: int
+    rows: int
+    seconds: float
+    peak_memory_bytes: Optional[int] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit la mesure en dictionnaire (export JSON)"""
+        return {**asdict(self), 'rows_per_second': round(self.rows_per_second, 1)}
+
+
+class _StageTimer:
+    """Cumule durée et pic mémoire d'une étape sur plusieurs fichiers"""
+
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.seconds = 0.0
+        self.peak_memory_bytes: Optional[int] = 0 if trace_memory else None
+
+    def run(self, func: Callable, *args) -> Any:
+        """Exécute `func(*args)` en mesurant sa durée (et son pic mémoire si activé)"""
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        result = func(*args)
+        self.seconds += time.perf_counter() - start
+
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak_memory_bytes = max(self.peak_memory_bytes, peak - baseline)
+        return result
+
+
+def _map_rows(orchestrator: IDPSOrchestrator, transformed_data: List[Dict[str, Any]], file_info) -> List[Dict[str, Any]]:
+    """Mapping IDPS du chemin en deux étapes (plan de colonnes résolu une fois par fichier)"""
+    return orchestrator.idps_transformer.map_rows_to_module_schema(transformed_data, file_info)
+
+
+def _without_ingestion_time(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Retire l'horodatage d'ingestion (datetime.now()) pour comparer deux transformations"""
+    return [{key: value for key, value in row.items() if key != 'ingested_at'} for row in rows]
+
+
+def _delete_file_events(orchestrator: IDPSOrchestrator, file_info) -> None:
+    """Supprime les événements déjà chargés pour un fichier synthétique (hors mesure)"""
+    if not file_info.name.startswith(SYNTHETIC_FILE_PREFIX):
+        raise RuntimeError(f"Suppression refusée pour un fichier non synthétique: {file_info.name}")
+    model = IDPSErrorEventModel if file_info.category == 'error' else IDPSWorkflowEventModel
+    session = get_session(orchestrator.idps_repository.db_config)
+    try:
+        session.execute(delete(model).where(model.file_name == file_info.name))
+        session.commit()
+    finally:
+        session.close()
+
+
+def benchmark_size(rows_per_file: int, seed: int, trace_memory: bool, load: bool) -> List[StageMeasurement]:
+    """
+    Génère les cinq fichiers IDPS de `rows_per_file` lignes et mesure chaque étape
+
+    Args:
+        rows_per_file: Nombre de lignes de chaque fichier
+        seed: Graine du générateur de données
+        trace_memory: Mesurer le pic mémoire de chaque étape
+        load: Inclure le chargement en base (repository configuré par l'environnement)
+
+    Returns:
+        Liste des mesures, une par étape
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files_config = IDPSFilesConfig.from_env(base_dir=Path(tmp_dir))
+        IDPSSyntheticFileGenerator(seed=seed).generate_all(files_config.input_dir, rows_per_file)
+        orchestrator = IDPSOrchestrator(files_config=files_config)
+        # Seuls les fichiers synthétiques (préfixés) sont détectés
+        orchestrator.file_detection_service.pattern_matcher = SyntheticFilePatternMatcher()
+
+        timers = {stage: _StageTimer(trace_memory) for stage in STAGES}
+        rows_total = 0
+
+        detected_files = timers['detection'].run(orchestrator.file_detection_service.detect_files)
+
+        for file_info in detected_files:
+            validation_result = timers['validation'].run(
+                orchestrator.file_validation_service.validate_file, file_info.path, file_info
+            )
+            if not validation_result.is_valid:
+                raise RuntimeError(f"Fichier synthétique invalide {file_info.name}: {validation_result.error_message}")
+            schema_error = timers['validation'].run(
+                orchestrator.idps_validator.validate_schema, validation_result.data, file_info
+            )
+            if schema_error:
+                raise RuntimeError(f"Schéma invalide pour {file_info.name}: {schema_error}")
+            values_result = timers['validation'].run(
+                orchestrator.idps_validator.reject_missing_values, validation_result.data, file_info
+            )
+            if values_result.rejected_rows:
+                raise RuntimeError(
+                    f"{values_result.rejected_count} valeur(s) obligatoire(s) manquante(s) dans {file_info.name}"
+                )
+
+            transformation_result = timers['transformation'].run(
+                orchestrator.data_transformation_service.transform, validation_result.data, file_info
+            )
+            mapped_data = timers['mapping'].run(
+                _map_rows, orchestrator, transformation_result.transformed_data, file_info
+            )
+            rows_total += len(mapped_data)
+
+            fused_result = timers['fused_transform'].run(
+                orchestrator.fused_transformer.transform, validation_result.data, file_info
+            )
+            if _without_ingestion_time(fused_result.transformed_data) != _without_ingestion_time(mapped_data):
+                raise RuntimeError(
+                    f"La transformation fusionnée diffère de la transformation en deux étapes pour {file_info.name}"
+                )
+
+            if load:
+                for stage, staged in (('load', False), ('staged_load', True)):
+                    _delete_file_events(orchestrator, file_info)
+                    rows_inserted = timers[stage].run(
+                        orchestrator.idps_repository.insert_events,
+                        fused_result.transformed_data, file_info.category, staged
+                    )
+                    if rows_inserted != len(fused_result.transformed_data):
+                        raise RuntimeError(
+                            f"Chargement {stage} incomplet pour {file_info.name}: "
+                            f"{rows_inserted}/{len(fused_result.transformed_data)} lignes"
+                        )
+
+    stages = STAGES if load else tuple(stage for stage in STAGES if stage not in LOAD_STAGES)
+    return [
+        StageMeasurement(
+            stage=stage,
+            rows_per_file=rows_per_file,
+            rows=rows_total,
+            seconds=timers[stage].seconds,
+            peak_memory_bytes=timers[stage].peak_memory_bytes,
+        )
+        for stage in stages
+    ]
+
+
+def _format_measurement(measurement: StageMeasurement) -> str:
+    """Formate une mesure pour le log"""
+    line = (
+        f"  - {measurement.stage:<15}: {measurement.seconds:8.3f}s "
+        f"({measurement.rows_per_second:>12,.0f} lignes/s)"
+    )
+    if measurement.peak_memory_bytes is not None:
+        line += f" pic mémoire {measurement.peak_memory_bytes / (1024 * 1024):8.1f} Mo"
+    return line
+
+
+def run(sizes: Tuple[int, ...], seed: int = 42, trace_memory: bool = False, load: bool = False) -> List[StageMeasurement]:
+    """
+    Exécute le benchmark pour chaque taille de fichier
+
+    Returns:
+        Liste de toutes les mesures
+    """
+    if trace_memory:
+        tracemalloc.start()
+
+    measurements = []
+    try:
+        for rows_per_file in sizes:
+            size_measurements = benchmark_size(rows_per_file, seed, trace_memory, load)
+            logger.info(f"Fichiers de {rows_per_file} lignes ({len(FILE_TYPES)} types IDPS)")
+            for measurement in size_measurements:
+                logger.info(_format_measurement(measurement))
+            measurements.extend(size_measurements)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    return measurements
+
+
+def main():
+    """Point d'entrée du benchmark étape par étape"""
+    parser = argparse.ArgumentParser(description="Benchmark étape par étape du pipeline IDPS")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Nombres de lignes par fichier (de 1 000 à 10 000 000)")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du générateur de données")
+    parser.add_argument('--memory', action='store_true', help="Mesurer le pic mémoire de chaque étape (tracemalloc)")
+    parser.add_argument('--load', action='store_true', help="Inclure le chargement via le repository IDPS")
+    parser.add_argument('--allow-database', action='store_true',
+                        help="Autoriser --load sur une base PostgreSQL (base de test dédiée uniquement)")
+    parser.add_argument('--output', type=Path, help="Fichier JSON de résultats (comparaison entre versions)")
+    args = parser.parse_args()
+
+    if args.load and not args.allow_database and not IDPSDatabaseConfig.from_env().is_sqlite:
+        parser.error(
+            "--load écrit dans la base configurée par l'environnement : "
+            "utiliser DB_BACKEND=sqlite, ou --allow-database pour une base de test dédiée"
+        )
+
+    try:
+        measurements = run(tuple(args.sizes), args.seed, args.memory, args.load)
+    except RuntimeError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    if args.output:
+        args.output.write_text(
+            json.dumps([measurement.to_dict() for measurement in measurements], indent=2),
+            encoding='utf-8'
+        )
+        logger.info(f"Résultats écrits dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark de la conversion DataFrame -> liste de dictionnaires de FileValidationService
+
+Compare la conversion vectorisée (`_dataframe_to_records`) à la conversion
+ligne à ligne via `df.iterrows()` (`_dataframe_to_records_rowwise`) et vérifie
+que les deux produisent un résultat identique.
+
+Usage:
+    python -m middleware.idps.benchmarks.records_conversion [nb_lignes]
+"""
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from middleware.idps.config.files_config import IDPSFilesConfig
+from middleware.idps.services.file_validation_service import FileValidationService
+from middleware.utils.logger import setup_logger
+
+logger = setup_logger('benchmark_records_conversion')
+
+COLUMNS = ['Timestamp', 'Service', 'Type de document', 'Code de destination', 'Request ID', 'infos_comment']
+
+
+def build_dataframe(rows: int) -> pd.DataFrame:
+    """Construit un DataFrame de chaînes comparable à celui lu depuis un CSV IDPS"""
+    data = {
+        'Timestamp': [f"2025-11-11 10:{(i // 60) % 60:02d}:{i % 60:02d}.000" for i in range(rows)],
+        'Service': ['PERSO'] * rows,
+        'Type de document': ['CNI' if i % 2 else 'PASS' for i in range(rows)],
+        'Code de destination': [f"TG{i % 50:02d}" for i in range(rows)],
+        'Request ID': [f"REQ{i:010d}" for i in range(rows)],
+        # Une valeur sur dix est vide (NaN après lecture pandas)
+        'infos_comment': [None if i % 10 == 0 else f'{{"raw": "commentaire {i}"}}' for i in range(rows)],
+    }
+    return pd.DataFrame(data, columns=COLUMNS, dtype=object)
+
+
+def _time(func, *args) -> tuple:
+    """Exécute une fonction et retourne (résultat, durée en secondes)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(rows: int = 200000):
+    """Exécute le benchmark et affiche l'accélération obtenue"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service = FileValidationService(IDPSFilesConfig.from_env(base_dir=Path(tmp_dir)))
+    df = build_dataframe(rows)
+    # Lignes source : préambule et en-tête en lignes 1 et 2
+    source_lines = [(index + 3, ';'.join(map(str, row))) for index, row in enumerate(df.itertuples(index=False))]
+    
+    rowwise, rowwise_time = _time(service._dataframe_to_records_rowwise, df, source_lines)
+    vectorized, vectorized_time = _time(service._dataframe_to_records, df, source_lines)
+    
+    if repr(rowwise) != repr(vectorized):
+        logger.error("Les conversions ligne à ligne et vectorisée produisent des résultats différents")
+        sys.exit(1)
+    
+    logger.info(f"Conversion de {rows} lignes x {len(COLUMNS)} colonnes (résultats identiques)")
+    logger.info(f"  - iterrows   : {rowwise_time:.3f}s ({rows / rowwise_time:,.0f} lignes/s)")
+    logger.info(f"  - vectorisée : {vectorized_time:.3f}s ({rows / vectorized_time:,.0f} lignes/s)")
+    logger.info(f"  - accélération: x{rowwise_time / vectorized_time:.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -2,13 +2,105 @@
 Configuration de la base de données pour IDPS
 """
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Any
 from dotenv import load_dotenv
 
+from middleware.exceptions import ConfigurationError
+
 load_dotenv()
 
 
+@dataclass(frozen=True)
+class IDPSEngineProfile:
+    """
+    Réglages d'un engine SQLAlchemy dédié à un usage de la base
+
+    'bulk' sert aux chargements (peu de connexions, longues transactions),
+    'interactive' aux lectures, à l'audit et aux métriques (requêtes courtes),
+    'admin' à l'initialisation du schéma et aux migrations (sans limite de durée).
+    Chaque profil a son propre pool : les chargements parallèles n'épuisent
+    pas les connexions des lectures. Ignoré par le backend SQLite.
+    """
+    name: str
+    pool_size: int = 5
+    max_overflow: int = 5
+    # Ping à chaque emprunt d'une connexion (un aller-retour), sinon recyclage par âge seul
+    pool_pre_ping: bool = True
+    pool_recycle: int = 3600
+    # Lignes par instruction INSERT multi-VALUES (`insertmanyvalues`)
+    insertmanyvalues_page_size: int = 1000
+    # Durée maximale d'une instruction (ms, 0 : sans limite)
+    statement_timeout_ms: int = 0
+    # `synchronous_commit` des sessions : 'on', 'off' ou 'local'
+    synchronous_commit: str = 'on'
+
+    SYNCHRONOUS_COMMIT_VALUES = ('on', 'off', 'local')
+
+    def __post_init__(self):
+        """Vérifie la cohérence du profil"""
+        prefix = f"DB_{self.name.upper()}"
+        if self.pool_size < 1 or self.max_overflow < 0:
+            raise ConfigurationError(
+                f"Pool de connexions invalide pour le profil {self.name}: "
+                f"{self.pool_size} connexion(s) (>= 1), {self.max_overflow} en surplus (>= 0)",
+                config_key=f"{prefix}_POOL_SIZE"
+            )
+        if self.synchronous_commit not in self.SYNCHRONOUS_COMMIT_VALUES:
+            raise ConfigurationError(
+                f"Valeur de synchronous_commit inconnue pour le profil {self.name}: {self.synchronous_commit} "
+                f"(valeurs possibles: {', '.join(self.SYNCHRONOUS_COMMIT_VALUES)})",
+                config_key=f"{prefix}_SYNCHRONOUS_COMMIT"
+            )
+
+    @property
+    def connect_options(self) -> str:
+        """Paramètres de session PostgreSQL passés à la connexion (`options`, sans aller-retour)"""
+        # Toujours explicite : 0 lève aussi une limite définie pour le rôle ou la base
+        options = [f"-c statement_timeout={self.statement_timeout_ms}"]
+        if self.synchronous_commit != 'on':
+            options.append(f"-c synchronous_commit={self.synchronous_commit}")
+        return ' '.join(options)
+
+    @classmethod
+    def from_env(cls, name: str, **defaults) -> 'IDPSEngineProfile':
+        """
+        Charge un profil depuis les variables d'environnement `DB_<PROFIL>_*`
+
+        Args:
+            name: Nom du profil ('bulk', 'interactive' ou 'admin')
+            defaults: Valeurs par défaut du profil (à défaut, celles de la classe)
+
+        Returns:
+            Instance de IDPSEngineProfile
+        """
+        profile = cls(name=name, **defaults)
+        prefix = f"DB_{name.upper()}"
+        return cls(
+            name=name,
+            pool_size=int(os.getenv(f"{prefix}_POOL_SIZE", profile.pool_size)),
+            max_overflow=int(os.getenv(f"{prefix}_MAX_OVERFLOW", profile.max_overflow)),
+            pool_pre_ping=os.getenv(
+                f"{prefix}_POOL_PRE_PING", str(profile.pool_pre_ping)
+            ).lower() in ('1', 'true', 'yes'),
+            pool_recycle=int(os.getenv(f"{prefix}_POOL_RECYCLE", profile.pool_recycle)),
+            insertmanyvalues_page_size=int(
+                os.getenv(f"{prefix}_INSERT_PAGE_SIZE", profile.insertmanyvalues_page_size)
+            ),
+            statement_timeout_ms=int(os.getenv(f"{prefix}_STATEMENT_TIMEOUT_MS", profile.statement_timeout_ms)),
+            synchronous_commit=os.getenv(f"{prefix}_SYNCHRONOUS_COMMIT", profile.synchronous_commit).lower()
+        )
+
+
+# Profils par défaut : chargements en gros lots sans ping ni limite de durée, lectures interactives bornées
+BULK_PROFILE_DEFAULTS = dict(
+    pool_size=2, max_overflow=0, pool_pre_ping=False, pool_recycle=600, insertmanyvalues_page_size=5000
+)
+INTERACTIVE_PROFILE_DEFAULTS = dict(pool_size=5, max_overflow=5, statement_timeout_ms=30000)
+# Schéma et migrations : une connexion, sans limite de durée (création d'index, conversion de tables)
+ADMIN_PROFILE_DEFAULTS = dict(pool_size=1, max_overflow=0, statement_timeout_ms=0)
+
+
 @dataclass
 class IDPSDatabaseConfig:
     """Configuration de la base de données IDPS"""
@@ -18,6 +110,93 @@ class IDPSDatabaseConfig:
     user: str
     password: str
     
+    # Stratégie de chargement des événements: 'orm' (INSERT ... ON CONFLICT DO NOTHING) ou 'copy' (COPY FROM STDIN)
+    load_strategy: str = 'orm'
+    
+    # Taille de fichier (octets) à partir de laquelle le chargement passe par une table de staging
+    staging_threshold_bytes: int = 8 * 1024 * 1024
+    
+    # Nombre maximal de chargements simultanés (une connexion chacun) en traitement parallèle
+    max_load_connections: int = 2
+    
+    # Backend de stockage: 'postgresql' (production) ou 'sqlite' (poste de dev, benchmarks)
+    backend: str = 'postgresql'
+    
+    # Fichier de la base SQLite (':memory:' pour une base en mémoire)
+    sqlite_path: str = ':memory:'
+    
+    # Partitionnement des tables d'événements par date d'événement: 'none', 'month' ou 'day' (PostgreSQL)
+    partition_interval: str = 'none'
+    
+    # Nombre de partitions futures créées à l'avance à l'initialisation
+    partition_premake: int = 2
+    
+    # Engine des chargements d'événements
+    bulk_profile: IDPSEngineProfile = field(
+        default_factory=lambda: IDPSEngineProfile('bulk', **BULK_PROFILE_DEFAULTS)
+    )
+    
+    # Engine des lectures, de l'audit et des métriques
+    interactive_profile: IDPSEngineProfile = field(
+        default_factory=lambda: IDPSEngineProfile('interactive', **INTERACTIVE_PROFILE_DEFAULTS)
+    )
+    
+    # Engine de l'initialisation du schéma et des migrations
+    admin_profile: IDPSEngineProfile = field(
+        default_factory=lambda: IDPSEngineProfile('admin', **ADMIN_PROFILE_DEFAULTS)
+    )
+    
+    LOAD_STRATEGIES = ('orm', 'copy')
+    PARTITION_INTERVALS = ('none', 'month', 'day')
+    ENGINE_PROFILES = ('bulk', 'interactive', 'admin')
+    BACKENDS = ('postgresql', 'sqlite')
+    
+    def __post_init__(self):
+        """Vérifie la cohérence de la configuration"""
+        if self.backend not in self.BACKENDS:
+            raise ConfigurationError(
+                f"Backend de stockage inconnu: {self.backend} "
+                f"(valeurs possibles: {', '.join(self.BACKENDS)})",
+                config_key='DB_BACKEND'
+            )
+        if self.load_strategy not in self.LOAD_STRATEGIES:
+            raise ConfigurationError(
+                f"Stratégie de chargement inconnue: {self.load_strategy} "
+                f"(valeurs possibles: {', '.join(self.LOAD_STRATEGIES)})",
+                config_key='DB_LOAD_STRATEGY'
+            )
+        if self.partition_interval not in self.PARTITION_INTERVALS:
+            raise ConfigurationError(
+                f"Intervalle de partitionnement inconnu: {self.partition_interval} "
+                f"(valeurs possibles: {', '.join(self.PARTITION_INTERVALS)})",
+                config_key='DB_PARTITION_INTERVAL'
+            )
+        if self.staging_threshold_bytes < 0:
+            raise ConfigurationError(
+                f"Seuil de chargement via staging invalide: {self.staging_threshold_bytes} (octets, >= 0)",
+                config_key='DB_STAGING_THRESHOLD_BYTES'
+            )
+        bulk_connections = self.bulk_profile.pool_size + self.bulk_profile.max_overflow
+        if not self.is_sqlite and bulk_connections < self.max_load_connections:
+            raise ConfigurationError(
+                f"Pool de chargement trop petit: {bulk_connections} connexion(s) "
+                f"pour {self.max_load_connections} chargement(s) simultané(s)",
+                config_key='DB_BULK_POOL_SIZE'
+            )
+    
+    def engine_profile(self, name: str) -> IDPSEngineProfile:
+        """
+        Retourne le profil d'engine demandé
+        
+        Raises:
+            ConfigurationError: Si le profil est inconnu
+        """
+        if name not in self.ENGINE_PROFILES:
+            raise ConfigurationError(
+                f"Profil d'engine inconnu: {name} (valeurs possibles: {', '.join(self.ENGINE_PROFILES)})"
+            )
+        return getattr(self, f"{name}_profile")
+    
     def to_connection_dict(self) -> Dict[str, Any]:
         """Convertit en dictionnaire pour psycopg2 (compatibilité)"""
         return {
@@ -28,8 +207,23 @@ class IDPSDatabaseConfig:
             'password': self.password
         }
     
+    @property
+    def is_sqlite(self) -> bool:
+        """Indique si le backend est SQLite"""
+        return self.backend == 'sqlite'
+    
+    @property
+    def is_partitioned(self) -> bool:
+        """Indique si les tables d'événements sont partitionnées (PostgreSQL uniquement)"""
+        return self.partition_interval != 'none' and not self.is_sqlite
+    
     def to_sqlalchemy_url(self) -> str:
-        """Génère l'URL de connexion SQLAlchemy (driver psycopg v3)"""
+        """Génère l'URL de connexion SQLAlchemy (driver psycopg v3, ou SQLite)"""
+        if self.is_sqlite:
+            if self.sqlite_path == ':memory:':
+                return "sqlite://"
+            return f"sqlite:///{self.sqlite_path}"
+        
         # Utilise le dialecte postgresql+psycopg pour le driver psycopg v3
         return (
             f"postgresql+psycopg://{self.user}:{self.password}@"
@@ -44,11 +238,25 @@ class IDPSDatabaseConfig:
         Returns:
             Instance de IDPSDatabaseConfig
         """
+        max_load_connections = int(os.getenv('DB_MAX_LOAD_CONNECTIONS', 2))
         return cls(
             host=os.getenv('DB_HOST', 'localhost'),
             port=int(os.getenv('DB_PORT', 5432)),
             database=os.getenv('DB_NAME', 'biometrics_db'),
             user=os.getenv('DB_USER', 'postgres'),
-            password=os.getenv('DB_PASSWORD', 'postgres')
+            password=os.getenv('DB_PASSWORD', 'postgres'),
+            load_strategy=os.getenv('DB_LOAD_STRATEGY', 'orm').lower(),
+            staging_threshold_bytes=int(os.getenv('DB_STAGING_THRESHOLD_BYTES', 8 * 1024 * 1024)),
+            max_load_connections=max_load_connections,
+            backend=os.getenv('DB_BACKEND', 'postgresql').lower(),
+            sqlite_path=os.getenv('DB_SQLITE_PATH', ':memory:'),
+            partition_interval=os.getenv('DB_PARTITION_INTERVAL', 'none').lower(),
+            partition_premake=int(os.getenv('DB_PARTITION_PREMAKE', 2)),
+            # Pool de chargement dimensionné par défaut sur le nombre de chargements simultanés
+            bulk_profile=IDPSEngineProfile.from_env(
+                'bulk', **{**BULK_PROFILE_DEFAULTS, 'pool_size': max(1, max_load_connections)}
+            ),
+            interactive_profile=IDPSEngineProfile.from_env('interactive', **INTERACTIVE_PROFILE_DEFAULTS),
+            admin_profile=IDPSEngineProfile.from_env('admin', **ADMIN_PROFILE_DEFAULTS)
         )
 
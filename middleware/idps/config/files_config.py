@@ -4,6 +4,7 @@ Configuration des fichiers pour IDPS
 import os
 from pathlib import Path
 from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,11 +23,38 @@ class IDPSFilesConfig:
     csv_separator: str
     date_format: str
     
+    # Nombre de lignes par bloc lors de la lecture en flux des CSV
+    csv_chunk_size: int = 50000
+    
+    # Traitement en flux de bout en bout (validation -> transformation -> chargement par blocs)
+    streaming_enabled: bool = False
+    
+    # Nombre de processus préparant des fichiers en parallèle (1 = séquentiel)
+    processing_workers: int = 1
+    
+    # Orchestrateur asyncio : préparations dans un pool d'exécution, chargements et audit asynchrones
+    async_ingestion: bool = False
+    
+    # Registre persistant des fichiers traités (None = registre en mémoire uniquement)
+    processed_index_path: Optional[Path] = None
+    
+    # Mode surveillance : intervalle de vérification et durée de stabilité avant traitement (secondes)
+    watch_poll_interval: float = 5.0
+    watch_stability_seconds: float = 10.0
+    
+    # Fichier d'export des métriques au format texte Prometheus (None = pas d'export)
+    metrics_textfile_path: Optional[Path] = None
+    
+    # Répertoire des fichiers de rejet (lignes écartées d'un fichier chargé partiellement)
+    reject_dir: Optional[Path] = None
+    
     def __post_init__(self):
         """Crée les répertoires s'ils n'existent pas"""
+        if self.reject_dir is None:
+            self.reject_dir = self.error_dir / 'rejects'
         for directory in [
             self.input_dir, self.archive_dir,
-            self.error_dir, self.logs_dir
+            self.error_dir, self.logs_dir, self.reject_dir
         ]:
             directory.mkdir(parents=True, exist_ok=True)
     
@@ -44,13 +72,26 @@ class IDPSFilesConfig:
         if base_dir is None:
             base_dir = Path.cwd()
         
+        archive_dir = Path(os.getenv('ARCHIVE_DIR', base_dir / 'archive'))
+        
         return cls(
             input_dir=Path(os.getenv('INPUT_DIR', base_dir / 'input')),
-            archive_dir=Path(os.getenv('ARCHIVE_DIR', base_dir / 'archive')),
+            archive_dir=archive_dir,
             error_dir=Path(os.getenv('ERROR_DIR', base_dir / 'error')),
             logs_dir=Path(os.getenv('LOGS_DIR', base_dir / 'logs')),
             csv_encoding=os.getenv('CSV_ENCODING', 'utf-8'),
             csv_separator=os.getenv('CSV_SEPARATOR', ';'),
-            date_format=os.getenv('DATE_FORMAT', '%Y-%m-%d')
+            date_format=os.getenv('DATE_FORMAT', '%Y-%m-%d'),
+            csv_chunk_size=int(os.getenv('CSV_CHUNK_SIZE', 50000)),
+            streaming_enabled=os.getenv('CSV_STREAMING', 'false').lower() in ('1', 'true', 'yes'),
+            processing_workers=int(os.getenv('PROCESSING_WORKERS', 1)),
+            async_ingestion=os.getenv('ASYNC_INGESTION', 'false').lower() in ('1', 'true', 'yes'),
+            processed_index_path=Path(
+                os.getenv('PROCESSED_INDEX_PATH', archive_dir / '.idps_processed_files.db')
+            ),
+            watch_poll_interval=float(os.getenv('WATCH_POLL_INTERVAL', 5)),
+            watch_stability_seconds=float(os.getenv('WATCH_STABILITY_SECONDS', 10)),
+            metrics_textfile_path=Path(os.getenv('METRICS_TEXTFILE_PATH')) if os.getenv('METRICS_TEXTFILE_PATH') else None,
+            reject_dir=Path(os.getenv('REJECT_DIR')) if os.getenv('REJECT_DIR') else None
         )
 
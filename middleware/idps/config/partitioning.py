@@ -0,0 +1,446 @@
+"""
+Partitionnement par plage de dates des tables d'événements IDPS (PostgreSQL)
+
+Les tables `idps.workflow_events` et `idps.error_events` peuvent être
+partitionnées par `RANGE (event_timestamp)`, une partition par mois ou par jour
+(`DB_PARTITION_INTERVAL`). Les requêtes filtrant sur `event_timestamp` ne lisent
+que les partitions concernées, et la rétention détache ou supprime une partition
+entière (opération de catalogue, indépendante du volume) au lieu d'un DELETE.
+
+Les partitions sont nommées `<table>_pYYYYMM` (mois) ou `<table>_pYYYYMMDD` (jour) ;
+une partition `<table>_default` recueille les lignes hors de toute partition.
+
+La conversion d'une table existante non partitionnée est une migration explicite
+(`convert_table`, puis `drop_unpartitioned` une fois la copie vérifiée), jamais
+un effet de bord de l'initialisation.
+"""
+import logging
+import weakref
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from middleware.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+# Formats de date des suffixes de partition, par intervalle
+_NAME_FORMATS = {'month': '%Y%m', 'day': '%Y%m%d'}
+_SUFFIX_INTERVALS = {6: 'month', 8: 'day'}
+
+
+def partition_bounds(value: date, interval: str) -> Tuple[date, date]:
+    """
+    Bornes [début, fin) de la partition contenant une date
+
+    Args:
+        value: Date (ou datetime) à situer
+        interval: 'month' ou 'day'
+    """
+    if isinstance(value, datetime):
+        value = value.date()
+    if interval == 'day':
+        return value, value + timedelta(days=1)
+    start = value.replace(day=1)
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+
+def partition_name(table_name: str, start: date, interval: str) -> str:
+    """Nom de la partition commençant à `start`"""
+    return f"{table_name}_p{start.strftime(_NAME_FORMATS[interval])}"
+
+
+def _parse_partition_name(table_name: str, name: str) -> Optional[Tuple[date, date]]:
+    """Bornes d'une partition d'après son nom (None pour la partition par défaut ou un nom inconnu)"""
+    prefix = f"{table_name}_p"
+    if not name.startswith(prefix):
+        return None
+    suffix = name[len(prefix):]
+    interval = _SUFFIX_INTERVALS.get(len(suffix))
+    if interval is None:
+        return None
+    try:
+        return partition_bounds(datetime.strptime(suffix, _NAME_FORMATS[interval]).date(), interval)
+    except ValueError:
+        return None
+
+
+def partitioned_table(model) -> Table:
+    """
+    Définition partitionnée de la table d'un modèle d'événement
+
+    PostgreSQL impose que la clé primaire et les index uniques d'une table
+    partitionnée contiennent la clé de partition : la clé primaire devient
+    (id, event_timestamp). Le mapping ORM reste inchangé (id reste unique,
+    alimenté par la même séquence).
+    """
+    table = model.__table__
+    partition_column = model.PARTITION_COLUMN
+    partitioned = Table(
+        table.name,
+        MetaData(),
+        *(
+            Column(
+                column.name,
+                column.type,
+                primary_key=column.primary_key or column.name == partition_column,
+                autoincrement=column.autoincrement,
+                nullable=column.nullable,
+            )
+            for column in table.columns
+        ),
+        schema=table.schema,
+        postgresql_partition_by=f"RANGE ({partition_column})"
+    )
+    for index in table.indexes:
+        Index(index.name, *(partitioned.c[column.name] for column in index.columns), unique=index.unique)
+    return partitioned
+
+
+class IDPSPartitionManager:
+    """
+    Gestion des partitions des tables d'événements IDPS
+
+    Les partitions connues sont mises en cache par table : vérifier qu'un bloc de
+    lignes est couvert ne coûte une requête de catalogue qu'au premier appel. Le
+    cache, partagé par les chargements concurrents, ne retient que des partitions
+    validées : une partition rattachée dans une transaction en cours n'y entre pas.
+    """
+
+    def __init__(self, interval: str, premake: int = 2):
+        """
+        Initialise le gestionnaire
+
+        Args:
+            interval: Granularité des partitions ('month' ou 'day')
+            premake: Nombre de périodes futures créées à l'avance par `ensure_layout`
+        """
+        self.interval = interval
+        self.premake = premake
+        # Nom qualifié de la table -> {nom de partition: (début, fin)}
+        self._partitions: Dict[str, Dict[str, Tuple[date, date]]] = {}
+        # Transactions en cours ayant rattaché des partitions (exclues du cache jusqu'à leur fin)
+        self._attaching = weakref.WeakSet()
+
+    def ensure_layout(self, connection, model) -> None:
+        """
+        Met en place la table partitionnée d'un modèle et ses partitions courantes
+
+        - table absente : création partitionnée (index, partition par défaut) ;
+        - table non partitionnée : erreur, la conversion est une migration explicite ;
+        - table partitionnée : création des partitions manquantes.
+
+        Args:
+            connection: Connexion SQLAlchemy (dans une transaction)
+            model: Modèle d'événement (définit `PARTITION_COLUMN` et `NATURAL_KEY`)
+
+        Raises:
+            DatabaseError: Si la table existe sans être partitionnée
+        """
+        table = model.__table__
+        relkind = self._relkind(connection, table.schema, table.name)
+
+        if relkind is None:
+            self._create_partitioned_table(connection, model)
+            logger.info(f"Table partitionnée {table.schema}.{table.name} créée (par {self.interval})")
+        elif relkind == 'r':
+            raise DatabaseError(
+                f"{table.schema}.{table.name} n'est pas partitionnée : conversion à exécuter explicitement "
+                f"(python middleware/idps/scripts/init_database.py --convert-partitions)",
+                operation='ensure_layout'
+            )
+
+        today = date.today()
+        starts = [partition_bounds(today, self.interval)[0]]
+        for _ in range(self.premake):
+            starts.append(partition_bounds(starts[-1], self.interval)[1])
+        self.ensure_partitions(connection, model, starts)
+
+    def ensure_partitions(self, connection, model, values: Iterable[date]) -> List[str]:
+        """
+        Crée les partitions manquantes pour des dates d'événements
+
+        Chaque partition est créée isolée, alimentée des lignes correspondantes de la
+        partition par défaut, puis rattachée (`ATTACH PARTITION` ne bloque pas les
+        insertions concurrentes dans la table, contrairement à `CREATE TABLE ... PARTITION OF`).
+
+        Une partition absente du cache impose le verrou de création : un chargement
+        concurrent attend ainsi la validation de celle qu'une autre transaction
+        rattache, au lieu d'insérer vers la partition par défaut (violation de sa
+        contrainte une fois le rattachement validé).
+
+        Args:
+            connection: Connexion SQLAlchemy (transaction du chargement)
+            model: Modèle d'événement
+            values: Dates (ou datetimes) des événements à charger
+
+        Returns:
+            Noms des partitions créées
+        """
+        table = model.__table__
+        qualified = f"{table.schema}.{table.name}"
+        bounds = {partition_bounds(value, self.interval) for value in values}
+        cached = self._partitions.get(qualified)
+        if cached is not None and not self._missing(cached, bounds):
+            return []
+
+        # Création sérialisée entre processus (verrou levé en fin de transaction), puis
+        # relecture du catalogue : un autre chargement a pu créer ces partitions entre-temps
+        connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {'name': qualified})
+        partitions = self._read_partitions(connection, table)
+
+        created = []
+        for start, end in self._missing(partitions, bounds):
+            name = partition_name(table.name, start, self.interval)
+            self._attach_partition(connection, model, name, start, end)
+            partitions[name] = (start, end)
+            created.append(name)
+
+        transaction = connection.get_transaction()
+        if created:
+            self._attaching.add(transaction)
+            logger.info(f"Partition(s) créée(s) pour {qualified}: {', '.join(created)}")
+        if transaction not in self._attaching:
+            # Sous le verrou, le catalogue ne montre que des partitions validées
+            self._partitions[qualified] = partitions
+        return created
+
+    def invalidate(self) -> None:
+        """Oublie les partitions en cache (après l'annulation d'une transaction qui en a créé)"""
+        self._partitions.clear()
+
+    @staticmethod
+    def _missing(
+        partitions: Dict[str, Tuple[date, date]],
+        bounds: Iterable[Tuple[date, date]]
+    ) -> List[Tuple[date, date]]:
+        """Périodes non couvertes par les partitions existantes, dans l'ordre chronologique"""
+        return sorted(
+            (start, end) for start, end in bounds
+            if not any(low <= start < high for low, high in partitions.values())
+        )
+
+    def detach_partitions_before(self, connection, model, cutoff: date, drop: bool = False) -> List[str]:
+        """
+        Détache (et supprime si demandé) les partitions entièrement antérieures à une date
+
+        Args:
+            connection: Connexion SQLAlchemy (dans une transaction)
+            model: Modèle d'événement
+            cutoff: Les partitions dont la fin est <= cutoff sont retirées
+            drop: Supprimer les partitions détachées (sinon conservées comme tables autonomes)
+
+        Returns:
+            Noms des partitions détachées
+        """
+        table = model.__table__
+        qualified = f"{table.schema}.{table.name}"
+        partitions = self._get_partitions(connection, table)
+        detached = []
+        for name, (start, end) in sorted(partitions.items(), key=lambda item: item[1]):
+            if end > cutoff:
+                continue
+            connection.exec_driver_sql(f"ALTER TABLE {qualified} DETACH PARTITION {table.schema}.{name}")
+            if drop:
+                connection.exec_driver_sql(f"DROP TABLE {table.schema}.{name}")
+            del partitions[name]
+            detached.append(name)
+        if detached:
+            action = "supprimée(s)" if drop else "détachée(s)"
+            logger.info(f"Partition(s) {action} de {qualified}: {', '.join(detached)}")
+        return detached
+
+    def _get_partitions(self, connection, table) -> Dict[str, Tuple[date, date]]:
+        """Partitions existantes d'une table (lues une fois dans le catalogue, puis en cache)"""
+        qualified = f"{table.schema}.{table.name}"
+        partitions = self._partitions.get(qualified)
+        if partitions is None:
+            partitions = self._read_partitions(connection, table)
+            self._partitions[qualified] = partitions
+        return partitions
+
+    @staticmethod
+    def _read_partitions(connection, table) -> Dict[str, Tuple[date, date]]:
+        """Partitions d'une table lues dans le catalogue"""
+        names = connection.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:parent)"
+            ),
+            {'parent': f"{table.schema}.{table.name}"}
+        ).scalars()
+        partitions = {}
+        for name in names:
+            bounds = _parse_partition_name(table.name, name)
+            if bounds is not None:
+                partitions[name] = bounds
+        return partitions
+
+    def _create_partitioned_table(self, connection, model) -> None:
+        """Crée la table partitionnée, ses index et sa partition par défaut"""
+        partitioned = partitioned_table(model)
+        connection.execute(CreateTable(partitioned))
+        for index in partitioned.indexes:
+            connection.execute(CreateIndex(index))
+        qualified = f"{partitioned.schema}.{partitioned.name}"
+        connection.exec_driver_sql(
+            f"CREATE TABLE {qualified}_default PARTITION OF {qualified} DEFAULT"
+        )
+
+    def _attach_partition(self, connection, model, name: str, start: date, end: date) -> None:
+        """Crée une partition isolée, y déplace les lignes de la partition par défaut, puis la rattache"""
+        table = model.__table__
+        qualified = f"{table.schema}.{table.name}"
+        partition = f"{table.schema}.{name}"
+        column = model.PARTITION_COLUMN
+        connection.exec_driver_sql(
+            f"CREATE TABLE {partition} (LIKE {qualified} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        moved = connection.exec_driver_sql(
+            f"WITH moved AS (DELETE FROM {qualified}_default "
+            f"WHERE {column} >= '{start.isoformat()}' AND {column} < '{end.isoformat()}' RETURNING *) "
+            f"INSERT INTO {partition} SELECT * FROM moved",
+            execution_options={"preserve_rowcount": True},
+        ).rowcount
+        if moved:
+            logger.info(f"{moved} ligne(s) déplacée(s) de {qualified}_default vers {partition}")
+        connection.exec_driver_sql(
+            f"ALTER TABLE {qualified} ATTACH PARTITION {partition} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    def convert_table(self, connection, model) -> Optional[int]:
+        """
+        Convertit une table non partitionnée existante (migration explicite)
+
+        L'ancienne table et ses index sont renommés (`<table>_unpartitioned`), la
+        table partitionnée est créée avec les partitions couvrant les données
+        existantes, les lignes sont recopiées puis comptées, et la séquence des id
+        est recalée. L'ancienne table est conservée : `drop_unpartitioned` la
+        supprime dans une étape distincte. Le renommage verrouille la table
+        (ACCESS EXCLUSIVE) jusqu'à la fin de la transaction : ingestion arrêtée.
+
+        Args:
+            connection: Connexion SQLAlchemy (dans une transaction, annulée en cas d'erreur)
+            model: Modèle d'événement
+
+        Returns:
+            Nombre de lignes recopiées (None si la table est absente ou déjà partitionnée)
+
+        Raises:
+            DatabaseError: Si une ancienne table subsiste, si la copie échoue ou si les nombres de lignes diffèrent
+        """
+        table = model.__table__
+        qualified = f"{table.schema}.{table.name}"
+        legacy = f"{table.name}_unpartitioned"
+        column = model.PARTITION_COLUMN
+        if self._relkind(connection, table.schema, table.name) != 'r':
+            logger.info(f"{qualified} absente ou déjà partitionnée : aucune conversion")
+            return None
+        if self._relkind(connection, table.schema, legacy) is not None:
+            raise DatabaseError(
+                f"{table.schema}.{legacy} existe déjà (conversion précédente non finalisée)",
+                operation='convert_table'
+            )
+        logger.warning(f"Conversion de {qualified} en table partitionnée (recopie de toutes les lignes)")
+
+        index_names = connection.execute(
+            text("SELECT indexname FROM pg_indexes WHERE schemaname = :schema AND tablename = :name"),
+            {'schema': table.schema, 'name': table.name}
+        ).scalars().all()
+        connection.exec_driver_sql(f"ALTER TABLE {qualified} RENAME TO {legacy}")
+        for index_name in index_names:
+            connection.exec_driver_sql(
+                f"ALTER INDEX {table.schema}.{index_name} RENAME TO {index_name[:50]}_unpartitioned"
+            )
+
+        self._create_partitioned_table(connection, model)
+        first, last = connection.exec_driver_sql(
+            f"SELECT MIN({column}), MAX({column}) FROM {table.schema}.{legacy}"
+        ).one()
+        if first is not None:
+            starts = []
+            start = partition_bounds(first, self.interval)[0]
+            while start <= last.date():
+                starts.append(start)
+                start = partition_bounds(start, self.interval)[1]
+            self.ensure_partitions(connection, model, starts)
+
+        columns = ', '.join(column.name for column in table.columns)
+        try:
+            connection.exec_driver_sql(
+                f"INSERT INTO {qualified} ({columns}) SELECT {columns} FROM {table.schema}.{legacy}"
+            )
+        except IntegrityError as e:
+            raise DatabaseError(
+                f"Copie de {qualified} impossible (doublons de clé naturelle : "
+                f"exécuter d'abord init_database.py --dedupe): {e.orig}",
+                operation='convert_table'
+            ) from e
+        expected = connection.exec_driver_sql(f"SELECT COUNT(*) FROM {table.schema}.{legacy}").scalar()
+        copied = connection.exec_driver_sql(f"SELECT COUNT(*) FROM {qualified}").scalar()
+        if copied != expected:
+            raise DatabaseError(
+                f"Conversion de {qualified} annulée: {copied} ligne(s) recopiée(s) pour {expected}",
+                operation='convert_table'
+            )
+        connection.exec_driver_sql(
+            f"SELECT setval(pg_get_serial_sequence('{qualified}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {qualified}), 0) + 1, false)"
+        )
+        logger.info(
+            f"{qualified} convertie en table partitionnée ({copied} ligne(s) recopiée(s)), "
+            f"{table.schema}.{legacy} conservée"
+        )
+        return copied
+
+    def drop_unpartitioned(self, connection, model) -> bool:
+        """
+        Supprime l'ancienne table conservée par `convert_table`, après vérification
+
+        Chaque ligne de `<table>_unpartitioned` doit être présente (même id, même
+        date d'événement) dans la table partitionnée.
+
+        Args:
+            connection: Connexion SQLAlchemy (dans une transaction)
+            model: Modèle d'événement
+
+        Returns:
+            True si l'ancienne table a été supprimée, False si elle n'existe pas
+
+        Raises:
+            DatabaseError: Si des lignes de l'ancienne table manquent dans la table partitionnée
+        """
+        table = model.__table__
+        qualified = f"{table.schema}.{table.name}"
+        legacy = f"{table.schema}.{table.name}_unpartitioned"
+        column = model.PARTITION_COLUMN
+        if self._relkind(connection, table.schema, f"{table.name}_unpartitioned") is None:
+            return False
+        missing = connection.exec_driver_sql(
+            f"SELECT COUNT(*) FROM {legacy} l WHERE NOT EXISTS "
+            f"(SELECT 1 FROM {qualified} t WHERE t.id = l.id AND t.{column} = l.{column})"
+        ).scalar()
+        if missing:
+            raise DatabaseError(
+                f"{legacy} conservée: {missing} ligne(s) absente(s) de {qualified}",
+                operation='drop_unpartitioned'
+            )
+        connection.exec_driver_sql(f"DROP TABLE {legacy}")
+        logger.info(f"{legacy} supprimée (toutes ses lignes sont présentes dans {qualified})")
+        return True
+
+    @staticmethod
+    def _relkind(connection, schema: str, name: str) -> Optional[str]:
+        """Type de relation PostgreSQL ('r' table, 'p' table partitionnée), None si absente"""
+        return connection.execute(
+            text(
+                "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = :schema AND c.relname = :name"
+            ),
+            {'schema': schema, 'name': name}
+        ).scalar()
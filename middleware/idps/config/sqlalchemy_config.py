@@ -1,105 +1,614 @@
 """
 Configuration SQLAlchemy pour IDPS
 """
-from sqlalchemy import create_engine
+import threading
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import BigInteger, Integer, MetaData, and_, create_engine, delete, func, inspect, select, text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 import logging
 
-from middleware.idps.config.database_config import IDPSDatabaseConfig
+try:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+except ImportError:  # greenlet absent (extra `sqlalchemy[asyncio]`) : pas d'engine asynchrone
+    async_sessionmaker = create_async_engine = None
+
+from middleware.idps.config.database_config import IDPSDatabaseConfig, IDPSEngineProfile
+from middleware.exceptions import ConfigurationError, DatabaseError
+from middleware.idps.config.partitioning import IDPSPartitionManager
 
 logger = logging.getLogger(__name__)
 
 # Base pour les modèles SQLAlchemy
 Base = declarative_base()
 
-# Variables globales pour l'engine et la session
-_engine = None
-_session_factory = None
+# Clé primaire BIGINT, en INTEGER sous SQLite pour conserver l'auto-incrément (alias du ROWID)
+BigIntegerPrimaryKey = BigInteger().with_variant(Integer, 'sqlite')
+
+# Schéma des tables IDPS (absent sous SQLite : tables créées dans la base principale)
+IDPS_SCHEMA = 'idps'
+
+# Engines et session factories par base et profil (voir `IDPSEngineProfile`)
+_engines = {}
+_session_factories = {}
+_engines_lock = threading.Lock()
+
+# Engines et session factories asynchrones (psycopg async), par base et profil
+_async_session_factories = {}
+
+# Version du schéma IDPS : à incrémenter à chaque évolution des modèles
+SCHEMA_VERSION = 4
+
+# Bases dont le schéma a déjà été vérifié dans ce processus (URL -> version)
+_verified_schemas = {}
+
+
+def _engine_key(db_config: IDPSDatabaseConfig, profile: str):
+    """
+    Clé de cache de l'engine d'une base pour un profil
+
+    Sous SQLite, tous les profils partagent un engine : une base en mémoire
+    n'existe que dans sa connexion, et les réglages de pool y sont sans objet.
+    """
+    database_url = db_config.to_sqlalchemy_url()
+    if db_config.is_sqlite:
+        return database_url, None
+    return database_url, db_config.engine_profile(profile)
 
 
-def get_engine(db_config: IDPSDatabaseConfig = None):
+def get_engine(db_config: IDPSDatabaseConfig = None, profile: str = 'interactive'):
     """
-    Crée ou retourne l'engine SQLAlchemy
+    Crée ou retourne l'engine SQLAlchemy d'une base pour un profil d'usage
+    
+    Un engine (et son pool) est conservé par URL de base et par profil : les
+    workers de chargement parallèles et les lectures ne partagent pas un pool,
+    et deux configurations distinctes n'utilisent pas le même engine.
     
     Args:
         db_config: Configuration de la base de données (charge depuis env si None)
+        profile: Profil d'engine ('bulk' pour les chargements, 'admin' pour le schéma, 'interactive' sinon)
     
     Returns:
         SQLAlchemy Engine
     """
-    global _engine
-    
-    if _engine is None:
-        db_config = db_config or IDPSDatabaseConfig.from_env()
-        
-        # Utiliser la méthode de la config pour générer l'URL
-        database_url = db_config.to_sqlalchemy_url()
-        
-        _engine = create_engine(
-            database_url,
-            pool_pre_ping=True,  # Vérifier les connexions avant utilisation
-            pool_recycle=3600,    # Recycler les connexions après 1 heure
-            echo=False            # Mettre à True pour voir les requêtes SQL
-        )
-        
-        logger.info(f"Engine SQLAlchemy créé pour la base de données: {db_config.database}")
+    db_config = db_config or IDPSDatabaseConfig.from_env()
+    key = _engine_key(db_config, profile)
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
     
-    return _engine
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            database_url = db_config.to_sqlalchemy_url()
+            if db_config.is_sqlite:
+                engine = _create_sqlite_engine(database_url, db_config)
+                logger.info(f"Engine SQLAlchemy créé pour la base SQLite: {db_config.sqlite_path}")
+            else:
+                engine = _create_postgresql_engine(database_url, db_config.engine_profile(profile))
+                logger.info(f"Engine SQLAlchemy '{profile}' créé pour la base de données: {db_config.database}")
+            _engines[key] = engine
+    return engine
 
 
-def get_session_factory(db_config: IDPSDatabaseConfig = None):
+def _engine_options(profile: IDPSEngineProfile):
     """
-    Crée ou retourne la session factory SQLAlchemy
+    Options d'engine PostgreSQL d'un profil (communes aux engines synchrone et asynchrone)
+    
+    `statement_timeout` et `synchronous_commit` sont passés en paramètres de
+    connexion (`options`) : appliqués à chaque session sans requête `SET`.
+    """
+    connect_args = {'options': profile.connect_options}
+    return dict(
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_pre_ping=profile.pool_pre_ping,  # Vérifier les connexions avant utilisation
+        pool_recycle=profile.pool_recycle,    # Recycler les connexions au-delà de cet âge (s)
+        insertmanyvalues_page_size=profile.insertmanyvalues_page_size,
+        connect_args=connect_args,
+        echo=False                            # Mettre à True pour voir les requêtes SQL
+    )
+
+
+def _create_postgresql_engine(database_url: str, profile: IDPSEngineProfile):
+    """Crée l'engine PostgreSQL d'un profil"""
+    return create_engine(database_url, **_engine_options(profile))
+
+
+def _create_sqlite_engine(database_url: str, db_config: IDPSDatabaseConfig):
+    """
+    Crée l'engine du backend SQLite
+    
+    Le schéma `idps` des modèles est retiré via `schema_translate_map` : les
+    tables sont créées dans la base principale et l'API des repositories reste
+    identique. Une base en mémoire partage une connexion unique entre threads.
+    """
+    engine_options = {
+        'connect_args': {'check_same_thread': False},
+        'execution_options': {'schema_translate_map': {IDPS_SCHEMA: None}},
+        'echo': False,
+    }
+    if db_config.sqlite_path == ':memory:':
+        engine_options['poolclass'] = StaticPool
+    return create_engine(database_url, **engine_options)
+
+
+def get_session_factory(db_config: IDPSDatabaseConfig = None, profile: str = 'interactive'):
+    """
+    Crée ou retourne la session factory SQLAlchemy d'un profil
     
     Args:
         db_config: Configuration de la base de données (charge depuis env si None)
+        profile: Profil d'engine ('bulk' ou 'interactive')
     
     Returns:
         Session factory
     """
-    global _session_factory
+    db_config = db_config or IDPSDatabaseConfig.from_env()
+    key = _engine_key(db_config, profile)
+    session_factory = _session_factories.get(key)
+    if session_factory is not None:
+        return session_factory
     
-    if _session_factory is None:
-        engine = get_engine(db_config)
-        _session_factory = scoped_session(
-            sessionmaker(bind=engine, autocommit=False, autoflush=False)
-        )
-        logger.info("Session factory SQLAlchemy créée")
-    
-    return _session_factory
+    engine = get_engine(db_config, profile)
+    with _engines_lock:
+        session_factory = _session_factories.get(key)
+        if session_factory is None:
+            session_factory = scoped_session(
+                sessionmaker(bind=engine, autocommit=False, autoflush=False)
+            )
+            _session_factories[key] = session_factory
+            logger.info(f"Session factory SQLAlchemy créée (profil {profile})")
+    return session_factory
 
 
-def get_session(db_config: IDPSDatabaseConfig = None):
+def get_session(db_config: IDPSDatabaseConfig = None, profile: str = 'interactive'):
     """
     Crée une nouvelle session SQLAlchemy
     
     Args:
         db_config: Configuration de la base de données (charge depuis env si None)
+        profile: Profil d'engine ('bulk' pour les chargements, 'interactive' sinon)
     
     Returns:
         Session SQLAlchemy
     """
-    session_factory = get_session_factory(db_config)
+    session_factory = get_session_factory(db_config, profile)
     return session_factory()
 
 
-def init_database(db_config: IDPSDatabaseConfig = None):
+def async_engine_available(db_config: IDPSDatabaseConfig = None) -> bool:
+    """Indique si un engine asynchrone est utilisable (PostgreSQL et extra `sqlalchemy[asyncio]` installé)"""
+    db_config = db_config or IDPSDatabaseConfig.from_env()
+    return create_async_engine is not None and not db_config.is_sqlite
+
+
+def get_async_session_factory(db_config: IDPSDatabaseConfig = None, profile: str = 'bulk'):
+    """
+    Crée ou retourne la session factory asynchrone d'un profil (driver psycopg async)
+    
+    L'engine asynchrone a son propre pool, dimensionné par le même profil que
+    l'engine synchrone. Ses connexions sont liées à la boucle asyncio qui les a
+    ouvertes : libérer l'engine (`dispose_async_engines`) avant de fermer la boucle.
+    
+    Args:
+        db_config: Configuration de la base de données (charge depuis env si None)
+        profile: Profil d'engine ('bulk' ou 'interactive')
+    
+    Returns:
+        async_sessionmaker
+    
+    Raises:
+        ConfigurationError: Si le backend est SQLite ou si greenlet n'est pas installé
+    """
+    db_config = db_config or IDPSDatabaseConfig.from_env()
+    if not async_engine_available(db_config):
+        raise ConfigurationError(
+            "Engine asynchrone indisponible (backend PostgreSQL et extra sqlalchemy[asyncio] requis)",
+            config_key='DB_BACKEND'
+        )
+    key = _engine_key(db_config, profile)
+    session_factory = _async_session_factories.get(key)
+    if session_factory is not None:
+        return session_factory
+    
+    with _engines_lock:
+        session_factory = _async_session_factories.get(key)
+        if session_factory is None:
+            engine = create_async_engine(
+                db_config.to_sqlalchemy_url(), **_engine_options(db_config.engine_profile(profile))
+            )
+            session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+            _async_session_factories[key] = session_factory
+            logger.info(f"Engine SQLAlchemy asynchrone '{profile}' créé pour la base de données: {db_config.database}")
+    return session_factory
+
+
+async def dispose_async_engines() -> None:
+    """Ferme les connexions des engines asynchrones (à appeler avant la fin de la boucle asyncio)"""
+    with _engines_lock:
+        session_factories = list(_async_session_factories.values())
+        _async_session_factories.clear()
+    for session_factory in session_factories:
+        await session_factory.kw['bind'].dispose()
+
+
+def init_database(db_config: IDPSDatabaseConfig = None, force: bool = False):
     """
     Initialise les tables dans la base de données (crée les tables si elles n'existent pas)
     
+    La vérification n'est faite qu'une fois par processus, et `create_all` n'est
+    exécuté que si la version enregistrée dans idps.schema_version diffère de
+    SCHEMA_VERSION : construire un repository ne coûte alors plus d'aller-retour.
+    
+    Le schéma est mis en place avec le profil 'admin' (sans `statement_timeout`),
+    dont la connexion est libérée à la fin.
+    
     Args:
         db_config: Configuration de la base de données (charge depuis env si None)
+        force: Exécuter `create_all` même si le schéma est déjà à jour
     """
-    engine = get_engine(db_config)
+    db_config = db_config or IDPSDatabaseConfig.from_env()
+    engine = get_engine(db_config, 'admin')
+    engine_key = engine.url.render_as_string(hide_password=True)
+    
+    if not force and _verified_schemas.get(engine_key) == SCHEMA_VERSION:
+        return
 
+    try:
+        _init_schema(engine, engine_key, db_config, force)
+    finally:
+        _release_admin_engine(engine, db_config)
+
+
+def _init_schema(engine, engine_key: str, db_config: IDPSDatabaseConfig, force: bool) -> None:
+    """Vérifie la version du schéma, crée les tables absentes et contrôle les index des tables d'événements"""
     # Importer tous les modèles pour qu'ils soient enregistrés auprès de Base
     # (les imports suffisent, même si les noms ne sont pas utilisés directement)
-    from middleware.idps.models.workflow_event_model import IDPSWorkflowEventModel  # noqa: F401
-    from middleware.idps.models.error_event_model import IDPSErrorEventModel      # noqa: F401
     from middleware.idps.models.audit_log_model import IDPSAuditLogModel          # noqa: F401
+    from middleware.idps.models.ingestion_metrics_model import IDPSIngestionMetricsModel  # noqa: F401
+    from middleware.idps.models.schema_version_model import IDPSSchemaVersionModel
+
+    event_models = _event_models()
+    
+    if not force and _get_recorded_schema_version(engine, IDPSSchemaVersionModel) == SCHEMA_VERSION:
+        # Le partitionnement dépend de la configuration, pas de la version : vérifié à chaque démarrage
+        _ensure_partition_layout(engine, db_config, event_models)
+        _verified_schemas[engine_key] = SCHEMA_VERSION
+        logger.info(f"Schéma IDPS déjà à jour (version {SCHEMA_VERSION})")
+        return
 
+    # Tables d'événements partitionnées créées avant `create_all`, qui ignore alors les tables existantes
+    _ensure_partition_layout(engine, db_config, event_models)
     # Créer les tables si elles n'existent pas
     Base.metadata.create_all(engine)
-    logger.info("Tables IDPS créées/vérifiées dans la base de données")
+    # `create_all` ignore les tables existantes : les index ajoutés depuis (versions 3 et 4)
+    # sont créés par l'étape de migration explicite, jamais au démarrage
+    missing = [index.name for model in event_models for index in _missing_indexes(engine, model)]
+    if missing:
+        raise DatabaseError(
+            f"Index absent(s) des tables d'événements: {', '.join(missing)}. "
+            f"Exécuter la migration: python middleware/idps/scripts/init_database.py --create-indexes "
+            f"(--dedupe pour supprimer les doublons de clé naturelle existants)",
+            operation='init_database'
+        )
+    _record_schema_version(engine, IDPSSchemaVersionModel)
+    _verified_schemas[engine_key] = SCHEMA_VERSION
+    logger.info(f"Tables IDPS créées/vérifiées dans la base de données (version de schéma {SCHEMA_VERSION})")
+
+
+def migrate_event_indexes(
+    db_config: IDPSDatabaseConfig = None,
+    dedupe: bool = False,
+    dry_run: bool = False
+) -> List[str]:
+    """
+    Crée les index absents des tables d'événements existantes (étape de migration explicite)
+    
+    Les doublons de clé naturelle (ingestions répétées avant la version 3) empêchent
+    la création de l'index unique : ils sont comptés et journalisés, puis supprimés
+    si `dedupe` est demandé (la ligne de plus petit id est conservée). Sous
+    PostgreSQL, les index sont créés avec `CREATE INDEX CONCURRENTLY`, hors
+    transaction, sans bloquer les écritures.
+    
+    Args:
+        db_config: Configuration de la base de données (charge depuis env si None)
+        dedupe: Supprimer les doublons de clé naturelle avant de créer l'index unique
+        dry_run: Compter les doublons et lister les index absents sans rien modifier
+    
+    Returns:
+        Noms des index créés (à créer si `dry_run`)
+    
+    Raises:
+        DatabaseError: Si des doublons subsistent sans `dedupe`, ou si la création échoue
+    """
+    db_config = db_config or IDPSDatabaseConfig.from_env()
+    engine = get_engine(db_config, 'admin')
+    try:
+        return _migrate_event_indexes(engine, dedupe, dry_run)
+    finally:
+        _release_admin_engine(engine, db_config)
+
+
+def _migrate_event_indexes(engine, dedupe: bool, dry_run: bool) -> List[str]:
+    """Crée les index absents, table par table (voir `migrate_event_indexes`)"""
+    created = []
+    for model in _event_models():
+        table = model.__table__
+        for index in _missing_indexes(engine, model):
+            if index.unique:
+                duplicates = _count_duplicates(engine, model)
+                if duplicates:
+                    logger.warning(f"{duplicates} doublon(s) de clé naturelle dans {table.name}")
+                    if not dedupe and not dry_run:
+                        raise DatabaseError(
+                            f"{duplicates} doublon(s) de clé naturelle dans {table.name} empêchent "
+                            f"la création de {index.name} (relancer avec --dedupe)",
+                            operation='migrate_event_indexes'
+                        )
+                    if dedupe and not dry_run:
+                        _delete_duplicates(engine, model)
+            if dry_run:
+                logger.info(f"Index {index.name} à créer")
+            else:
+                _create_index(engine, index)
+            created.append(index.name)
+    return created
+
+
+def convert_event_tables(db_config: IDPSDatabaseConfig = None) -> List[str]:
+    """
+    Convertit les tables d'événements non partitionnées (étape de migration explicite)
+    
+    Chaque table est convertie dans sa propre transaction (voir
+    `IDPSPartitionManager.convert_table`) ; les anciennes tables sont conservées
+    sous le nom `<table>_unpartitioned` jusqu'à `drop_unpartitioned_tables`.
+    
+    Args:
+        db_config: Configuration de la base de données (charge depuis env si None)
+    
+    Returns:
+        Noms des tables converties
+    
+    Raises:
+        ConfigurationError: Si le partitionnement n'est pas configuré
+        DatabaseError: Si une conversion échoue (la table concernée reste inchangée)
+    """
+    db_config = db_config or IDPSDatabaseConfig.from_env()
+    partition_manager = _partition_manager(db_config)
+    engine = get_engine(db_config, 'admin')
+    converted = []
+    try:
+        for model in _event_models():
+            with engine.begin() as connection:
+                if partition_manager.convert_table(connection, model) is not None:
+                    converted.append(model.__table__.name)
+    finally:
+        _release_admin_engine(engine, db_config)
+    return converted
+
+
+def drop_unpartitioned_tables(db_config: IDPSDatabaseConfig = None) -> List[str]:
+    """
+    Supprime les anciennes tables `<table>_unpartitioned` dont toutes les lignes ont été recopiées
+    
+    Args:
+        db_config: Configuration de la base de données (charge depuis env si None)
+    
+    Returns:
+        Noms des tables supprimées
+    
+    Raises:
+        ConfigurationError: Si le partitionnement n'est pas configuré
+        DatabaseError: Si des lignes d'une ancienne table manquent dans la table partitionnée
+    """
+    db_config = db_config or IDPSDatabaseConfig.from_env()
+    partition_manager = _partition_manager(db_config)
+    engine = get_engine(db_config, 'admin')
+    dropped = []
+    try:
+        for model in _event_models():
+            with engine.begin() as connection:
+                if partition_manager.drop_unpartitioned(connection, model):
+                    dropped.append(f"{model.__table__.name}_unpartitioned")
+    finally:
+        _release_admin_engine(engine, db_config)
+    return dropped
+
+
+def _partition_manager(db_config: IDPSDatabaseConfig) -> IDPSPartitionManager:
+    """
+    Gestionnaire de partitions de la configuration
+
+    Raises:
+        ConfigurationError: Si le partitionnement n'est pas configuré (ou backend SQLite)
+    """
+    if not db_config.is_partitioned:
+        raise ConfigurationError(
+            "Partitionnement non configuré (DB_PARTITION_INTERVAL=month|day, backend PostgreSQL)",
+            config_key='DB_PARTITION_INTERVAL'
+        )
+    return IDPSPartitionManager(db_config.partition_interval, db_config.partition_premake)
+
+
+def _release_admin_engine(engine, db_config: IDPSDatabaseConfig) -> None:
+    """
+    Ferme les connexions de l'engine 'admin' (rouvertes à la demande)
+
+    Sous SQLite, l'engine est partagé par tous les profils : il est conservé.
+    """
+    if not db_config.is_sqlite:
+        engine.dispose()
+
+
+def _event_models():
+    """Modèles des tables d'événements (importés à l'appel : ils dépendent de Base)"""
+    from middleware.idps.models.workflow_event_model import IDPSWorkflowEventModel
+    from middleware.idps.models.error_event_model import IDPSErrorEventModel
+    return IDPSWorkflowEventModel, IDPSErrorEventModel
+
+
+def _get_recorded_schema_version(engine, schema_version_model):
+    """
+    Retourne la dernière version de schéma enregistrée, ou None si la table n'existe pas encore
+    """
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(func.max(schema_version_model.version))).scalar()
+    except SQLAlchemyError:
+        return None
+
+
+def _ensure_partition_layout(engine, db_config: IDPSDatabaseConfig, event_models) -> None:
+    """
+    Crée les tables d'événements partitionnées et leurs partitions si le partitionnement est configuré
+
+    Une table existante non partitionnée n'est pas convertie : `DatabaseError`
+    indique la migration à exécuter (`convert_event_tables`).
+    """
+    if not db_config.is_partitioned:
+        if db_config.partition_interval != 'none':
+            logger.warning("Partitionnement des tables d'événements ignoré pour le backend SQLite")
+        return
+
+    partition_manager = IDPSPartitionManager(db_config.partition_interval, db_config.partition_premake)
+    with engine.begin() as connection:
+        for model in event_models:
+            partition_manager.ensure_layout(connection, model)
+
+
+def _missing_indexes(engine, model) -> list:
+    """
+    Index d'une table d'événements existante absents de la base
+
+    Sous PostgreSQL, un index laissé invalide par un `CREATE INDEX CONCURRENTLY`
+    interrompu compte comme absent. Aucun index n'est absent d'une table inexistante.
+    """
+    table = model.__table__
+    if engine.dialect.name == 'sqlite':
+        inspector = inspect(engine)
+        if not inspector.has_table(table.name):
+            return []
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+    else:
+        with engine.connect() as connection:
+            if connection.execute(
+                text("SELECT to_regclass(:table)"), {'table': f"{table.schema}.{table.name}"}
+            ).scalar() is None:
+                return []
+            existing = set(connection.execute(
+                text(
+                    "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE i.indrelid = to_regclass(:table) AND i.indisvalid"
+                ),
+                {'table': f"{table.schema}.{table.name}"}
+            ).scalars())
+    return [index for index in table.indexes if index.name not in existing]
+
+
+def _duplicate_ids(model):
+    """
+    Requête des id en doublon de clé naturelle (toutes les lignes d'un groupe sauf la plus ancienne)
+
+    Les lignes dont une colonne de la clé est NULL ne sont pas des doublons pour
+    l'index unique : elles sont écartées.
+    """
+    table = model.__table__
+    key_columns = [table.c[name] for name in model.NATURAL_KEY]
+    ranked = (
+        select(
+            table.c.id,
+            func.row_number().over(partition_by=key_columns, order_by=table.c.id).label('rank')
+        )
+        .where(and_(*(column.is_not(None) for column in key_columns)))
+        .subquery()
+    )
+    return select(ranked.c.id).where(ranked.c.rank > 1).subquery()
+
+
+def _count_duplicates(engine, model) -> int:
+    """Nombre de lignes en doublon de clé naturelle d'une table d'événements"""
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(_duplicate_ids(model))).scalar()
+
+
+def _delete_duplicates(engine, model) -> int:
+    """
+    Supprime les doublons de clé naturelle (plus petit id conservé) en un passage
+
+    Sous PostgreSQL : `DELETE ... USING` sur la numérotation par groupe (pas de
+    sous-requête `NOT IN`, évaluée ligne à ligne).
+    """
+    table = model.__table__
+    duplicates = _duplicate_ids(model)
+    if engine.dialect.name == 'sqlite':
+        statement = delete(table).where(table.c.id.in_(select(duplicates.c.id)))
+    else:
+        statement = delete(table).where(table.c.id == duplicates.c.id)
+    with engine.begin() as connection:
+        deleted = connection.execute(statement).rowcount
+    logger.warning(f"{deleted} doublon(s) supprimé(s) de {table.name}")
+    return deleted
+
+
+def _create_index(engine, index) -> None:
+    """
+    Crée un index d'une table existante
+
+    Sous PostgreSQL, `CREATE INDEX CONCURRENTLY` est exécuté hors transaction
+    (autocommit) ; un index invalide laissé par une tentative précédente est
+    supprimé d'abord, et de nouveau en cas d'échec.
+    """
+    table = index.table
+    if engine.dialect.name == 'sqlite':
+        index.create(engine)
+        logger.info(f"Index {index.name} créé")
+        return
+
+    qualified_table = f"{table.schema}.{table.name}"
+    with engine.connect() as connection:
+        relkind = connection.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {'table': qualified_table}
+        ).scalar()
+    if relkind == 'p':
+        # Index créés avec la table partitionnée (`partitioning`) ; CONCURRENTLY y est refusé
+        raise DatabaseError(
+            f"Index {index.name} absent de la table partitionnée {qualified_table} : "
+            f"création concurrente impossible, le recréer partition par partition",
+            operation='migrate_event_indexes'
+        )
+
+    # Copie de la table (métadonnées isolées) pour demander la création concurrente
+    concurrent = next(
+        copy for copy in table.to_metadata(MetaData()).indexes if copy.name == index.name
+    )
+    concurrent.dialect_kwargs['postgresql_concurrently'] = True
+    qualified_index = f"{table.schema}.{index.name}"
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {qualified_index}")
+        try:
+            connection.execute(CreateIndex(concurrent))
+        except SQLAlchemyError as e:
+            connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {qualified_index}")
+            raise DatabaseError(
+                f"Échec de la création de l'index {index.name}: {e}", operation='migrate_event_indexes'
+            ) from e
+    logger.info(f"Index {index.name} créé (CONCURRENTLY)")
+
 
+def _record_schema_version(engine, schema_version_model):
+    """Enregistre SCHEMA_VERSION comme appliquée (ignoré si un autre processus l'a déjà fait)"""
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                schema_version_model.__table__.insert().values(
+                    version=SCHEMA_VERSION, applied_at=datetime.now()
+                )
+            )
+    except IntegrityError:
+        logger.debug(f"Version de schéma {SCHEMA_VERSION} déjà enregistrée")
@@ -0,0 +1,161 @@
+"""
+Validation des lignes mappées contre les contraintes des modèles SQLAlchemy IDPS
+
+Les contraintes (longueur maximale des `String(n)`, colonnes `nullable=False`)
+sont déduites des définitions `Column` des modèles : elles suivent le schéma
+sans duplication. Les mappers produisant `""` pour une valeur absente, une
+chaîne vide est une valeur manquante pour une colonne obligatoire. Chaque colonne est vérifiée d'un bloc avant le chargement ;
+les lignes fautives sont écartées au lieu de faire échouer tout le lot
+INSERT / COPY, et donc tout le fichier.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import String
+
+from middleware.idps.models.constraint_validation_result import ConstraintValidationResult, RejectedRow
+from middleware.idps.models.error_event_model import IDPSErrorEventModel
+from middleware.idps.models.workflow_event_model import IDPSWorkflowEventModel
+from middleware.utils.logger import RowIssueAggregator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IDPSColumnConstraint:
+    """Contraintes d'une colonne de table, déduites de sa définition SQLAlchemy"""
+    name: str
+    nullable: bool
+    max_length: Optional[int] = None
+
+
+def model_constraints(model) -> Tuple[IDPSColumnConstraint, ...]:
+    """
+    Déduit les contraintes vérifiables côté client des colonnes d'un modèle
+
+    Les clés primaires auto-incrémentées et les colonnes sans contrainte
+    (nullable et sans longueur maximale) sont ignorées.
+    """
+    constraints = []
+    for column in model.__table__.columns:
+        if column.primary_key and column.autoincrement:
+            continue
+        max_length = column.type.length if isinstance(column.type, String) else None
+        if column.nullable and max_length is None:
+            continue
+        constraints.append(IDPSColumnConstraint(column.name, bool(column.nullable), max_length))
+    return tuple(constraints)
+
+
+class IDPSConstraintValidator:
+    """Vérifie, colonne par colonne, que les lignes mappées respectent les contraintes des tables IDPS"""
+
+    MODELS = {
+        'workflow': IDPSWorkflowEventModel,
+        'error': IDPSErrorEventModel,
+    }
+
+    def __init__(self):
+        """Initialise le validateur (contraintes déduites une fois par modèle)"""
+        self.constraints = {category: model_constraints(model) for category, model in self.MODELS.items()}
+
+    def validate(
+        self,
+        data: List[Dict[str, Any]],
+        category: str,
+        source_rows: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> ConstraintValidationResult:
+        """
+        Sépare les lignes conformes des lignes à rejeter
+
+        Seules les colonnes présentes dans les lignes sont vérifiées : les colonnes
+        absentes reçoivent une valeur par défaut au chargement.
+
+        Args:
+            data: Lignes mappées au schéma IDPS (toutes avec les mêmes clés)
+            category: Catégorie ('workflow' ou 'error')
+            source_rows: Lignes CSV source, dans l'ordre de `data` (conservées dans les rejets)
+
+        Returns:
+            ConstraintValidationResult (lignes conformes, dans leur ordre, et lignes rejetées)
+        """
+        constraints = self.constraints.get(category)
+        if not data or constraints is None:
+            return ConstraintValidationResult(valid_data=data)
+
+        present = data[0].keys()
+        invalid = np.zeros(len(data), dtype=bool)
+        violations: List[Tuple[IDPSColumnConstraint, np.ndarray, List[Any]]] = []
+
+        for constraint in constraints:
+            if constraint.name not in present:
+                continue
+            values = [row.get(constraint.name) for row in data]
+            mask = self._violations(values, constraint)
+            if mask is not None:
+                violations.append((constraint, mask, values))
+                invalid |= mask
+
+        if not invalid.any():
+            return ConstraintValidationResult(valid_data=data)
+
+        # Les motifs ne sont construits que pour les lignes rejetées
+        row_issues = RowIssueAggregator(logger)
+        rejected_rows = []
+        for index in np.flatnonzero(invalid):
+            reasons = []
+            for constraint, mask, values in violations:
+                if not mask[index]:
+                    continue
+                value = values[index]
+                if value is None or value == "":
+                    reasons.append(f"{constraint.name}: valeur obligatoire manquante")
+                else:
+                    reasons.append(
+                        f"{constraint.name}: {len(value)} caractères (maximum {constraint.max_length})"
+                    )
+            source_row = source_rows[index] if source_rows else data[index]
+            line_number = source_row.get('_line_number')
+            reason = '; '.join(reasons)
+            row_issues.record(line_number, reason)
+            rejected_rows.append(RejectedRow(
+                line_number=line_number, reason=reason, data=source_row, raw_line=source_row.get('_raw_line')
+            ))
+        row_issues.log_summary(f"les contraintes des colonnes ({category})")
+
+        valid_data = [row for row, is_invalid in zip(data, invalid.tolist()) if not is_invalid]
+        logger.warning(f"{len(rejected_rows)} ligne(s) rejetée(s) sur {len(data)} (contraintes des colonnes)")
+        return ConstraintValidationResult(valid_data=valid_data, rejected_rows=rejected_rows)
+
+    @staticmethod
+    def _violations(values: List[Any], constraint: IDPSColumnConstraint) -> Optional[np.ndarray]:
+        """
+        Masque des valeurs ne respectant pas la contrainte (None si toute la colonne est conforme)
+
+        La colonne entière est d'abord testée en une fois (`None in`, `"" in`, `max(map(len))`) ;
+        le masque valeur par valeur n'est calculé que pour une colonne fautive.
+        """
+        null_violation = not constraint.nullable and (None in values or "" in values)
+        length_violation = False
+        if constraint.max_length is not None:
+            try:
+                length_violation = max(map(len, values), default=0) > constraint.max_length
+            except TypeError:
+                # Valeurs non textuelles (None) : longueurs calculées valeur par valeur
+                length_violation = True
+        if not null_violation and not length_violation:
+            return None
+
+        max_length = constraint.max_length
+        mask = np.fromiter(
+            (
+                (null_violation and (value is None or value == ""))
+                or (max_length is not None and isinstance(value, str) and len(value) > max_length)
+                for value in values
+            ),
+            dtype=bool,
+            count=len(values)
+        )
+        return mask if mask.any() else None
@@ -0,0 +1,291 @@
+"""
+Transformation IDPS en une seule passe
+
+Remplace l'enchaînement `DataTransformationService.transform` puis
+`IDPSTransformer.map_to_module_schema` : chaque ligne CSV nettoyée est convertie
+directement en ligne prête pour le repository, sans dictionnaire intermédiaire
+(`raw_data`), sans sérialisation ISO des dates suivie d'un nouveau parsing, et
+avec un seul `datetime.now()` par bloc de lignes.
+
+Le rôle des colonnes (date, JSON) et les colonnes lues pour chaque champ du
+modèle sont résolus une seule fois par en-tête. Le résultat est identique à
+celui des deux étapes successives, à l'horodatage d'ingestion près.
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from middleware.idps.interfaces import IDataTransformer
+from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.models.transformation_result import TransformationResult
+from middleware.idps.models.constraint_validation_result import RejectedRow, SOURCE_FIELDS
+from middleware.idps.services.data_transformation_service import DataTransformationService
+from middleware.idps.transformer import IDPSTransformer, IDPSColumnPlan
+from middleware.utils.logger import RowIssueAggregator
+
+logger = logging.getLogger(__name__)
+
+# Colonne lue pour un champ : (nom, colonne de date, colonne JSON)
+_FieldColumn = Tuple[str, bool, bool]
+
+
+class IDPSFieldPlan:
+    """
+    Plan de lecture des champs du modèle pour un en-tête CSV donné
+
+    Complète `IDPSColumnPlan` avec le rôle de la colonne lue pour chaque champ, tel
+    que déterminé par `DataTransformationService` (dates normalisées, JSON décodé).
+    """
+
+    __slots__ = ('column_plan', 'field_columns', 'plain_fields', 'date_columns')
+
+    def __init__(self, column_plan: IDPSColumnPlan):
+        self.column_plan = column_plan
+        self.field_columns: Dict[str, Optional[_FieldColumn]] = {}
+        # Champs dont la colonne n'est pas transformée : lecture directe via le plan de colonnes
+        self.plain_fields = set()
+        date_columns = set()
+
+        for field_name, column in column_plan.columns.items():
+            if column is None:
+                self.field_columns[field_name] = None
+                self.plain_fields.add(field_name)
+                continue
+            is_date = DataTransformationService.is_date_column(column)
+            is_json = DataTransformationService.is_json_column(column)
+            self.field_columns[field_name] = (column, is_date, is_json)
+            if not (is_date or is_json):
+                self.plain_fields.add(field_name)
+            if is_date:
+                date_columns.add(column)
+
+        # Ordre de l'en-tête : le format de date est inféré sur la première colonne parsée
+        self.date_columns = tuple(column for column in column_plan.header if column in date_columns)
+
+
+class IDPSFusedTransformer(IDataTransformer):
+    """
+    Transformation générique et mapping IDPS fusionnés
+
+    Réutilise les parseurs de dates et les plans de colonnes des deux étapes
+    qu'il remplace : le format de date inféré, les compteurs de valeurs non
+    reconnues et les règles de mapping restent les mêmes.
+    """
+
+    # Nombre maximal de plans conservés (un par en-tête distinct)
+    _MAX_FIELD_PLANS = 32
+
+    def __init__(
+        self,
+        data_transformation_service: DataTransformationService,
+        idps_transformer: IDPSTransformer
+    ):
+        """
+        Initialise le transformateur fusionné
+
+        Args:
+            data_transformation_service: Service de transformation générique (parsing des dates par colonne)
+            idps_transformer: Transformateur IDPS (plans de colonnes, parsing ISO, règles de mapping)
+        """
+        self.data_transformation_service = data_transformation_service
+        self.idps_transformer = idps_transformer
+        self._field_plans: Dict[Tuple[str, Tuple[Any, ...]], IDPSFieldPlan] = {}
+
+    def get_field_plan(self, header: Tuple[Any, ...], category: str) -> IDPSFieldPlan:
+        """Retourne le plan de lecture des champs pour un en-tête (compilé au premier appel)"""
+        key = (category, header)
+        plan = self._field_plans.get(key)
+        if plan is None:
+            if len(self._field_plans) >= self._MAX_FIELD_PLANS:
+                self._field_plans.clear()
+            plan = IDPSFieldPlan(self.idps_transformer.get_column_plan(header, category))
+            self._field_plans[key] = plan
+        return plan
+
+    def transform(self, data: List[Dict[str, Any]], file_info: IDPSFileInfo) -> TransformationResult:
+        """
+        Transforme les lignes CSV nettoyées en lignes prêtes pour le repository IDPS
+
+        Args:
+            data: Données brutes du CSV (avec `_line_number`)
+            file_info: Informations sur le fichier
+
+        Returns:
+            TransformationResult dont `transformed_data` contient les lignes mappées
+        """
+        category = file_info.category
+        if category not in ("workflow", "error"):
+            # Catégorie inconnue : structure générique, comme `map_to_module_schema`
+            logger.warning(f"Catégorie inconnue: {category}, utilisation de la transformation en deux étapes")
+            result = self.data_transformation_service.transform(data, file_info)
+            result.transformed_data = self.idps_transformer.map_rows_to_module_schema(
+                result.transformed_data, file_info
+            )
+            return result
+
+        original_count = len(data)
+        transformed_data = []
+        source_rows = []
+        rejected_rows = []
+        row_issues = RowIssueAggregator(logger)
+
+        date_parser = self.data_transformation_service.timestamp_parser
+        date_parser.reset_stats()
+
+        if data:
+            header = tuple(key for key in data[0] if key not in SOURCE_FIELDS)
+            plan = self.get_field_plan(header, category)
+
+            # Colonnes de date lues par le modèle, parsées en une fois (format inféré sur les premières lignes)
+            parsed_dates = {
+                column: date_parser.parse_column([row.get(column) for row in data])
+                for column in plan.date_columns
+            }
+
+            map_row = self._map_error_row if category == "error" else self._map_workflow_row
+            ingestion_timestamp = datetime.now()
+            for index, row in enumerate(data):
+                try:
+                    transformed_data.append(map_row(row, index, plan, parsed_dates, file_info, ingestion_timestamp))
+                    source_rows.append(row)
+                except Exception as e:
+                    row_issues.record(row.get('_line_number', 'unknown'), e)
+                    rejected_rows.append(RejectedRow(
+                        row.get('_line_number'), f"{type(e).__name__}: {e}", row, row.get('_raw_line')
+                    ))
+        row_issues.log_summary(file_info.name)
+
+        transformed_count = len(transformed_data)
+        success_rate = (transformed_count / original_count * 100) if original_count > 0 else 0
+        logger.info(
+            f"Transformation terminée: {transformed_count}/{original_count} lignes "
+            f"({success_rate:.1f}% de succès)"
+        )
+
+        return TransformationResult(
+            transformed_data=transformed_data,
+            original_count=original_count,
+            transformed_count=transformed_count,
+            errors=row_issues.samples,
+            unparseable_dates=date_parser.unparseable_count,
+            error_count=row_issues.count,
+            source_rows=source_rows,
+            rejected_rows=rejected_rows
+        )
+
+    def _map_workflow_row(
+        self,
+        row: Dict[str, Any],
+        index: int,
+        plan: IDPSFieldPlan,
+        parsed_dates: Dict[str, List[Optional[datetime]]],
+        file_info: IDPSFileInfo,
+        ingestion_timestamp: datetime
+    ) -> Dict[str, Any]:
+        """Mappe une ligne CSV vers le modèle IDPSWorkflowEventModel"""
+        return {
+            "event_timestamp": self._event_timestamp(row, index, plan, parsed_dates),
+            "document_type": self._field_text(row, index, plan, parsed_dates, "document_type", ""),
+            "destination_code": self._field_text(row, index, plan, parsed_dates, "destination_code", ""),
+            "request_id": self._field_text(row, index, plan, parsed_dates, "request_id", ""),
+            "status": self.idps_transformer.workflow_status(file_info.file_type),
+            "file_name": file_info.name,
+            "ingested_at": ingestion_timestamp,
+        }
+
+    def _map_error_row(
+        self,
+        row: Dict[str, Any],
+        index: int,
+        plan: IDPSFieldPlan,
+        parsed_dates: Dict[str, List[Optional[datetime]]],
+        file_info: IDPSFileInfo,
+        ingestion_timestamp: datetime
+    ) -> Dict[str, Any]:
+        """Mappe une ligne CSV vers le modèle IDPSErrorEventModel"""
+        infos_comment = self._field_text(row, index, plan, parsed_dates, "comment", None)
+        return {
+            "event_timestamp": self._event_timestamp(row, index, plan, parsed_dates),
+            "document_type": self._field_text(row, index, plan, parsed_dates, "document_type", ""),
+            "destination_code": self._field_text(row, index, plan, parsed_dates, "destination_code", ""),
+            "request_id": self._field_text(row, index, plan, parsed_dates, "request_id", ""),
+            "service_name": self._field_text(row, index, plan, parsed_dates, "service_name", ""),
+            "error_category": self.idps_transformer.error_category(file_info.file_type),
+            "comment": self.idps_transformer._parse_comment(infos_comment),
+            "file_name": file_info.name,
+            "ingested_at": ingestion_timestamp,
+        }
+
+    def _event_timestamp(
+        self,
+        row: Dict[str, Any],
+        index: int,
+        plan: IDPSFieldPlan,
+        parsed_dates: Dict[str, List[Optional[datetime]]]
+    ) -> datetime:
+        """
+        Horodatage de l'événement : date déjà parsée par colonne, sinon parsing ISO de la valeur
+
+        Raises:
+            DataTransformationError: Si la valeur est absente ou non reconnue (ligne rejetée)
+        """
+        text, parsed = self._resolve_field(row, index, plan, parsed_dates, "event_timestamp")
+        if parsed is not None:
+            return parsed
+        return self.idps_transformer._parse_timestamp(text)
+
+    def _field_text(
+        self,
+        row: Dict[str, Any],
+        index: int,
+        plan: IDPSFieldPlan,
+        parsed_dates: Dict[str, List[Optional[datetime]]],
+        field_name: str,
+        default: Optional[str]
+    ) -> Optional[str]:
+        """Valeur textuelle d'un champ, telle que lue par `IDPSColumnPlan.get` après transformation générique"""
+        if field_name in plan.plain_fields:
+            return plan.column_plan.get(row, field_name, default)
+        text, parsed = self._resolve_field(row, index, plan, parsed_dates, field_name)
+        if parsed is not None:
+            return parsed.isoformat()
+        return default if text is None else text
+
+    @staticmethod
+    def _resolve_field(
+        row: Dict[str, Any],
+        index: int,
+        plan: IDPSFieldPlan,
+        parsed_dates: Dict[str, List[Optional[datetime]]],
+        field_name: str
+    ) -> Tuple[Optional[str], Optional[datetime]]:
+        """
+        Lit la valeur d'un champ en appliquant les règles de la transformation générique
+
+        Le JSON valide d'une colonne JSON prime sur la normalisation de date, comme dans
+        `DataTransformationService._transform_row`.
+
+        Returns:
+            (texte nettoyé, None), (None, datetime) si la valeur est une date reconnue, ou (None, None)
+        """
+        field_column = plan.field_columns[field_name]
+        if field_column is None:
+            return None, None
+        column, is_date, is_json = field_column
+        value = row.get(column)
+        if value and isinstance(value, str):
+            decoded = False
+            if is_json:
+                try:
+                    value = json.loads(value)
+                    decoded = True
+                except json.JSONDecodeError:
+                    pass
+            if is_date and not decoded:
+                parsed = parsed_dates[column][index]
+                if parsed is not None:
+                    return None, parsed
+        if value is None or value == "":
+            return None, None
+        return str(value).strip() or None, None
@@ -2,6 +2,8 @@
 Point d'entrée principal du micro-middleware IDPS
 """
 from middleware.idps.orchestrator import IDPSOrchestrator
+from middleware.idps.async_orchestrator import IDPSAsyncOrchestrator
+from middleware.idps.config.files_config import IDPSFilesConfig
 from middleware.utils.logger import setup_logger
 
 # Configuration du logger
@@ -17,8 +19,10 @@ def main():
     logger.info("=" * 60)
     
     try:
-        # Créer l'orchestrateur IDPS
-        orchestrator = IDPSOrchestrator()
+        # Créer l'orchestrateur IDPS (variante asyncio si ASYNC_INGESTION est activé)
+        files_config = IDPSFilesConfig.from_env()
+        orchestrator_class = IDPSAsyncOrchestrator if files_config.async_ingestion else IDPSOrchestrator
+        orchestrator = orchestrator_class(files_config=files_config)
         
         # Exécuter le processus d'ingestion
         logger.info("Démarrage du processus d'ingestion IDPS...")
@@ -27,6 +31,7 @@ def main():
         # Afficher un résumé
         if results:
             success_count = sum(1 for r in results if r.is_success)
+            partial_count = sum(1 for r in results if r.is_partial)
             error_count = sum(1 for r in results if r.is_error)
             total_rows = sum(r.rows_inserted for r in results)
             
@@ -34,6 +39,7 @@ def main():
             logger.info(f"Résumé de l'ingestion IDPS:")
             logger.info(f"  - Fichiers traités: {len(results)}")
             logger.info(f"  - Succès: {success_count}")
+            logger.info(f"  - Succès partiels (lignes rejetées): {partial_count}")
             logger.info(f"  - Erreurs: {error_count}")
             logger.info(f"  - Lignes insérées: {total_rows}")
             logger.info("=" * 60)
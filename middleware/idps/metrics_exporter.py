@@ -0,0 +1,157 @@
+"""
+Export des métriques d'ingestion IDPS au format texte Prometheus
+
+Le fichier produit est destiné au collecteur textfile de node_exporter
+(`--collector.textfile.directory`) : il est réécrit atomiquement à la fin de
+chaque exécution de `IDPSOrchestrator.run`.
+"""
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from middleware.idps.models.ingestion_result import IngestionResult
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'idps_ingestion'
+
+# (nom, type, aide) des métriques exportées
+_METRICS = (
+    ('stage_seconds', 'gauge', "Durée de chaque étape du pipeline lors de la dernière exécution"),
+    ('duration_seconds', 'gauge', "Durée totale du traitement des fichiers du type"),
+    ('rows_processed', 'gauge', "Nombre de lignes traitées"),
+    ('rows_inserted', 'gauge', "Nombre de lignes insérées"),
+    ('rows_rejected', 'gauge', "Nombre de lignes rejetées (mises en quarantaine)"),
+    ('rows_per_second', 'gauge', "Débit en lignes par seconde"),
+    ('bytes_per_second', 'gauge', "Débit en octets par seconde"),
+    ('file_size_bytes', 'gauge', "Taille cumulée des fichiers traités"),
+    ('peak_rss_bytes', 'gauge', "Pic de mémoire résidente relevé pendant le traitement"),
+    ('success', 'gauge', "1 si tous les fichiers du type ont été traités avec succès sans rejet, 0 sinon"),
+    ('last_run_timestamp_seconds', 'gauge', "Horodatage de la dernière exécution"),
+)
+
+
+def _escape_label_value(value: str) -> str:
+    """Échappe une valeur de label (antislash, guillemets, retours à la ligne)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Formate les labels Prometheus"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label_value(value)}"' for key, value in sorted(labels.items())) + '}'
+
+
+def _aggregate_by_file_type(results: Iterable[IngestionResult]) -> Dict[str, Dict[str, Any]]:
+    """
+    Agrège les résultats par type de fichier (une série par type, cardinalité bornée)
+
+    Durées, lignes et tailles sont cumulées, les débits recalculés sur les cumuls,
+    le pic mémoire est le maximum et le succès n'est vrai que si tous les fichiers ont réussi.
+    """
+    aggregates: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        aggregate = aggregates.setdefault(result.file_info.file_type, {
+            'rows_processed': 0,
+            'rows_inserted': 0,
+            'rows_rejected': 0,
+            'success': 1,
+            'duration_seconds': 0.0,
+            'file_size_bytes': 0,
+            'peak_rss_bytes': None,
+            'stage_seconds': {},
+        })
+        aggregate['rows_processed'] += result.rows_processed
+        aggregate['rows_inserted'] += result.rows_inserted
+        aggregate['rows_rejected'] += result.rows_rejected
+        aggregate['success'] = min(aggregate['success'], 1 if result.is_success else 0)
+
+        metrics = result.metrics
+        if metrics is None:
+            continue
+        aggregate['duration_seconds'] += metrics.total_time
+        aggregate['file_size_bytes'] += metrics.file_size_bytes
+        if metrics.peak_rss_bytes is not None:
+            aggregate['peak_rss_bytes'] = max(aggregate['peak_rss_bytes'] or 0, metrics.peak_rss_bytes)
+        for stage, seconds in metrics.stage_timings.items():
+            aggregate['stage_seconds'][stage] = aggregate['stage_seconds'].get(stage, 0.0) + seconds
+
+    for aggregate in aggregates.values():
+        duration = aggregate['duration_seconds']
+        aggregate['rows_per_second'] = aggregate['rows_processed'] / duration if duration else 0.0
+        aggregate['bytes_per_second'] = aggregate['file_size_bytes'] / duration if duration else 0.0
+    return aggregates
+
+
+def _collect_samples(results: Iterable[IngestionResult]) -> Dict[str, List[Tuple[Dict[str, str], float]]]:
+    """Regroupe les échantillons par métrique (une série par type de fichier, et par étape)"""
+    samples: Dict[str, List[Tuple[Dict[str, str], float]]] = {name: [] for name, _, _ in _METRICS}
+
+    for file_type, aggregate in _aggregate_by_file_type(results).items():
+        labels = {'file_type': file_type}
+        for stage, seconds in aggregate['stage_seconds'].items():
+            samples['stage_seconds'].append(({**labels, 'stage': stage}, seconds))
+        for name in (
+            'duration_seconds', 'rows_processed', 'rows_inserted', 'rows_rejected', 'rows_per_second',
+            'bytes_per_second', 'file_size_bytes', 'peak_rss_bytes', 'success'
+        ):
+            if aggregate[name] is not None:
+                samples[name].append((labels, aggregate[name]))
+
+    samples['last_run_timestamp_seconds'].append(({}, time.time()))
+    return samples
+
+
+def format_prometheus(results: Iterable[IngestionResult]) -> str:
+    """
+    Formate les résultats d'une exécution au format d'exposition texte Prometheus
+
+    Args:
+        results: Résultats d'ingestion (avec leurs métriques)
+
+    Returns:
+        Texte au format Prometheus
+    """
+    samples = _collect_samples(results)
+
+    lines = []
+    for name, metric_type, help_text in _METRICS:
+        if not samples[name]:
+            continue
+        full_name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        for labels, value in samples[name]:
+            lines.append(f"{full_name}{_format_labels(labels)} {float(value)!r}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus_textfile(results: Iterable[IngestionResult], path: Path) -> None:
+    """
+    Écrit les métriques dans un fichier texte Prometheus (remplacement atomique)
+
+    Args:
+        results: Résultats d'ingestion
+        path: Chemin du fichier `.prom`
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    content = format_prometheus(results)
+
+    # Écriture dans un fichier temporaire du même répertoire puis renommage :
+    # le collecteur ne lit jamais un fichier partiellement écrit
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+    logger.info(f"Métriques Prometheus écrites dans {path}")
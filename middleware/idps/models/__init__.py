@@ -7,11 +7,20 @@ from middleware.idps.models.file_info import IDPSFileInfo
 from middleware.idps.models.workflow_event_model import IDPSWorkflowEventModel
 from middleware.idps.models.error_event_model import IDPSErrorEventModel
 from middleware.idps.models.audit_log_model import IDPSAuditLogModel
+from middleware.idps.models.schema_version_model import IDPSSchemaVersionModel
+from middleware.idps.models.ingestion_metrics_model import IDPSIngestionMetricsModel
+from middleware.idps.models.ingestion_metrics import IngestionMetrics, INGESTION_STAGES
+from middleware.idps.models.event_page import EventPage
 
 __all__ = [
     'IDPSFileInfo',
     'IDPSWorkflowEventModel',
     'IDPSErrorEventModel',
     'IDPSAuditLogModel',
+    'IDPSSchemaVersionModel',
+    'IDPSIngestionMetricsModel',
+    'IngestionMetrics',
+    'INGESTION_STAGES',
+    'EventPage',
 ]
 
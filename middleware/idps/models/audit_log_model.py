@@ -1,9 +1,9 @@
 """
 Modèle SQLAlchemy pour la table idps.ingestion_audit_log
 """
-from sqlalchemy import Column, BigInteger, String, Date, DateTime, Integer, Text
+from sqlalchemy import Column, String, Date, DateTime, Integer, Text
 
-from middleware.idps.config.sqlalchemy_config import Base
+from middleware.idps.config.sqlalchemy_config import Base, BigIntegerPrimaryKey
 
 
 class IDPSAuditLogModel(Base):
@@ -12,13 +12,13 @@ class IDPSAuditLogModel(Base):
     __tablename__ = 'ingestion_audit_log'
     __table_args__ = {'schema': 'idps'}
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPrimaryKey, primary_key=True, autoincrement=True)
     file_name = Column(String(255), nullable=False, unique=True, index=True)
     file_type = Column(String(50), nullable=False)
     file_date = Column(Date, nullable=False, index=True)
     records_expected = Column(Integer, nullable=False, default=0)
     records_inserted = Column(Integer, nullable=False, default=0)
-    status = Column(String(20), nullable=False, index=True)  # SUCCESS, PARTIAL_SUCCESS, FAILED
+    status = Column(String(20), nullable=False, index=True)  # success, partial_success, error
     error_message = Column(Text, nullable=True)
     started_at = Column(DateTime(timezone=True), nullable=False, index=True)
     ended_at = Column(DateTime(timezone=True), nullable=True, index=True)
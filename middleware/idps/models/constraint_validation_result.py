@@ -0,0 +1,28 @@
+"""
+Lignes rejetées et résultat de la validation des lignes mappées contre les contraintes des modèles IDPS
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Champs internes ajoutés à chaque ligne lue (hors colonnes du CSV)
+SOURCE_FIELDS = ('_line_number', '_raw_line')
+
+
+@dataclass
+class RejectedRow:
+    """Ligne écartée du chargement, avec le motif du rejet"""
+    line_number: Any  # Numéro de ligne physique dans le fichier source (None si inconnu)
+    reason: str
+    data: Dict[str, Any]  # Valeurs brutes de la ligne CSV (avec `_line_number` et `_raw_line`)
+    raw_line: Optional[str] = None  # Texte source de la ligne, tel quel (None si inconnu)
+
+
+@dataclass
+class ConstraintValidationResult:
+    """Lignes conformes aux contraintes des colonnes et lignes rejetées"""
+    valid_data: List[Dict[str, Any]]
+    rejected_rows: List[RejectedRow] = field(default_factory=list)
+
+    @property
+    def rejected_count(self) -> int:
+        return len(self.rejected_rows)
@@ -1,19 +1,31 @@
 """
 Modèle SQLAlchemy pour la table idps.error_events
 """
-from sqlalchemy import Column, BigInteger, String, DateTime, Text
+from sqlalchemy import Column, String, DateTime, Index, Text
 from datetime import datetime
 
-from middleware.idps.config.sqlalchemy_config import Base
+from middleware.idps.config.sqlalchemy_config import Base, BigIntegerPrimaryKey
 
 
 class IDPSErrorEventModel(Base):
     """Modèle SQLAlchemy pour la table idps.error_events"""
 
     __tablename__ = 'error_events'
-    __table_args__ = {'schema': 'idps'}
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # Clé naturelle d'un événement : une ré-ingestion du même fichier n'insère aucun doublon
+    NATURAL_KEY = ('request_id', 'error_category', 'service_name', 'event_timestamp', 'file_name')
+
+    # Clé de partitionnement par plage de dates (PostgreSQL, voir `config.partitioning`)
+    PARTITION_COLUMN = 'event_timestamp'
+
+    __table_args__ = (
+        Index('uq_error_events_natural_key', *NATURAL_KEY, unique=True),
+        # Ordre de la pagination par curseur (voir `repository.event_query`)
+        Index('ix_error_events_ingested_at_id', 'ingested_at', 'id'),
+        {'schema': 'idps'},
+    )
+
+    id = Column(BigIntegerPrimaryKey, primary_key=True, autoincrement=True)
     event_timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
     document_type = Column(String(10), nullable=False)
     destination_code = Column(String(20), nullable=False, index=True)
@@ -0,0 +1,16 @@
+"""
+Page d'événements IDPS lue par pagination par curseur (keyset)
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class EventPage:
+    """Page d'événements et curseur de la page suivante"""
+    events: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None  # None : dernière page
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
@@ -17,6 +17,7 @@ class IDPSFileInfo:
     size: int
     category: str  # 'workflow' ou 'error'
     ingestion_timestamp: Optional[datetime] = None
+    fingerprint: Optional[str] = None  # Empreinte du contenu (registre des fichiers traités)
     
     @property
     def module(self) -> str:
@@ -33,6 +34,7 @@ class IDPSFileInfo:
             'size': self.size,
             'module': self.module,
             'category': self.category,
-            'ingestion_timestamp': self.ingestion_timestamp.isoformat() if self.ingestion_timestamp else None
+            'ingestion_timestamp': self.ingestion_timestamp.isoformat() if self.ingestion_timestamp else None,
+            'fingerprint': self.fingerprint
         }
 
@@ -0,0 +1,83 @@
+"""
+Métriques de performance d'une ingestion IDPS (durées par étape, débits, mémoire)
+"""
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows : pic de mémoire résidente indisponible
+    resource = None
+
+# Étapes mesurées du pipeline, dans l'ordre d'exécution
+INGESTION_STAGES = (
+    'encoding_detection',
+    'csv_read',
+    'schema_validation',
+    'transformation',
+    'mapping',  # Mesurée avec 'transformation' par l'orchestrateur (transformation en une passe)
+    'load',
+    'archive',
+    'audit',
+)
+
+
+def current_peak_rss_bytes() -> Optional[int]:
+    """Retourne le pic de mémoire résidente du processus courant, en octets (None si indisponible)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est exprimé en octets sous macOS, en kilo-octets sous Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@dataclass
+class IngestionMetrics:
+    """Durées par étape et débits du traitement d'un fichier IDPS"""
+    file_size_bytes: int = 0
+    rows_processed: int = 0
+    total_time: float = 0.0
+    peak_rss_bytes: Optional[int] = None
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Mesure la durée du bloc et l'ajoute à l'étape `stage`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.perf_counter() - start)
+
+    def add_stage_time(self, stage: str, seconds: float) -> None:
+        """Ajoute une durée à une étape (cumulée si l'étape est exécutée par blocs)"""
+        self.stage_timings[stage] = self.stage_timings.get(stage, 0.0) + seconds
+
+    def record_peak_rss(self) -> None:
+        """Enregistre le pic de mémoire résidente du processus courant (maximum des relevés)"""
+        peak = current_peak_rss_bytes()
+        if peak is not None:
+            self.peak_rss_bytes = max(self.peak_rss_bytes or 0, peak)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_processed / self.total_time if self.total_time else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.file_size_bytes / self.total_time if self.total_time else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit les métriques en dictionnaire"""
+        return {
+            'file_size_bytes': self.file_size_bytes,
+            'rows_processed': self.rows_processed,
+            'total_time': self.total_time,
+            'rows_per_second': self.rows_per_second,
+            'bytes_per_second': self.bytes_per_second,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'stage_timings': dict(self.stage_timings),
+        }
@@ -0,0 +1,47 @@
+"""
+Modèle SQLAlchemy pour la table idps.ingestion_metrics
+"""
+from sqlalchemy import Column, BigInteger, String, DateTime, Float, Integer
+from datetime import datetime
+
+from middleware.idps.config.sqlalchemy_config import Base, BigIntegerPrimaryKey
+
+
+class IDPSIngestionMetricsModel(Base):
+    """
+    Modèle SQLAlchemy pour la table idps.ingestion_metrics
+
+    Une ligne par traitement de fichier (historique conservé entre les exécutions),
+    à côté de idps.ingestion_audit_log : durées par étape, débits et pic mémoire.
+    """
+
+    __tablename__ = 'ingestion_metrics'
+    __table_args__ = {'schema': 'idps'}
+
+    id = Column(BigIntegerPrimaryKey, primary_key=True, autoincrement=True)
+    file_name = Column(String(255), nullable=False, index=True)
+    file_type = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False)
+    recorded_at = Column(DateTime(timezone=True), nullable=False, default=datetime.now, index=True)
+    rows_processed = Column(Integer, nullable=False, default=0)
+    file_size_bytes = Column(BigInteger, nullable=False, default=0)
+    total_seconds = Column(Float, nullable=False, default=0.0)
+    rows_per_second = Column(Float, nullable=False, default=0.0)
+    bytes_per_second = Column(Float, nullable=False, default=0.0)
+    peak_rss_bytes = Column(BigInteger, nullable=True)
+
+    # Durées par étape (NULL si l'étape n'a pas été exécutée, ex: fichier en erreur)
+    encoding_detection_seconds = Column(Float, nullable=True)
+    csv_read_seconds = Column(Float, nullable=True)
+    schema_validation_seconds = Column(Float, nullable=True)
+    transformation_seconds = Column(Float, nullable=True)
+    mapping_seconds = Column(Float, nullable=True)
+    load_seconds = Column(Float, nullable=True)
+    archive_seconds = Column(Float, nullable=True)
+    audit_seconds = Column(Float, nullable=True)
+
+    def __repr__(self):
+        return (
+            f"<IDPSIngestionMetrics(id={self.id}, file_name='{self.file_name}', "
+            f"total_seconds={self.total_seconds}, rows_per_second={self.rows_per_second})>"
+        )
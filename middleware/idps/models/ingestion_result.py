@@ -6,22 +6,30 @@ from datetime import datetime
 from typing import Optional
 
 from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.models.ingestion_metrics import IngestionMetrics
 
 
 @dataclass
 class IngestionResult:
     """Résultat d'une ingestion complète pour IDPS"""
     file_info: IDPSFileInfo
-    status: str  # 'success', 'error', 'partial'
+    status: str  # 'success', 'partial_success' (lignes rejetées), 'error'
     rows_processed: int
     rows_inserted: int
     error_message: Optional[str] = None
     processing_time: Optional[float] = None
+    metrics: Optional[IngestionMetrics] = None
+    rows_rejected: int = 0  # Lignes écartées avant chargement (contraintes des colonnes)
+    rows_duplicate: int = 0  # Lignes déjà présentes en base (même clé naturelle), ignorées
 
     @property
     def is_success(self) -> bool:
         return self.status == 'success'
 
+    @property
+    def is_partial(self) -> bool:
+        return self.status == 'partial_success'
+
     @property
     def is_error(self) -> bool:
         return self.status == 'error'
@@ -0,0 +1,28 @@
+"""
+Résultat de la préparation d'un fichier IDPS (validation + transformation, avant chargement)
+"""
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any
+
+from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.models.ingestion_metrics import IngestionMetrics
+from middleware.idps.models.constraint_validation_result import RejectedRow
+
+
+@dataclass
+class PreparationResult:
+    """Résultat de la préparation d'un fichier IDPS, prêt pour le chargement en base"""
+    file_info: IDPSFileInfo
+    start_time: float
+    data: Optional[List[Dict[str, Any]]] = None
+    rows_processed: int = 0
+    rows_transformed: int = 0
+    unparseable_timestamps: int = 0
+    error_message: Optional[str] = None
+    metrics: Optional[IngestionMetrics] = None
+    # Lignes écartées du chargement (contraintes des colonnes non respectées)
+    rejected_rows: List[RejectedRow] = field(default_factory=list)
+
+    @property
+    def is_error(self) -> bool:
+        return self.error_message is not None
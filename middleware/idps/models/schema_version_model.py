@@ -0,0 +1,20 @@
+"""
+Modèle SQLAlchemy pour la table idps.schema_version
+"""
+from sqlalchemy import Column, Integer, DateTime
+from datetime import datetime
+
+from middleware.idps.config.sqlalchemy_config import Base
+
+
+class IDPSSchemaVersionModel(Base):
+    """Modèle SQLAlchemy pour la table idps.schema_version (versions de schéma appliquées)"""
+
+    __tablename__ = 'schema_version'
+    __table_args__ = {'schema': 'idps'}
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    applied_at = Column(DateTime(timezone=True), nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f"<IDPSSchemaVersion(version={self.version}, applied_at={self.applied_at})>"
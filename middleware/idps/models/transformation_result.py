@@ -4,6 +4,8 @@ Résultat de la transformation des données IDPS
 from dataclasses import dataclass, field
 from typing import List, Dict, Any
 
+from middleware.idps.models.constraint_validation_result import RejectedRow
+
 
 @dataclass
 class TransformationResult:
@@ -11,7 +13,12 @@ class TransformationResult:
     transformed_data: List[Dict[str, Any]]
     original_count: int
     transformed_count: int
-    errors: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)  # Premières erreurs uniquement (plafonné)
+    unparseable_dates: int = 0
+    error_count: int = 0  # Nombre total de lignes en erreur
+    # Ligne CSV source de chaque ligne transformée (même ordre que transformed_data, si connue)
+    source_rows: List[Dict[str, Any]] = field(default_factory=list)
+    rejected_rows: List[RejectedRow] = field(default_factory=list)  # Lignes en erreur (valeurs brutes et motif)
 
     @property
     def success_rate(self) -> float:
@@ -1,9 +1,11 @@
 """
 Résultat de la validation d'un fichier IDPS
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Any
 
+from middleware.idps.models.constraint_validation_result import RejectedRow
+
 
 @dataclass
 class ValidationResult:
@@ -13,6 +15,10 @@ class ValidationResult:
     data: Optional[List[Dict[str, Any]]] = None
     encoding: Optional[str] = None
     line_count: int = 0
+    # Durées des étapes de validation (encoding_detection, csv_read), en secondes
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    # Lignes mal formées écartées à la lecture (nombre de champs incorrect)
+    rejected_rows: List[RejectedRow] = field(default_factory=list)
 
     def __bool__(self) -> bool:
         return self.is_valid
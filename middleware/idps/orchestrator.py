@@ -3,20 +3,32 @@ Orchestrateur pour le micro-middleware IDPS
 Orchestre le processus complet d'ingestion
 """
 import logging
+import multiprocessing
 import time
-from typing import List
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
 
 from middleware.idps.services.file_detection_service import FileDetectionService
 from middleware.idps.services.file_validation_service import FileValidationService
 from middleware.idps.services.data_transformation_service import DataTransformationService
 from middleware.idps.services.file_archive_service import FileArchiveService
+from middleware.idps.services.reject_file_service import RejectFileService
 from middleware.idps.validator import IDPSValidator
 from middleware.idps.transformer import IDPSTransformer
+from middleware.idps.fused_transformer import IDPSFusedTransformer
+from middleware.idps.constraint_validator import IDPSConstraintValidator
 from middleware.idps.repository.database_repository import IDPSDatabaseRepository
 from middleware.idps.models.file_info import IDPSFileInfo
 from middleware.idps.models.ingestion_result import IngestionResult
-from middleware.exceptions import MiddlewareException
+from middleware.idps.models.preparation_result import PreparationResult
+from middleware.idps.models.transformation_result import TransformationResult
+from middleware.idps.models.constraint_validation_result import RejectedRow
+from middleware.idps.models.ingestion_metrics import IngestionMetrics
+from middleware.idps.metrics_exporter import write_prometheus_textfile
+from middleware.idps.config.files_config import IDPSFilesConfig
+from middleware.idps.config.database_config import IDPSDatabaseConfig
+from middleware.exceptions import MiddlewareException, FileValidationError, ArchiveError
 
 logger = logging.getLogger(__name__)
 
@@ -27,24 +39,46 @@ class IDPSOrchestrator:
     Orchestre le processus complet : détection, validation, transformation, chargement, archivage
     """
     
-    def __init__(self):
-        """Initialise l'orchestrateur IDPS"""
-        from middleware.idps.config.files_config import IDPSFilesConfig
-        from middleware.idps.config.database_config import IDPSDatabaseConfig
+    def __init__(
+        self,
+        files_config: Optional[IDPSFilesConfig] = None,
+        db_config: Optional[IDPSDatabaseConfig] = None
+    ):
+        """
+        Initialise l'orchestrateur IDPS
         
-        self.files_config = IDPSFilesConfig.from_env()
-        self.db_config = IDPSDatabaseConfig.from_env()
+        Args:
+            files_config: Configuration des fichiers (charge depuis env si None)
+            db_config: Configuration de la base de données (charge depuis env si None)
+        """
+        self.files_config = files_config or IDPSFilesConfig.from_env()
+        self.db_config = db_config or IDPSDatabaseConfig.from_env()
         
         # Services
         self.file_detection_service = FileDetectionService(self.files_config)
         self.file_validation_service = FileValidationService(self.files_config)
         self.data_transformation_service = DataTransformationService(self.files_config)
         self.file_archive_service = FileArchiveService(self.files_config)
+        self.reject_file_service = RejectFileService(self.files_config)
         
         # Services spécifiques IDPS
         self.idps_validator = IDPSValidator()
         self.idps_transformer = IDPSTransformer()
-        self.idps_repository = IDPSDatabaseRepository(self.db_config)
+        # Transformation générique et mapping IDPS en une seule passe
+        self.fused_transformer = IDPSFusedTransformer(self.data_transformation_service, self.idps_transformer)
+        self.constraint_validator = IDPSConstraintValidator()
+        self._idps_repository = None
+    
+    @property
+    def idps_repository(self) -> IDPSDatabaseRepository:
+        """Repository IDPS (créé au premier accès : les workers de préparation n'en ont pas besoin)"""
+        if self._idps_repository is None:
+            self._idps_repository = IDPSDatabaseRepository(self.db_config)
+        return self._idps_repository
+    
+    @idps_repository.setter
+    def idps_repository(self, repository: IDPSDatabaseRepository) -> None:
+        self._idps_repository = repository
     
     def process_file(self, file_info: IDPSFileInfo) -> IngestionResult:
         """
@@ -56,120 +90,522 @@ class IDPSOrchestrator:
         Returns:
             IngestionResult contenant le résultat du traitement
         """
+        if self.files_config.streaming_enabled:
+            start_time = time.time()
+            logger.info(f"Début du traitement du fichier IDPS: {file_info.path.name}")
+            self.idps_transformer.timestamp_parser.reset_stats()
+            metrics = IngestionMetrics(file_size_bytes=file_info.size)
+            try:
+                return self._process_file_streaming(file_info, start_time, metrics)
+            except Exception as e:
+                return self._handle_error(file_info, self._describe_exception(file_info, e), 0, metrics, start_time)
+        
+        prepared = self.prepare_file(file_info)
+        return self.load_prepared_file(prepared)
+    
+    def prepare_file(self, file_info: IDPSFileInfo) -> PreparationResult:
+        """
+        Prépare un fichier sans accès à la base : validation puis transformation et
+        mapping IDPS en une passe (étapes CPU, exécutables dans un processus worker)
+        
+        Args:
+            file_info: Informations sur le fichier à traiter
+        
+        Returns:
+            PreparationResult contenant les lignes mappées ou le message d'erreur
+        """
         start_time = time.time()
         file_path = file_info.path
+        metrics = IngestionMetrics(file_size_bytes=file_info.size)
         
         logger.info(f"Début du traitement du fichier IDPS: {file_path.name}")
+        self.idps_transformer.timestamp_parser.reset_stats()
         
         try:
-            # 1. Validation générique
+            # 1. Validation générique (détection d'encodage + lecture CSV)
             validation_result = self.file_validation_service.validate_file(file_path, file_info)
+            for stage, seconds in validation_result.stage_timings.items():
+                metrics.add_stage_time(stage, seconds)
             if not validation_result.is_valid:
                 logger.error(f"Validation échouée pour {file_path.name}: {validation_result.error_message}")
-                return self._handle_error(file_info, validation_result.error_message, 0)
+                return PreparationResult(
+                    file_info, start_time,
+                    rows_processed=len(validation_result.rejected_rows),
+                    error_message=validation_result.error_message,
+                    metrics=metrics,
+                    rejected_rows=validation_result.rejected_rows
+                )
             
             # 2. Validation spécifique IDPS
-            schema_error = self.idps_validator.validate_schema(validation_result.data, file_info)
+            with metrics.measure('schema_validation'):
+                schema_error = self.idps_validator.validate_schema(validation_result.data, file_info)
             if schema_error:
                 logger.error(f"Validation de schéma IDPS échouée pour {file_path.name}: {schema_error}")
-                return self._handle_error(file_info, f"Schéma invalide: {schema_error}", 0)
+                return PreparationResult(
+                    file_info, start_time, error_message=f"Schéma invalide: {schema_error}", metrics=metrics
+                )
+            
+            # Valeurs obligatoires absentes ou vides : lignes rejetées avant transformation
+            with metrics.measure('schema_validation'):
+                values_result = self.idps_validator.reject_missing_values(validation_result.data, file_info)
             
-            # 3. Transformation générique
-            transformation_result = self.data_transformation_service.transform(validation_result.data, file_info)
+            # 3. Transformation générique et mapping IDPS (une seule passe)
+            with metrics.measure('transformation'):
+                transformation_result = self.fused_transformer.transform(values_result.valid_data, file_info)
+            self._add_upstream_rejects(
+                transformation_result, validation_result.rejected_rows + values_result.rejected_rows
+            )
             if not transformation_result.transformed_data:
                 logger.warning(f"Aucune donnée transformée pour {file_path.name}")
-                return self._handle_error(
-                    file_info, "Aucune donnée transformée",
-                    transformation_result.original_count
+                return PreparationResult(
+                    file_info, start_time,
+                    rows_processed=transformation_result.original_count,
+                    error_message="Aucune donnée transformée",
+                    metrics=metrics,
+                    rejected_rows=transformation_result.rejected_rows
+                )
+            
+            # 4. Contraintes des colonnes des modèles : les lignes fautives sont rejetées, pas le fichier
+            with metrics.measure('schema_validation'):
+                constraint_result = self.constraint_validator.validate(
+                    transformation_result.transformed_data, file_info.category, transformation_result.source_rows
+                )
+            rejected_rows = transformation_result.rejected_rows + constraint_result.rejected_rows
+            if not constraint_result.valid_data:
+                logger.error(f"Toutes les lignes de {file_path.name} ont été rejetées")
+                return PreparationResult(
+                    file_info, start_time,
+                    rows_processed=transformation_result.original_count,
+                    rows_transformed=transformation_result.transformed_count,
+                    error_message="Toutes les lignes ont été rejetées (contraintes des colonnes)",
+                    metrics=metrics,
+                    rejected_rows=rejected_rows
                 )
             
-            # 4. Transformation spécifique IDPS
-            final_data = []
-            for row in transformation_result.transformed_data:
-                mapped_row = self.idps_transformer.map_to_module_schema(row, file_info)
-                final_data.append(mapped_row)
+            # Pic mémoire relevé ici : en traitement parallèle, la préparation s'exécute dans un worker
+            metrics.record_peak_rss()
+            return PreparationResult(
+                file_info, start_time,
+                data=constraint_result.valid_data,
+                rows_processed=transformation_result.original_count,
+                rows_transformed=transformation_result.transformed_count,
+                unparseable_timestamps=self.idps_transformer.timestamp_parser.unparseable_count,
+                metrics=metrics,
+                rejected_rows=rejected_rows
+            )
+            
+        except Exception as e:
+            return PreparationResult(
+                file_info, start_time, error_message=self._describe_exception(file_info, e), metrics=metrics
+            )
+    
+    def load_prepared_file(self, prepared: PreparationResult) -> IngestionResult:
+        """
+        Charge un fichier préparé en base puis finalise son traitement (archivage, audit)
+        
+        Args:
+            prepared: Résultat de `prepare_file`
+        
+        Returns:
+            IngestionResult contenant le résultat du traitement
+        """
+        file_info = prepared.file_info
+        file_path = file_info.path
+        metrics = prepared.metrics or IngestionMetrics(file_size_bytes=file_info.size)
+        
+        if prepared.is_error:
+            if prepared.rejected_rows:
+                # Motifs des rejets conservés pour le diagnostic ; un échec d'écriture est déjà journalisé
+                try:
+                    self.reject_file_service.write_rejects(file_info, prepared.rejected_rows)
+                except ArchiveError:
+                    pass
+            return self._handle_error(
+                file_info, prepared.error_message, prepared.rows_processed, metrics, prepared.start_time
+            )
+        
+        try:
+            # Mise en quarantaine des lignes rejetées (avant chargement : aucune ligne n'est perdue)
+            if prepared.rejected_rows:
+                with metrics.measure('archive'):
+                    self.reject_file_service.write_rejects(file_info, prepared.rejected_rows)
             
             # 5. Chargement en base via le repository IDPS
-            rows_inserted = self.idps_repository.insert_events(final_data, file_info.category)
+            with metrics.measure('load'):
+                rows_inserted = self.idps_repository.insert_events(
+                    prepared.data, file_info.category, self.idps_repository.use_staging(file_info.size)
+                )
             
-            if rows_inserted == 0:
+            if not prepared.data:
                 logger.warning(f"Aucune ligne insérée pour {file_path.name}")
                 return self._handle_error(
-                    file_info, "Aucune ligne insérée",
-                    transformation_result.transformed_count
+                    file_info, "Aucune ligne insérée", prepared.rows_transformed, metrics, prepared.start_time
                 )
             
-            # 6. Marquer le fichier comme traité AVANT l'archivage (le fichier sera déplacé)
-            self.file_detection_service.mark_as_processed(file_path, file_info)
+            # Lignes déjà présentes en base (ré-ingestion) : ignorées, le fichier reste un succès
+            return self._handle_success(
+                file_info, prepared.rows_processed, rows_inserted,
+                prepared.start_time, prepared.unparseable_timestamps, metrics,
+                rows_rejected=len(prepared.rejected_rows),
+                rows_duplicate=len(prepared.data) - rows_inserted
+            )
             
-            # 7. Archivage
-            file_info.ingestion_timestamp = datetime.now()
-            self.file_archive_service.archive_file(file_path, file_info, success=True)
+        except Exception as e:
+            return self._handle_error(
+                file_info, self._describe_exception(file_info, e), 0, metrics, prepared.start_time
+            )
+    
+    def _describe_exception(self, file_info: IDPSFileInfo, error: Exception) -> str:
+        """Journalise une exception de traitement et retourne le message d'erreur à enregistrer"""
+        file_name = file_info.path.name
+        if isinstance(error, MiddlewareException):
+            logger.error(f"Erreur middleware lors du traitement de {file_name}: {error}")
+            return str(error)
+        logger.error(f"Erreur inattendue lors du traitement de {file_name}: {error}", exc_info=True)
+        return f"Erreur inattendue: {str(error)}"
+    
+    def _process_file_streaming(
+        self,
+        file_info: IDPSFileInfo,
+        start_time: float,
+        metrics: IngestionMetrics
+    ) -> IngestionResult:
+        """
+        Traite un fichier en flux : validation, transformation, mapping et chargement
+        sont chaînés bloc par bloc, le fichier n'est jamais entièrement en mémoire
+        """
+        file_path = file_info.path
+        counts = {'rows_processed': 0, 'rows_transformed': 0, 'rows_rejected': 0, 'rows_loaded': 0}
+        
+        batches = self._iter_mapped_batches(file_info, counts, metrics)
+        # Le chargement consomme le générateur : on retire de sa durée celle des étapes amont
+        upstream_before = sum(metrics.stage_timings.values())
+        load_start = time.perf_counter()
+        rows_inserted = self.idps_repository.insert_event_batches(
+            batches, file_info.category, self.idps_repository.use_staging(file_info.size)
+        )
+        upstream_time = sum(metrics.stage_timings.values()) - upstream_before
+        metrics.add_stage_time('load', time.perf_counter() - load_start - upstream_time)
+        
+        if counts['rows_transformed'] == 0:
+            logger.warning(f"Aucune donnée transformée pour {file_path.name}")
+            return self._handle_error(
+                file_info, "Aucune donnée transformée", counts['rows_processed'], metrics, start_time
+            )
+        
+        if counts['rows_loaded'] == 0:
+            logger.warning(f"Aucune ligne insérée pour {file_path.name}")
+            return self._handle_error(
+                file_info, "Aucune ligne insérée", counts['rows_transformed'], metrics, start_time
+            )
+        
+        return self._handle_success(
+            file_info, counts['rows_processed'], rows_inserted, start_time,
+            self.idps_transformer.timestamp_parser.unparseable_count, metrics,
+            rows_rejected=counts['rows_rejected'],
+            rows_duplicate=counts['rows_loaded'] - rows_inserted
+        )
+    
+    def _iter_mapped_batches(
+        self,
+        file_info: IDPSFileInfo,
+        counts: Dict[str, int],
+        metrics: Optional[IngestionMetrics] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Produit les blocs de lignes mappées au schéma IDPS pour un fichier
+        
+        Args:
+            file_info: Informations sur le fichier à traiter
+            counts: Compteurs mis à jour au fil des blocs (rows_processed, rows_transformed, rows_rejected,
+                rows_loaded)
+            metrics: Métriques dans lesquelles cumuler les durées de chaque étape
+        
+        Yields:
+            Blocs de lignes prêtes pour le repository
+        """
+        file_path = file_info.path
+        metrics = metrics or IngestionMetrics(file_size_bytes=file_info.size)
+        rows_read = 0
+        
+        with metrics.measure('encoding_detection'):
+            encoding = self.file_validation_service.detect_encoding(file_path)
+        
+        # Lignes mal formées, signalées par la lecture avant le bloc qui les suit
+        malformed_rows: List[RejectedRow] = []
+        chunks = self.file_validation_service.iter_csv_chunks(file_path, encoding, rejected_rows=malformed_rows)
+        while True:
+            with metrics.measure('csv_read'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            rows_read += len(chunk)
+            
+            # Validation spécifique IDPS
+            with metrics.measure('schema_validation'):
+                schema_error = self.idps_validator.validate_schema(chunk, file_info)
+            if schema_error:
+                logger.error(f"Validation de schéma IDPS échouée pour {file_path.name}: {schema_error}")
+                raise FileValidationError(f"Schéma invalide: {schema_error}", file_path=str(file_path))
+            with metrics.measure('schema_validation'):
+                values_result = self.idps_validator.reject_missing_values(chunk, file_info)
+            
+            # Transformation générique et mapping IDPS (une seule passe)
+            with metrics.measure('transformation'):
+                transformation_result = self.fused_transformer.transform(values_result.valid_data, file_info)
+            self._add_upstream_rejects(transformation_result, malformed_rows + values_result.rejected_rows)
+            malformed_rows.clear()
+            counts['rows_processed'] += transformation_result.original_count
+            counts['rows_transformed'] += transformation_result.transformed_count
+            
+            # Contraintes des colonnes des modèles : les lignes fautives sont rejetées, pas le fichier
+            with metrics.measure('schema_validation'):
+                constraint_result = self.constraint_validator.validate(
+                    transformation_result.transformed_data, file_info.category, transformation_result.source_rows
+                )
             
-            # 8. Log d'audit via le repository IDPS
-            # TODO: utiliser records_expected / records_inserted plus précis
+            # Lignes rejetées du bloc ajoutées au fichier de rejet, en un seul lot
+            self._write_chunk_rejects(
+                file_info, transformation_result.rejected_rows + constraint_result.rejected_rows, counts, metrics
+            )
+            counts['rows_loaded'] += len(constraint_result.valid_data)
+            yield constraint_result.valid_data
+        
+        # Lignes mal formées en fin de fichier, après le dernier bloc
+        counts['rows_processed'] += len(malformed_rows)
+        self._write_chunk_rejects(file_info, malformed_rows, counts, metrics)
+        
+        if rows_read == 0:
+            if malformed_rows:
+                raise FileValidationError(
+                    f"Aucune ligne exploitable: {len(malformed_rows)} ligne(s) mal formée(s)", file_path=str(file_path)
+                )
+            raise FileValidationError(
+                "Le fichier CSV est vide ou ne contient aucune donnée", file_path=str(file_path)
+            )
+        logger.info(f"Fichier lu en flux: {file_path.name} ({rows_read} lignes)")
+    
+    def _write_chunk_rejects(
+        self,
+        file_info: IDPSFileInfo,
+        rejected_rows: List[RejectedRow],
+        counts: Dict[str, int],
+        metrics: IngestionMetrics
+    ) -> None:
+        """Ajoute les lignes rejetées d'un bloc au fichier de rejet (créé au premier lot) et les compte"""
+        if not rejected_rows:
+            return
+        with metrics.measure('archive'):
+            self.reject_file_service.write_rejects(file_info, rejected_rows, append=counts['rows_rejected'] > 0)
+        counts['rows_rejected'] += len(rejected_rows)
+    
+    @staticmethod
+    def _add_upstream_rejects(transformation_result: TransformationResult, rejected_rows: List[RejectedRow]) -> None:
+        """
+        Reporte dans le résultat de transformation les lignes écartées avant elle
+        
+        Ces lignes comptent parmi les lignes lues (`original_count`, d'où les lignes
+        attendues de l'audit) et figurent, en tête, parmi les lignes rejetées.
+        """
+        if rejected_rows:
+            transformation_result.original_count += len(rejected_rows)
+            transformation_result.rejected_rows = rejected_rows + transformation_result.rejected_rows
+    
+    def _handle_success(
+        self,
+        file_info: IDPSFileInfo,
+        rows_processed: int,
+        rows_inserted: int,
+        start_time: float,
+        unparseable_timestamps: int = 0,
+        metrics: Optional[IngestionMetrics] = None,
+        rows_rejected: int = 0,
+        rows_duplicate: int = 0
+    ) -> IngestionResult:
+        """
+        Finalise un traitement réussi : marquage, archivage, log d'audit et métriques
+        
+        Un fichier dont certaines lignes ont été rejetées (mises en quarantaine dans
+        le fichier de rejet) est archivé comme traité avec le statut 'partial_success'.
+        Les lignes déjà présentes en base (ré-ingestion) n'affectent pas le statut.
+        """
+        metrics = metrics or IngestionMetrics(file_size_bytes=file_info.size)
+        status = self._archive_success(file_info, metrics, unparseable_timestamps, rows_rejected, rows_duplicate)
+        
+        # Log d'audit via le repository IDPS (lignes du fichier / lignes réellement insérées)
+        with metrics.measure('audit'):
             self.idps_repository.insert_audit_log(
                 file_info=file_info,
-                status='success',
-                rows_processed=transformation_result.original_count,
-                error_message=None,
+                status=status,
+                rows_processed=rows_processed,
+                error_message=self._audit_note(rows_rejected, rows_duplicate),
+                records_inserted=rows_inserted,
             )
-            
-            processing_time = time.time() - start_time
+        
+        processing_time = time.time() - start_time
+        self._record_metrics(file_info, status, metrics, rows_processed, processing_time)
+        return self._success_result(
+            file_info, status, rows_processed, rows_inserted, processing_time, metrics, rows_rejected, rows_duplicate
+        )
+    
+    def _archive_success(
+        self,
+        file_info: IDPSFileInfo,
+        metrics: IngestionMetrics,
+        unparseable_timestamps: int,
+        rows_rejected: int,
+        rows_duplicate: int
+    ) -> str:
+        """
+        Marque le fichier comme traité et l'archive (étapes fichiers d'un traitement réussi)
+        
+        Returns:
+            Statut du traitement ('success' ou 'partial_success')
+        """
+        file_path = file_info.path
+        status = 'partial_success' if rows_rejected else 'success'
+        
+        if rows_rejected:
+            logger.warning(
+                f"{rows_rejected} ligne(s) de {file_path.name} rejetée(s), "
+                f"voir {self.reject_file_service.get_reject_path(file_info)}"
+            )
+        
+        if rows_duplicate:
             logger.info(
-                f"Traitement réussi pour {file_path.name}: "
-                f"{rows_inserted} lignes insérées en {processing_time:.2f}s"
+                f"{rows_duplicate} ligne(s) de {file_path.name} déjà présente(s) en base, ignorée(s)"
             )
-            
-            return IngestionResult(
-                file_info=file_info,
-                status='success',
-                rows_processed=transformation_result.original_count,
-                rows_inserted=rows_inserted,
-                processing_time=processing_time
+        
+        if unparseable_timestamps:
+            logger.warning(
+                f"{unparseable_timestamps} timestamp(s) non reconnu(s) dans {file_path.name}, "
+                f"ligne(s) rejetée(s)"
             )
+        
+        with metrics.measure('archive'):
+            # Marquer le fichier comme traité AVANT l'archivage (le fichier sera déplacé)
+            self.file_detection_service.mark_as_processed(file_path, file_info)
             
-        except MiddlewareException as e:
-            logger.error(f"Erreur middleware lors du traitement de {file_path.name}: {e}")
-            return self._handle_error(file_info, str(e), 0)
-        except Exception as e:
-            logger.error(f"Erreur inattendue lors du traitement de {file_path.name}: {e}", exc_info=True)
-            return self._handle_error(file_info, f"Erreur inattendue: {str(e)}", 0)
+            # Archivage
+            file_info.ingestion_timestamp = datetime.now()
+            self.file_archive_service.archive_file(file_path, file_info, success=True)
+        
+        return status
+    
+    def _success_result(
+        self,
+        file_info: IDPSFileInfo,
+        status: str,
+        rows_processed: int,
+        rows_inserted: int,
+        processing_time: float,
+        metrics: IngestionMetrics,
+        rows_rejected: int,
+        rows_duplicate: int
+    ) -> IngestionResult:
+        """Journalise la fin d'un traitement réussi et construit son résultat"""
+        logger.info(
+            f"Traitement {'partiellement ' if rows_rejected else ''}réussi pour {file_info.path.name}: "
+            f"{rows_inserted}/{rows_processed} lignes insérées en {processing_time:.2f}s "
+            f"({metrics.rows_per_second:.0f} lignes/s)"
+        )
+        
+        return IngestionResult(
+            file_info=file_info,
+            status=status,
+            rows_processed=rows_processed,
+            rows_inserted=rows_inserted,
+            processing_time=processing_time,
+            metrics=metrics,
+            rows_rejected=rows_rejected,
+            rows_duplicate=rows_duplicate
+        )
+    
+    @staticmethod
+    def _audit_note(rows_rejected: int, rows_duplicate: int) -> Optional[str]:
+        """Message du log d'audit d'un traitement réussi (lignes rejetées et doublons ignorés)"""
+        notes = []
+        if rows_rejected:
+            notes.append(f"{rows_rejected} ligne(s) rejetée(s)")
+        if rows_duplicate:
+            notes.append(f"{rows_duplicate} ligne(s) déjà présente(s) ignorée(s)")
+        return ', '.join(notes) or None
     
     def _handle_error(
         self,
         file_info: IDPSFileInfo,
         error_message: str,
-        rows_processed: int
+        rows_processed: int,
+        metrics: Optional[IngestionMetrics] = None,
+        start_time: Optional[float] = None
     ) -> IngestionResult:
         """Gère les erreurs de traitement"""
-        file_path = file_info.path
+        metrics = metrics or IngestionMetrics(file_size_bytes=file_info.size)
         
         try:
-            # Archiver le fichier en erreur (seulement s'il existe encore)
-            if file_path.exists():
-                self.file_archive_service.archive_file(file_path, file_info, success=False)
-            else:
-                logger.warning(f"Le fichier {file_path.name} n'existe plus, archivage ignoré")
+            self._archive_error(file_info, metrics)
             
             # Enregistrer le log d'audit
-            self.idps_repository.insert_audit_log(
-                file_info=file_info,
-                status='error',
-                rows_processed=rows_processed,
-                error_message=error_message
-            )
+            with metrics.measure('audit'):
+                self.idps_repository.insert_audit_log(
+                    file_info=file_info,
+                    status='error',
+                    rows_processed=rows_processed,
+                    error_message=error_message,
+                    records_inserted=0
+                )
         except Exception as e:
             logger.error(f"Erreur lors de la gestion d'erreur: {e}")
         
+        processing_time = time.time() - start_time if start_time is not None else None
+        self._record_metrics(file_info, 'error', metrics, rows_processed, processing_time or 0.0)
+        
         return IngestionResult(
             file_info=file_info,
             status='error',
             rows_processed=rows_processed,
             rows_inserted=0,
-            error_message=error_message
+            error_message=error_message,
+            processing_time=processing_time,
+            metrics=metrics
         )
     
+    def _archive_error(self, file_info: IDPSFileInfo, metrics: IngestionMetrics) -> None:
+        """Archive le fichier en erreur (seulement s'il existe encore)"""
+        file_path = file_info.path
+        with metrics.measure('archive'):
+            if file_path.exists():
+                self.file_archive_service.archive_file(file_path, file_info, success=False)
+            else:
+                logger.warning(f"Le fichier {file_path.name} n'existe plus, archivage ignoré")
+    
+    def _record_metrics(
+        self,
+        file_info: IDPSFileInfo,
+        status: str,
+        metrics: IngestionMetrics,
+        rows_processed: int,
+        processing_time: float
+    ) -> None:
+        """
+        Complète les métriques du traitement et les enregistre dans idps.ingestion_metrics
+        
+        Un échec d'enregistrement des métriques n'affecte pas le résultat du traitement.
+        """
+        self._complete_metrics(metrics, rows_processed, processing_time)
+        
+        try:
+            self.idps_repository.insert_ingestion_metrics(file_info, status, metrics)
+        except Exception as e:
+            logger.warning(f"Impossible d'enregistrer les métriques d'ingestion de {file_info.name}: {e}")
+    
+    @staticmethod
+    def _complete_metrics(metrics: IngestionMetrics, rows_processed: int, processing_time: float) -> None:
+        """Renseigne le volume, la durée totale et le pic mémoire d'un traitement"""
+        metrics.rows_processed = rows_processed
+        metrics.total_time = processing_time
+        metrics.record_peak_rss()
+    
     def run(self) -> List[IngestionResult]:
         """
         Exécute le processus complet d'ingestion IDPS
@@ -189,20 +625,102 @@ class IDPSOrchestrator:
         logger.info(f"{len(detected_files)} fichier(s) IDPS détecté(s)")
         
         # Traiter chaque fichier
-        results = []
-        for file_info in detected_files:
-            result = self.process_file(file_info)
-            results.append(result)
+        workers = self.files_config.processing_workers
+        if workers > 1 and len(detected_files) > 1 and not self.files_config.streaming_enabled:
+            results = self._run_parallel(detected_files, workers)
+        else:
+            results = [self.process_file(file_info) for file_info in detected_files]
         
-        # Statistiques
+        self._report_run(results)
+        return results
+    
+    def _report_run(self, results: List[IngestionResult]) -> None:
+        """Journalise les statistiques d'une exécution et exporte ses métriques Prometheus"""
         success_count = sum(1 for r in results if r.is_success)
+        partial_count = sum(1 for r in results if r.is_partial)
         error_count = sum(1 for r in results if r.is_error)
         total_rows = sum(r.rows_inserted for r in results)
         
         logger.info(
-            f"Traitement IDPS terminé: {success_count} succès, {error_count} erreurs, "
-            f"{total_rows} lignes insérées au total"
+            f"Traitement IDPS terminé: {success_count} succès, {partial_count} succès partiel(s), "
+            f"{error_count} erreurs, {total_rows} lignes insérées au total"
         )
         
+        # Export des métriques au format texte Prometheus (collecteur textfile de node_exporter)
+        if self.files_config.metrics_textfile_path is not None:
+            try:
+                write_prometheus_textfile(results, self.files_config.metrics_textfile_path)
+            except OSError as e:
+                logger.warning(f"Impossible d'écrire les métriques Prometheus: {e}")
+    
+    def _run_parallel(self, detected_files: List[IDPSFileInfo], workers: int) -> List[IngestionResult]:
+        """
+        Traite plusieurs fichiers en parallèle
+        
+        La préparation (lecture, validation, transformation) s'exécute dans un pool de
+        processus ; les chargements, archivages et logs d'audit sont effectués dans le
+        processus principal par un nombre borné de threads (une connexion chacun).
+        
+        Args:
+            detected_files: Fichiers à traiter
+            workers: Nombre de processus de préparation
+        
+        Returns:
+            Liste des résultats d'ingestion, dans l'ordre des fichiers détectés
+        """
+        load_workers = max(1, self.db_config.max_load_connections)
+        logger.info(
+            f"Traitement parallèle: {min(workers, len(detected_files))} processus de préparation, "
+            f"{load_workers} connexion(s) de chargement"
+        )
+        
+        # Initialiser le repository (et le schéma) avant de lancer les threads de chargement
+        self.idps_repository
+        
+        results: List[Optional[IngestionResult]] = [None] * len(detected_files)
+        # 'spawn' : les workers ne partagent ni les connexions ni les verrous du processus principal
+        context = multiprocessing.get_context('spawn')
+        
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(detected_files)),
+            mp_context=context,
+            initializer=_init_preparation_worker,
+            initargs=(self.files_config, self.db_config)
+        ) as process_pool, ThreadPoolExecutor(max_workers=load_workers) as load_pool:
+            prepare_futures = {
+                process_pool.submit(_prepare_file_in_worker, file_info): index
+                for index, file_info in enumerate(detected_files)
+            }
+            
+            load_futures = {}
+            for future in as_completed(prepare_futures):
+                index = prepare_futures[future]
+                file_info = detected_files[index]
+                try:
+                    prepared = future.result()
+                except Exception as e:
+                    # Échec du processus worker lui-même (ex: processus interrompu)
+                    prepared = PreparationResult(
+                        file_info, time.time(), error_message=self._describe_exception(file_info, e)
+                    )
+                load_futures[load_pool.submit(self.load_prepared_file, prepared)] = index
+            
+            for future in as_completed(load_futures):
+                results[load_futures[future]] = future.result()
+        
         return results
 
+
+# Orchestrateur propre à chaque processus worker (préparation uniquement, sans accès base)
+_worker_orchestrator: Optional[IDPSOrchestrator] = None
+
+
+def _init_preparation_worker(files_config: IDPSFilesConfig, db_config: IDPSDatabaseConfig) -> None:
+    """Initialise l'orchestrateur de préparation d'un processus worker"""
+    global _worker_orchestrator
+    _worker_orchestrator = IDPSOrchestrator(files_config, db_config)
+
+
+def _prepare_file_in_worker(file_info: IDPSFileInfo) -> PreparationResult:
+    """Prépare un fichier dans un processus worker"""
+    return _worker_orchestrator.prepare_file(file_info)
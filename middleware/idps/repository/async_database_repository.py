@@ -0,0 +1,196 @@
+"""
+Repository asynchrone IDPS : chargements d'événements, logs d'audit et métriques
+
+Les instructions sont celles de `IDPSDatabaseRepository`, exécutées sur une
+session `AsyncSession` (driver psycopg async) via `run_sync` : pendant qu'un
+chargement attend PostgreSQL, la boucle asyncio poursuit les autres fichiers.
+Le COPY est écrit directement sur la connexion psycopg asynchrone.
+
+Sans engine asynchrone (backend SQLite, ou extra `sqlalchemy[asyncio]` non
+installé), les méthodes du repository synchrone sont exécutées dans des threads.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from middleware.idps.config.sqlalchemy_config import async_engine_available, get_async_session_factory
+from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.models.ingestion_metrics import IngestionMetrics
+from middleware.idps.repository.database_repository import IDPSDatabaseRepository
+from middleware.idps.repository.event_insert import create_staging_table
+from middleware.exceptions import MiddlewareException, DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+class IDPSAsyncDatabaseRepository:
+    """Opérations d'écriture IDPS awaitables, adossées au repository synchrone"""
+
+    def __init__(self, repository: IDPSDatabaseRepository):
+        """
+        Initialise le repository asynchrone
+
+        Args:
+            repository: Repository synchrone (schéma initialisé, partitions, construction des lignes)
+        """
+        self.repository = repository
+        self.db_config = repository.db_config
+        self.module = repository.module
+        self.is_async = async_engine_available(self.db_config)
+        if not self.is_async:
+            logger.warning("Engine asynchrone indisponible, écritures IDPS exécutées dans des threads")
+
+    @asynccontextmanager
+    async def _get_session(self, profile: str = 'interactive'):
+        """
+        Context manager asynchrone des sessions SQLAlchemy (mêmes règles que le repository synchrone)
+
+        Yields:
+            AsyncSession
+        """
+        session = get_async_session_factory(self.db_config, profile)()
+        try:
+            yield session
+            await session.commit()
+        except MiddlewareException:
+            await session.rollback()
+            raise
+        except Exception as e:
+            await session.rollback()
+            error_msg = f"Erreur de session SQLAlchemy asynchrone pour {self.module}: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation='session') from e
+        finally:
+            await session.close()
+
+    def use_staging(self, file_size: Optional[int]) -> bool:
+        """Indique si un fichier de cette taille est chargé via une table de staging"""
+        return self.repository.use_staging(file_size)
+
+    async def insert_events(self, data: List[Dict[str, Any]], category: str, staged: Optional[bool] = None) -> int:
+        """
+        Insère des événements en une transaction (voir `IDPSDatabaseRepository.insert_event_batches`)
+
+        Args:
+            data: Liste des données à insérer (format spécifique IDPS)
+            category: Catégorie ('workflow' ou 'error')
+            staged: Charger via une table de staging (voir `use_staging`)
+
+        Returns:
+            Nombre de lignes réellement insérées (hors doublons ignorés)
+        """
+        if not self.is_async:
+            return await asyncio.to_thread(self.repository.insert_events, data, category, staged)
+        if not data:
+            return 0
+
+        repository = self.repository
+        model, columns, operation = repository._event_target(category)
+        # Le driver asynchrone est toujours psycopg : COPY disponible
+        use_copy = self.db_config.load_strategy == 'copy'
+        staged = bool(staged) or use_copy
+        batches = [data]
+
+        table_name = f"{model.__table__.schema}.{model.__table__.name}"
+        try:
+            async with self._get_session('bulk') as session:
+                if staged:
+                    staging = await session.run_sync(create_staging_table, model, columns)
+                    if use_copy:
+                        rows_loaded = await self._copy_rows(session, staging.name, batches, columns)
+                    else:
+                        rows_loaded = await session.run_sync(repository._insert_rows, staging, batches, columns)
+                    rows_inserted = await session.run_sync(repository._merge_staged, model, staging)
+                    method = 'staging COPY' if use_copy else 'staging'
+                else:
+                    rows_loaded, rows_inserted = await session.run_sync(
+                        repository._insert_direct, model, batches, columns
+                    )
+                    method = 'direct'
+
+            repository._log_inserted(f"{table_name} ({method}, async)", rows_loaded, rows_inserted)
+            return rows_inserted
+
+        except MiddlewareException:
+            repository._forget_partitions()
+            raise
+        except SQLAlchemyError as e:
+            repository._forget_partitions()
+            error_msg = f"Erreur SQLAlchemy lors de l'insertion des événements dans {table_name}: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation=operation) from e
+        except Exception as e:
+            repository._forget_partitions()
+            error_msg = f"Erreur lors de l'insertion des événements dans {table_name}: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation=operation) from e
+
+    async def _copy_rows(self, session, staging_name: str, batches: Iterable[List[Dict[str, Any]]], columns) -> int:
+        """
+        Charge les blocs dans la table de staging via COPY FROM STDIN sur la connexion psycopg asynchrone
+
+        Returns:
+            Nombre de lignes chargées
+        """
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        now = datetime.now()
+        rows_loaded = 0
+        async with driver_connection.cursor() as cursor:
+            async with cursor.copy(f"COPY {staging_name} ({', '.join(columns)}) FROM STDIN") as copy:
+                for batch in batches:
+                    for row in batch:
+                        await copy.write_row(self.repository._copy_values(row, columns, now))
+                    rows_loaded += len(batch)
+        return rows_loaded
+
+    async def insert_audit_log(
+        self,
+        file_info: IDPSFileInfo,
+        status: str,
+        rows_processed: int,
+        error_message: Optional[str] = None,
+        records_inserted: Optional[int] = None,
+    ) -> int:
+        """
+        Insère ou met à jour un log d'audit (voir `IDPSDatabaseRepository.insert_audit_log`)
+
+        Returns:
+            ID du log d'audit
+        """
+        if not self.is_async:
+            return await asyncio.to_thread(
+                self.repository.insert_audit_log, file_info, status, rows_processed, error_message, records_inserted
+            )
+        try:
+            async with self._get_session() as session:
+                return await session.run_sync(
+                    self.repository._write_audit_log,
+                    file_info, status, rows_processed, error_message, records_inserted
+                )
+        except SQLAlchemyError as e:
+            error_msg = f"Erreur SQLAlchemy lors de l'insertion du log d'audit: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation='insert_audit') from e
+
+    async def insert_ingestion_metrics(self, file_info: IDPSFileInfo, status: str, metrics: IngestionMetrics) -> int:
+        """
+        Enregistre les métriques d'un traitement (voir `IDPSDatabaseRepository.insert_ingestion_metrics`)
+
+        Returns:
+            ID de la ligne de métriques
+        """
+        if not self.is_async:
+            return await asyncio.to_thread(self.repository.insert_ingestion_metrics, file_info, status, metrics)
+        try:
+            async with self._get_session() as session:
+                return await session.run_sync(self.repository._write_ingestion_metrics, file_info, status, metrics)
+        except SQLAlchemyError as e:
+            error_msg = f"Erreur SQLAlchemy lors de l'insertion des métriques d'ingestion: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation='insert_metrics') from e
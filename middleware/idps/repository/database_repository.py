@@ -1,22 +1,31 @@
 """
 Repository pour l'accès à la base de données IDPS utilisant SQLAlchemy ORM
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
 import logging
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import date, datetime
 
+from sqlalchemy import Date, cast, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from middleware.idps.domain_interfaces import IModuleRepository
 from middleware.idps.config.database_config import IDPSDatabaseConfig
-from middleware.idps.config.sqlalchemy_config import get_session, init_database
+from middleware.idps.config.sqlalchemy_config import get_engine, get_session, init_database
+from middleware.idps.config.partitioning import IDPSPartitionManager
 from middleware.idps.models.file_info import IDPSFileInfo
 from middleware.idps.models.workflow_event_model import IDPSWorkflowEventModel
 from middleware.idps.models.error_event_model import IDPSErrorEventModel
 from middleware.idps.models.audit_log_model import IDPSAuditLogModel
-from middleware.exceptions import DatabaseError
+from middleware.idps.models.ingestion_metrics import IngestionMetrics, INGESTION_STAGES
+from middleware.idps.models.ingestion_metrics_model import IDPSIngestionMetricsModel
+from middleware.idps.models.event_page import EventPage
+from middleware.idps.repository.event_insert import (
+    insert_ignoring_duplicates, create_staging_table, merge_staging_table, drop_staging_table
+)
+from middleware.idps.repository.event_query import keyset_query, keyset_page, iter_event_batches
+from middleware.exceptions import MiddlewareException, DatabaseError
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +33,20 @@ logger = logging.getLogger(__name__)
 class IDPSDatabaseRepository(IModuleRepository):
     """Repository pour les opérations de base de données IDPS utilisant SQLAlchemy ORM"""
     
+    # Colonnes alimentées par le chargement COPY (l'ordre définit celui des tuples envoyés)
+    WORKFLOW_COPY_COLUMNS = (
+        'event_timestamp', 'document_type', 'destination_code', 'request_id',
+        'status', 'file_name', 'ingested_at',
+    )
+    
+    ERROR_COPY_COLUMNS = (
+        'event_timestamp', 'document_type', 'destination_code', 'request_id',
+        'service_name', 'error_category', 'comment', 'file_name', 'ingested_at',
+    )
+    
+    # Colonnes dont la valeur par défaut est l'heure courante (comme le chemin ORM)
+    _DATETIME_COLUMNS = frozenset({'event_timestamp', 'ingested_at'})
+    
     def __init__(self, db_config: IDPSDatabaseConfig = None):
         """
         Initialise le repository IDPS
@@ -34,21 +57,34 @@ class IDPSDatabaseRepository(IModuleRepository):
         self.db_config = db_config or IDPSDatabaseConfig.from_env()
         self.module = 'idps'
         
+        # Partitions des tables d'événements créées à la demande avant chaque chargement
+        self.partition_manager = (
+            IDPSPartitionManager(self.db_config.partition_interval, self.db_config.partition_premake)
+            if self.db_config.is_partitioned else None
+        )
+        
         # Initialiser la base de données (créer les tables si nécessaire)
         init_database(self.db_config)
     
     @contextmanager
-    def _get_session(self) -> Session:
+    def _get_session(self, profile: str = 'interactive') -> Session:
         """
         Context manager pour gérer les sessions SQLAlchemy
         
+        Args:
+            profile: Profil d'engine ('bulk' pour les chargements d'événements)
+        
         Yields:
             Session SQLAlchemy
         """
-        session = get_session(self.db_config)
+        session = get_session(self.db_config, profile)
         try:
             yield session
             session.commit()
+        except MiddlewareException:
+            # Erreur amont (ex: lecture en flux des blocs) : propager telle quelle
+            session.rollback()
+            raise
         except Exception as e:
             session.rollback()
             error_msg = f"Erreur de session SQLAlchemy pour {self.module}: {e}"
@@ -57,95 +93,257 @@ class IDPSDatabaseRepository(IModuleRepository):
         finally:
             session.close()
     
-    def insert_events(self, data: List[Dict[str, Any]], category: str) -> int:
+    def insert_events(self, data: List[Dict[str, Any]], category: str, staged: Optional[bool] = None) -> int:
         """
         Insère les événements dans les tables IDPS
         
+        Les événements déjà présents (même clé naturelle, voir `NATURAL_KEY` des
+        modèles) sont ignorés : ré-ingérer un fichier n'insère aucun doublon.
+        
         Args:
             data: Données à insérer
             category: Catégorie ('workflow' ou 'error')
+            staged: Charger via une table de staging (voir `use_staging`) ; None = insertion directe
         
         Returns:
-            Nombre de lignes insérées
+            Nombre de lignes réellement insérées (hors doublons ignorés)
         """
         if not data:
             return 0
+        return self.insert_event_batches([data], category, staged)
+    
+    def use_staging(self, file_size: Optional[int]) -> bool:
+        """
+        Indique si un fichier doit être chargé via une table de staging
         
-        if category == 'workflow':
-            return self._insert_workflow_events(data)
-        elif category == 'error':
-            return self._insert_error_events(data)
-        else:
-            logger.warning(f"Catégorie inconnue: {category}, utilisation de workflow_events")
-            return self._insert_workflow_events(data)
+        Au-delà de `staging_threshold_bytes`, maintenir les index de la table cible
+        ligne par ligne coûte plus que charger une table temporaire sans index puis
+        la fusionner en une instruction ensembliste.
+        
+        Args:
+            file_size: Taille du fichier source en octets (None si inconnue)
+        """
+        return file_size is not None and file_size >= self.db_config.staging_threshold_bytes
     
-    def _insert_workflow_events(self, data: List[Dict[str, Any]]) -> int:
-        """Insère dans idps.workflow_events"""
+    def insert_event_batches(
+        self,
+        batches: Iterable[List[Dict[str, Any]]],
+        category: str,
+        staged: Optional[bool] = None
+    ) -> int:
+        """
+        Insère des événements fournis par blocs, dans une seule transaction
+        
+        Les blocs sont consommés au fur et à mesure : seul le bloc courant est
+        en mémoire. Une erreur sur un bloc annule l'ensemble du fichier. Les
+        événements déjà présents (même clé naturelle) sont ignorés.
+        
+        Deux modes de chargement :
+        - direct : `INSERT ... ON CONFLICT DO NOTHING` bloc par bloc dans la table cible ;
+        - staging : blocs chargés dans une table temporaire sans index (COPY avec
+          la stratégie 'copy', INSERT sinon), puis un seul `INSERT ... SELECT ...
+          ON CONFLICT DO NOTHING` vers la table cible. Toujours utilisé avec COPY,
+          qui ne gère pas les conflits.
+        
+        Args:
+            batches: Itérable de blocs de lignes au format spécifique IDPS
+            category: Catégorie ('workflow' ou 'error')
+            staged: Charger via une table de staging (voir `use_staging`) ; None = insertion directe
+        
+        Returns:
+            Nombre de lignes réellement insérées (hors doublons ignorés)
+        """
+        model, columns, operation = self._event_target(category)
+        use_copy = self.db_config.load_strategy == 'copy' and self._supports_copy()
+        staged = bool(staged) or use_copy
+        
+        table_name = f"{model.__table__.schema}.{model.__table__.name}"
         try:
-            with self._get_session() as session:
-                events = []
-                for row in data:
-                    # `row` est déjà au format spécifique IDPS (voir `IDPSTransformer`)
-                    event = IDPSWorkflowEventModel(
-                        event_timestamp=row.get('event_timestamp', datetime.now()),
-                        document_type=row.get('document_type', ''),
-                        destination_code=row.get('destination_code', ''),
-                        request_id=row.get('request_id', ''),
-                        status=row.get('status', ''),
-                        file_name=row.get('file_name', ''),
-                        ingested_at=row.get('ingested_at', datetime.now()),
-                    )
-                    events.append(event)
-
-                session.bulk_save_objects(events)
-                session.flush()
-                rows_inserted = len(events)
-                logger.info(f"{rows_inserted} événements de workflow insérés dans idps.workflow_events")
-                return rows_inserted
+            with self._get_session('bulk') as session:
+                if staged:
+                    staging = create_staging_table(session, model, columns)
+                    if use_copy:
+                        rows_loaded = self._copy_rows(session, staging.name, batches, columns)
+                    else:
+                        rows_loaded = self._insert_rows(session, staging, batches, columns)
+                    rows_inserted = self._merge_staged(session, model, staging)
+                    method = 'staging COPY' if use_copy else 'staging'
+                else:
+                    rows_loaded, rows_inserted = self._insert_direct(session, model, batches, columns)
+                    method = 'direct'
                 
+                self._log_inserted(f"{table_name} ({method})", rows_loaded, rows_inserted)
+                return rows_inserted
+        
+        except MiddlewareException:
+            self._forget_partitions()
+            raise
         except SQLAlchemyError as e:
-            error_msg = f"Erreur SQLAlchemy lors de l'insertion des événements de workflow: {e}"
+            self._forget_partitions()
+            error_msg = f"Erreur SQLAlchemy lors de l'insertion des événements dans {table_name}: {e}"
             logger.error(error_msg)
-            raise DatabaseError(error_msg, module=self.module, operation='insert_workflow') from e
+            raise DatabaseError(error_msg, module=self.module, operation=operation) from e
         except Exception as e:
-            error_msg = f"Erreur lors de l'insertion des événements de workflow: {e}"
+            self._forget_partitions()
+            error_msg = f"Erreur lors de l'insertion des événements dans {table_name}: {e}"
             logger.error(error_msg)
-            raise DatabaseError(error_msg, module=self.module, operation='insert_workflow') from e
+            raise DatabaseError(error_msg, module=self.module, operation=operation) from e
+    
+    def _event_target(self, category: str):
+        """Modèle, colonnes chargées et nom d'opération d'une catégorie d'événements"""
+        if category not in ('workflow', 'error'):
+            logger.warning(f"Catégorie inconnue: {category}, utilisation de workflow_events")
+            category = 'workflow'
+        if category == 'error':
+            return IDPSErrorEventModel, self.ERROR_COPY_COLUMNS, 'insert_error'
+        return IDPSWorkflowEventModel, self.WORKFLOW_COPY_COLUMNS, 'insert_workflow'
+    
+    def _insert_direct(
+        self,
+        session: Session,
+        model,
+        batches: Iterable[List[Dict[str, Any]]],
+        columns
+    ) -> Tuple[int, int]:
+        """
+        Insère les blocs directement dans la table cible (`INSERT ... ON CONFLICT DO NOTHING`)
+        
+        Returns:
+            (lignes chargées, lignes réellement insérées)
+        """
+        rows_loaded = 0
+        rows_inserted = 0
+        for batch in batches:
+            if not batch:
+                continue
+            now = datetime.now()
+            values = [self._row_values(row, columns, now) for row in batch]
+            if self.partition_manager is not None:
+                self._ensure_partitions(session, model, {row[model.PARTITION_COLUMN] for row in values})
+            rows_inserted += insert_ignoring_duplicates(session, model, values)
+            rows_loaded += len(batch)
+        return rows_loaded, rows_inserted
     
-    def _insert_error_events(self, data: List[Dict[str, Any]]) -> int:
-        """Insère dans idps.error_events"""
+    def _merge_staged(self, session: Session, model, staging) -> int:
+        """
+        Crée les partitions nécessaires, fusionne la table de staging dans la cible puis la supprime
+        
+        Returns:
+            Nombre de lignes réellement insérées
+        """
+        if self.partition_manager is not None:
+            # Dates distinctes lues dans la table de staging, en une requête
+            self._ensure_partitions(session, model, session.execute(
+                select(cast(staging.c[model.PARTITION_COLUMN], Date)).distinct()
+            ).scalars())
+        rows_inserted = merge_staging_table(session, model, staging)
+        drop_staging_table(session, staging)
+        return rows_inserted
+    
+    def _ensure_partitions(self, session: Session, model, values) -> None:
+        """Crée, dans la transaction du chargement, les partitions manquantes pour des dates d'événements"""
+        self.partition_manager.ensure_partitions(session.connection(), model, values)
+    
+    def _forget_partitions(self) -> None:
+        """Vide le cache des partitions après un chargement annulé (partitions créées annulées aussi)"""
+        if self.partition_manager is not None:
+            self.partition_manager.invalidate()
+    
+    def detach_partitions_before(self, category: str, cutoff: date, drop: bool = False) -> List[str]:
+        """
+        Rétention : détache (ou supprime) les partitions d'événements antérieures à une date
+        
+        Opération de catalogue, quel que soit le volume des partitions retirées.
+        
+        Args:
+            category: Catégorie ('workflow' ou 'error')
+            cutoff: Les partitions entièrement antérieures à cette date sont retirées
+            drop: Supprimer les partitions au lieu de les conserver comme tables détachées
+        
+        Returns:
+            Noms des partitions retirées
+        """
+        if self.partition_manager is None:
+            raise DatabaseError(
+                "Les tables d'événements ne sont pas partitionnées (DB_PARTITION_INTERVAL)",
+                module=self.module, operation='detach_partitions'
+            )
+        model = IDPSErrorEventModel if category == 'error' else IDPSWorkflowEventModel
         try:
             with self._get_session() as session:
-                events = []
-                for row in data:
-                    # `row` est déjà au format spécifique IDPS (voir `IDPSTransformer`)
-                    event = IDPSErrorEventModel(
-                        event_timestamp=row.get('event_timestamp', datetime.now()),
-                        document_type=row.get('document_type', ''),
-                        destination_code=row.get('destination_code', ''),
-                        request_id=row.get('request_id', ''),
-                        service_name=row.get('service_name', ''),
-                        error_category=row.get('error_category', ''),
-                        comment=row.get('comment', ''),
-                        file_name=row.get('file_name', ''),
-                        ingested_at=row.get('ingested_at', datetime.now()),
-                    )
-                    events.append(event)
-
-                session.bulk_save_objects(events)
-                session.flush()
-                rows_inserted = len(events)
-                logger.info(f"{rows_inserted} événements d'erreur insérés dans idps.error_events")
-                return rows_inserted
-                
+                return self.partition_manager.detach_partitions_before(session.connection(), model, cutoff, drop)
         except SQLAlchemyError as e:
-            error_msg = f"Erreur SQLAlchemy lors de l'insertion des événements d'erreur: {e}"
+            error_msg = f"Erreur SQLAlchemy lors du retrait des partitions de {model.__table__.name}: {e}"
             logger.error(error_msg)
-            raise DatabaseError(error_msg, module=self.module, operation='insert_error') from e
-        except Exception as e:
-            error_msg = f"Erreur lors de l'insertion des événements d'erreur: {e}"
-            logger.error(error_msg)
-            raise DatabaseError(error_msg, module=self.module, operation='insert_error') from e
+            raise DatabaseError(error_msg, module=self.module, operation='detach_partitions') from e
+    
+    def _supports_copy(self) -> bool:
+        """Vérifie que le driver courant permet COPY FROM STDIN (psycopg v3)"""
+        dialect = get_engine(self.db_config).dialect
+        if dialect.name == 'postgresql' and dialect.driver == 'psycopg':
+            return True
+        logger.warning(
+            f"Chargement COPY indisponible pour le driver {dialect.name}+{dialect.driver}, "
+            f"utilisation du chargement ORM"
+        )
+        return False
+    
+    def _copy_rows(self, session: Session, staging_name: str, batches: Iterable[List[Dict[str, Any]]], columns) -> int:
+        """
+        Charge les blocs dans la table de staging via COPY FROM STDIN, sans instancier d'objets ORM
+        
+        Returns:
+            Nombre de lignes chargées
+        """
+        # Connexion psycopg sous-jacente, dans la transaction de la session
+        driver_connection = session.connection().connection.driver_connection
+        now = datetime.now()
+        rows_loaded = 0
+        with driver_connection.cursor() as cursor:
+            with cursor.copy(f"COPY {staging_name} ({', '.join(columns)}) FROM STDIN") as copy:
+                for batch in batches:
+                    for row in batch:
+                        copy.write_row(self._copy_values(row, columns, now))
+                    rows_loaded += len(batch)
+        return rows_loaded
+    
+    def _insert_rows(self, session: Session, staging, batches: Iterable[List[Dict[str, Any]]], columns) -> int:
+        """
+        Charge les blocs dans la table de staging par INSERT multi-lignes (drivers sans COPY)
+        
+        Returns:
+            Nombre de lignes chargées
+        """
+        rows_loaded = 0
+        for batch in batches:
+            if not batch:
+                continue
+            now = datetime.now()
+            session.execute(staging.insert(), [self._row_values(row, columns, now) for row in batch])
+            rows_loaded += len(batch)
+        return rows_loaded
+    
+    @classmethod
+    def _copy_values(cls, row: Dict[str, Any], columns, now: datetime) -> Tuple[Any, ...]:
+        """Tuple COPY d'une ligne, dans l'ordre des colonnes (valeurs par défaut comme le chemin ORM)"""
+        return tuple(row.get(column, now if column in cls._DATETIME_COLUMNS else '') for column in columns)
+    
+    @classmethod
+    def _row_values(cls, row: Dict[str, Any], columns, now: datetime) -> Dict[str, Any]:
+        """Valeurs d'une ligne mappée pour les colonnes chargées (mêmes valeurs par défaut que COPY)"""
+        return {
+            column: row.get(column, now if column in cls._DATETIME_COLUMNS else '')
+            for column in columns
+        }
+    
+    @staticmethod
+    def _log_inserted(table_name: str, rows_loaded: int, rows_inserted: int) -> None:
+        """Journalise le nombre d'événements insérés et de doublons ignorés"""
+        logger.info(f"{rows_inserted} événements insérés dans {table_name}")
+        if rows_inserted < rows_loaded:
+            logger.info(
+                f"{rows_loaded - rows_inserted} événement(s) déjà présent(s) ignoré(s) dans {table_name}"
+            )
     
     def insert_audit_log(
         self,
@@ -153,67 +351,28 @@ class IDPSDatabaseRepository(IModuleRepository):
         status: str,
         rows_processed: int,
         error_message: Optional[str] = None,
+        records_inserted: Optional[int] = None,
         ) -> int:
             """
             Insère ou met à jour un log d'audit dans idps.ingestion_audit_log (idempotent sur file_name)
     
             Args:
                 file_info: Informations sur le fichier traité
-                status: Statut du traitement ('success', 'error', etc.)
-                rows_processed: Nombre de lignes traitées
+                status: Statut du traitement ('success', 'partial_success', 'error')
+                rows_processed: Nombre de lignes du fichier (records_expected)
                 error_message: Message d'erreur si applicable
+                records_inserted: Nombre de lignes réellement insérées
+                    (si None : toutes les lignes en cas de succès, aucune sinon)
     
             Returns:
                 ID du log d'audit
             """
             try:
                 with self._get_session() as session:
-                    records_expected = rows_processed
-                    records_inserted = rows_processed if status == 'success' else 0
-    
-                    # Vérifier si un log existe déjà pour ce fichier (idempotence par file_name)
-                    existing: Optional[IDPSAuditLogModel] = (
-                        session.query(IDPSAuditLogModel)
-                        .filter(IDPSAuditLogModel.file_name == file_info.name)
-                        .one_or_none()
-                    )
-    
-                    if existing:
-                        # Mettre à jour le log existant
-                        existing.file_type = file_info.file_type
-                        existing.file_date = file_info.date
-                        existing.records_expected = records_expected
-                        existing.records_inserted = records_inserted
-                        existing.status = status
-                        existing.error_message = error_message
-                        # On met à jour seulement ended_at; on ne touche pas started_at initial
-                        existing.ended_at = datetime.now()
-                        log_id = existing.id
-                        logger.info(
-                            f"Log d'audit IDPS mis à jour pour le fichier {file_info.name} (ID: {log_id})"
-                        )
-                        return log_id
-    
-                    # Aucun log existant : création
-                    audit_log = IDPSAuditLogModel(
-                        file_name=file_info.name,
-                        file_type=file_info.file_type,
-                        file_date=file_info.date,
-                        records_expected=records_expected,
-                        records_inserted=records_inserted,
-                        status=status,
-                        error_message=error_message,
-                        started_at=file_info.ingestion_timestamp or datetime.now(),
-                        ended_at=datetime.now(),
+                    return self._write_audit_log(
+                        session, file_info, status, rows_processed, error_message, records_inserted
                     )
     
-                    session.add(audit_log)
-                    session.flush()
-    
-                    log_id = audit_log.id
-                    logger.info(f"Nouveau log d'audit IDPS inséré avec l'ID: {log_id}")
-                    return log_id
-    
             except SQLAlchemyError as e:
                 error_msg = f"Erreur SQLAlchemy lors de l'insertion du log d'audit: {e}"
                 logger.error(error_msg)
@@ -223,20 +382,142 @@ class IDPSDatabaseRepository(IModuleRepository):
                 logger.error(error_msg)
                 raise DatabaseError(error_msg, module=self.module, operation='insert_audit') from e
     
-    def get_workflow_events(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    def insert_ingestion_metrics(
+        self,
+        file_info: IDPSFileInfo,
+        status: str,
+        metrics: IngestionMetrics
+    ) -> int:
+        """
+        Enregistre les métriques de performance d'un traitement dans idps.ingestion_metrics
+        
+        Args:
+            file_info: Informations sur le fichier traité
+            status: Statut du traitement ('success', 'error', etc.)
+            metrics: Durées par étape, débits et pic mémoire du traitement
+        
+        Returns:
+            ID de la ligne de métriques
+        """
+        try:
+            with self._get_session() as session:
+                return self._write_ingestion_metrics(session, file_info, status, metrics)
+        
+        except SQLAlchemyError as e:
+            error_msg = f"Erreur SQLAlchemy lors de l'insertion des métriques d'ingestion: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation='insert_metrics') from e
+    
+    def _write_audit_log(
+        self,
+        session: Session,
+        file_info: IDPSFileInfo,
+        status: str,
+        rows_processed: int,
+        error_message: Optional[str],
+        records_inserted: Optional[int]
+    ) -> int:
+        """Insère ou met à jour le log d'audit d'un fichier dans la session (voir `insert_audit_log`)"""
+        records_expected = rows_processed
+        if records_inserted is None:
+            records_inserted = rows_processed if status == 'success' else 0
+
+        # Vérifier si un log existe déjà pour ce fichier (idempotence par file_name)
+        existing: Optional[IDPSAuditLogModel] = (
+            session.query(IDPSAuditLogModel)
+            .filter(IDPSAuditLogModel.file_name == file_info.name)
+            .one_or_none()
+        )
+
+        if existing:
+            # Mettre à jour le log existant
+            existing.file_type = file_info.file_type
+            existing.file_date = file_info.date
+            existing.records_expected = records_expected
+            existing.records_inserted = records_inserted
+            existing.status = status
+            existing.error_message = error_message
+            # On met à jour seulement ended_at; on ne touche pas started_at initial
+            existing.ended_at = datetime.now()
+            log_id = existing.id
+            logger.info(
+                f"Log d'audit IDPS mis à jour pour le fichier {file_info.name} (ID: {log_id})"
+            )
+            return log_id
+
+        # Aucun log existant : création
+        audit_log = IDPSAuditLogModel(
+            file_name=file_info.name,
+            file_type=file_info.file_type,
+            file_date=file_info.date,
+            records_expected=records_expected,
+            records_inserted=records_inserted,
+            status=status,
+            error_message=error_message,
+            started_at=file_info.ingestion_timestamp or datetime.now(),
+            ended_at=datetime.now(),
+        )
+
+        session.add(audit_log)
+        session.flush()
+
+        log_id = audit_log.id
+        logger.info(f"Nouveau log d'audit IDPS inséré avec l'ID: {log_id}")
+        return log_id
+    
+    def _write_ingestion_metrics(
+        self,
+        session: Session,
+        file_info: IDPSFileInfo,
+        status: str,
+        metrics: IngestionMetrics
+    ) -> int:
+        """Insère la ligne de métriques d'un traitement dans la session (voir `insert_ingestion_metrics`)"""
+        metrics_row = IDPSIngestionMetricsModel(
+            file_name=file_info.name,
+            file_type=file_info.file_type,
+            status=status,
+            recorded_at=datetime.now(),
+            rows_processed=metrics.rows_processed,
+            file_size_bytes=metrics.file_size_bytes,
+            total_seconds=metrics.total_time,
+            rows_per_second=metrics.rows_per_second,
+            bytes_per_second=metrics.bytes_per_second,
+            peak_rss_bytes=metrics.peak_rss_bytes,
+            **{
+                f"{stage}_seconds": metrics.stage_timings.get(stage)
+                for stage in INGESTION_STAGES
+            }
+        )
+        session.add(metrics_row)
+        session.flush()
+        logger.debug(f"Métriques d'ingestion enregistrées pour {file_info.name} (ID: {metrics_row.id})")
+        return metrics_row.id
+    
+    def get_workflow_events(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """
         Récupère les événements de workflow (exemple de méthode de lecture)
         
         Args:
             limit: Nombre maximum d'événements à récupérer
             offset: Nombre d'événements à ignorer
+            since: Horodatage d'événement minimal (inclus)
+            until: Horodatage d'événement maximal (exclu)
         
         Returns:
             Liste des événements de workflow
         """
         try:
             with self._get_session() as session:
-                events = session.query(IDPSWorkflowEventModel)\
+                # Filtre sur event_timestamp : seules les partitions concernées sont lues
+                query = self._event_period_filter(session.query(IDPSWorkflowEventModel), IDPSWorkflowEventModel, since, until)
+                events = query\
                     .order_by(IDPSWorkflowEventModel.ingested_at.desc())\
                     .limit(limit)\
                     .offset(offset)\
@@ -249,20 +530,30 @@ class IDPSDatabaseRepository(IModuleRepository):
             logger.error(error_msg)
             raise DatabaseError(error_msg, module=self.module, operation='get_workflow_events') from e
     
-    def get_error_events(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    def get_error_events(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """
         Récupère les événements d'erreur (exemple de méthode de lecture)
         
         Args:
             limit: Nombre maximum d'événements à récupérer
             offset: Nombre d'événements à ignorer
+            since: Horodatage d'événement minimal (inclus)
+            until: Horodatage d'événement maximal (exclu)
         
         Returns:
             Liste des événements d'erreur
         """
         try:
             with self._get_session() as session:
-                events = session.query(IDPSErrorEventModel)\
+                # Filtre sur event_timestamp : seules les partitions concernées sont lues
+                query = self._event_period_filter(session.query(IDPSErrorEventModel), IDPSErrorEventModel, since, until)
+                events = query\
                     .order_by(IDPSErrorEventModel.ingested_at.desc())\
                     .limit(limit)\
                     .offset(offset)\
@@ -274,3 +565,123 @@ class IDPSDatabaseRepository(IModuleRepository):
             error_msg = f"Erreur SQLAlchemy lors de la récupération des événements: {e}"
             logger.error(error_msg)
             raise DatabaseError(error_msg, module=self.module, operation='get_error_events') from e
+    
+    def get_workflow_events_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> EventPage:
+        """
+        Récupère une page d'événements de workflow (pagination par curseur)
+        
+        Contrairement à `get_workflow_events`, le coût d'une page ne dépend pas
+        de sa profondeur et une ingestion concurrente ne décale pas les pages.
+        
+        Args:
+            limit: Nombre maximum d'événements de la page
+            cursor: `next_cursor` de la page précédente (None : première page)
+            since: Horodatage d'événement minimal (inclus)
+            until: Horodatage d'événement maximal (exclu)
+        
+        Returns:
+            EventPage (événements, du plus récemment ingéré au plus ancien, et curseur suivant)
+        
+        Raises:
+            ValueError: Si `limit` n'est pas strictement positif ou si le curseur est invalide
+        """
+        return self._get_events_page(IDPSWorkflowEventModel, 'get_workflow_events_page', limit, cursor, since, until)
+    
+    def get_error_events_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> EventPage:
+        """
+        Récupère une page d'événements d'erreur (pagination par curseur)
+        
+        Args:
+            limit: Nombre maximum d'événements de la page
+            cursor: `next_cursor` de la page précédente (None : première page)
+            since: Horodatage d'événement minimal (inclus)
+            until: Horodatage d'événement maximal (exclu)
+        
+        Returns:
+            EventPage (événements, du plus récemment ingéré au plus ancien, et curseur suivant)
+        
+        Raises:
+            ValueError: Si `limit` n'est pas strictement positif ou si le curseur est invalide
+        """
+        return self._get_events_page(IDPSErrorEventModel, 'get_error_events_page', limit, cursor, since, until)
+    
+    def _get_events_page(
+        self,
+        model,
+        operation: str,
+        limit: int,
+        cursor: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> EventPage:
+        """
+        Lit une page d'événements d'un modèle
+        
+        Raises:
+            ValueError: Si la taille de page ou le curseur est invalide (vérifiés avant d'ouvrir la session)
+        """
+        statement = keyset_query(model, limit, cursor, since, until)
+        try:
+            with self._get_session() as session:
+                return keyset_page(session, model, statement, limit)
+        except SQLAlchemyError as e:
+            error_msg = f"Erreur SQLAlchemy lors de la récupération des événements: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation=operation) from e
+    
+    def export_events(
+        self,
+        category: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 10000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Exporte les événements d'une période par lots, sans les charger tous en mémoire
+        
+        Curseur côté serveur sous PostgreSQL : la mémoire utilisée est bornée par
+        `batch_size`, quel que soit le volume exporté. La session reste ouverte
+        tant que le générateur n'est pas épuisé ou fermé.
+        
+        Args:
+            category: Catégorie ('workflow' ou 'error')
+            since: Horodatage d'événement minimal (inclus)
+            until: Horodatage d'événement maximal (exclu)
+            batch_size: Nombre d'événements par lot
+        
+        Yields:
+            Lots d'événements (dictionnaires au format de `to_dict()`), par ordre d'ingestion
+        """
+        model = IDPSErrorEventModel if category == 'error' else IDPSWorkflowEventModel
+        rows_exported = 0
+        try:
+            with self._get_session() as session:
+                for batch in iter_event_batches(session, model, since, until, batch_size):
+                    rows_exported += len(batch)
+                    yield batch
+        except SQLAlchemyError as e:
+            error_msg = f"Erreur SQLAlchemy lors de l'export des événements de {model.__table__.name}: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation='export_events') from e
+        logger.info(f"{rows_exported} événements exportés depuis {model.__table__.name}")
+    
+    @staticmethod
+    def _event_period_filter(query, model, since: Optional[datetime], until: Optional[datetime]):
+        """Restreint une requête à une période d'événements [since, until)"""
+        if since is not None:
+            query = query.filter(model.event_timestamp >= since)
+        if until is not None:
+            query = query.filter(model.event_timestamp < until)
+        return query
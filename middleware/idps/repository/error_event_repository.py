@@ -1,7 +1,7 @@
 """
 Repository SQLAlchemy pour la table idps.error_events
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 from contextlib import contextmanager
 from datetime import datetime
@@ -12,6 +12,9 @@ from sqlalchemy.orm import Session
 from middleware.idps.config.database_config import IDPSDatabaseConfig
 from middleware.idps.config.sqlalchemy_config import get_session, init_database
 from middleware.idps.models.error_event_model import IDPSErrorEventModel
+from middleware.idps.models.event_page import EventPage
+from middleware.idps.repository.event_insert import insert_ignoring_duplicates
+from middleware.idps.repository.event_query import keyset_query, keyset_page
 from middleware.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
@@ -26,8 +29,8 @@ class ErrorEventRepository:
         init_database(self.db_config)
 
     @contextmanager
-    def _get_session(self) -> Session:
-        session = get_session(self.db_config)
+    def _get_session(self, profile: str = 'interactive') -> Session:
+        session = get_session(self.db_config, profile)
         try:
             yield session
             session.commit()
@@ -45,10 +48,9 @@ class ErrorEventRepository:
             return 0
 
         try:
-            with self._get_session() as session:
-                events = []
-                for row in data:
-                    event = IDPSErrorEventModel(
+            with self._get_session('bulk') as session:
+                events = [
+                    dict(
                         event_timestamp=row.get('event_timestamp', datetime.now()),
                         document_type=row.get('document_type', ''),
                         destination_code=row.get('destination_code', ''),
@@ -59,12 +61,11 @@ class ErrorEventRepository:
                         file_name=row.get('file_name', ''),
                         ingested_at=row.get('ingested_at', datetime.now()),
                     )
-                    events.append(event)
-
-                session.bulk_save_objects(events)
-                session.flush()
+                    for row in data
+                ]
 
-                rows_inserted = len(events)
+                # Événements déjà présents (même clé naturelle) ignorés
+                rows_inserted = insert_ignoring_duplicates(session, IDPSErrorEventModel, events)
                 logger.info(f"{rows_inserted} événements d'erreur insérés dans idps.error_events")
                 return rows_inserted
 
@@ -95,3 +96,16 @@ class ErrorEventRepository:
             error_msg = f"Erreur SQLAlchemy lors de la récupération des événements d'erreur: {e}"
             logger.error(error_msg)
             raise DatabaseError(error_msg, module=self.module, operation='get') from e
+
+    def get_events_page(self, limit: int = 100, cursor: Optional[str] = None) -> EventPage:
+        """Récupère une page d'événements d'erreur récents (pagination par curseur sur (ingested_at, id))"""
+        # Taille de page et curseur vérifiés avant d'ouvrir la session (ValueError)
+        statement = keyset_query(IDPSErrorEventModel, limit, cursor)
+        try:
+            with self._get_session() as session:
+                return keyset_page(session, IDPSErrorEventModel, statement, limit)
+
+        except SQLAlchemyError as e:
+            error_msg = f"Erreur SQLAlchemy lors de la récupération des événements d'erreur: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation='get') from e
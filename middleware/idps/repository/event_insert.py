@@ -0,0 +1,106 @@
+"""
+Insertion idempotente des événements IDPS sur leur clé naturelle
+
+Deux modes : insertion directe dans la table cible, ou chargement dans une
+table temporaire de staging (sans index ni contrainte) fusionnée ensuite dans
+la cible par un seul `INSERT ... SELECT` ensembliste.
+"""
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import Column, MetaData, Table, select, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Constructeurs d'INSERT supportant ON CONFLICT, par dialecte
+_DIALECT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def insert_ignoring_duplicates(session: Session, model, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insère des lignes avec `INSERT ... ON CONFLICT (clé naturelle) DO NOTHING`
+
+    Les lignes déjà présentes en base (ré-ingestion d'un fichier) ou répétées
+    dans le lot sont ignorées sans erreur. Les lignes sont envoyées par lots
+    multi-VALUES (`insertmanyvalues`) ; seuls les ids des lignes réellement
+    insérées sont retournés par `RETURNING`.
+
+    Args:
+        session: Session SQLAlchemy (la transaction reste celle de l'appelant)
+        model: Modèle d'événement cible (définit `NATURAL_KEY`)
+        rows: Lignes à insérer, toutes avec les mêmes clés
+
+    Returns:
+        Nombre de lignes réellement insérées
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    insert = _DIALECT_INSERTS[session.get_bind().dialect.name]
+    statement = (
+        insert(table)
+        .on_conflict_do_nothing(index_elements=list(model.NATURAL_KEY))
+        .returning(table.c.id)
+    )
+    result = session.execute(statement, rows)
+    return sum(1 for _ in result)
+
+
+def create_staging_table(session: Session, model, columns: Sequence[str]) -> Table:
+    """
+    Crée la table temporaire de staging d'une table d'événements
+
+    La table ne porte que les colonnes chargées, avec leurs types, sans clé
+    primaire, index ni contrainte : le remplissage ne coûte aucune maintenance
+    d'index. Temporaire, elle n'est pas journalisée (WAL) sous PostgreSQL et
+    reste propre à la connexion (chargements parallèles sans collision).
+
+    Args:
+        session: Session SQLAlchemy (la table est créée dans sa transaction)
+        model: Modèle d'événement cible
+        columns: Colonnes chargées
+
+    Returns:
+        Table de staging (à supprimer via `drop_staging_table`)
+    """
+    table = model.__table__
+    staging = Table(
+        f"{table.name}_staging",
+        MetaData(),
+        *(Column(name, table.c[name].type) for name in columns),
+        prefixes=['TEMPORARY']
+    )
+    staging.create(session.connection())
+    return staging
+
+
+def merge_staging_table(session: Session, model, staging: Table) -> int:
+    """
+    Verse la table de staging dans la table cible en une instruction ensembliste
+
+    `INSERT ... SELECT ... ON CONFLICT (clé naturelle) DO NOTHING` : les index
+    de la cible sont mis à jour en une passe et les doublons ignorés.
+
+    Returns:
+        Nombre de lignes réellement insérées
+    """
+    table = model.__table__
+    insert = _DIALECT_INSERTS[session.get_bind().dialect.name]
+    columns = [column.name for column in staging.columns]
+    statement = (
+        insert(table)
+        # `WHERE true` : requis par SQLite pour distinguer ON CONFLICT d'une jointure
+        .from_select(columns, select(*staging.columns).where(true()))
+        .on_conflict_do_nothing(index_elements=list(model.NATURAL_KEY))
+        # Le nombre de lignes d'un INSERT n'est conservé par SQLAlchemy que sur demande
+        .execution_options(preserve_rowcount=True)
+    )
+    return max(session.execute(statement).rowcount, 0)
+
+
+def drop_staging_table(session: Session, staging: Table) -> None:
+    """Supprime la table de staging (dans la transaction du chargement)"""
+    staging.drop(session.connection())
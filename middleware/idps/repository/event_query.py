@@ -0,0 +1,152 @@
+"""
+Lecture des événements IDPS : pagination par curseur et export en flux
+
+Les pages sont ordonnées sur (ingested_at, id) et la page suivante reprend
+après le dernier couple lu (`WHERE (ingested_at, id) < (...)`), via l'index
+composite correspondant : le coût d'une page ne dépend pas de sa profondeur,
+contrairement à LIMIT/OFFSET. Les lignes sont lues comme des tuples Core,
+sans instancier d'objets ORM.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import DateTime, Select, select, tuple_
+from sqlalchemy.orm import Session
+
+from middleware.idps.models.event_page import EventPage
+
+
+def encode_cursor(ingested_at: datetime, event_id: int) -> str:
+    """Encode la position du dernier événement lu en curseur opaque"""
+    payload = json.dumps([ingested_at.isoformat(), event_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Décode un curseur produit par `encode_cursor`
+
+    Raises:
+        ValueError: Si le curseur est invalide
+    """
+    try:
+        ingested_at, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(ingested_at), int(event_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Curseur de pagination invalide: {cursor!r}") from e
+
+
+def event_select(model, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Select:
+    """Colonnes de la table d'un modèle d'événement, restreintes à une période [since, until) d'événements"""
+    table = model.__table__
+    statement = select(table)
+    if since is not None:
+        statement = statement.where(table.c.event_timestamp >= since)
+    if until is not None:
+        statement = statement.where(table.c.event_timestamp < until)
+    return statement
+
+
+def _row_converter(model):
+    """Convertisseur de ligne Core en dictionnaire, au format de `to_dict()` des modèles"""
+    datetime_columns = frozenset(
+        column.name for column in model.__table__.columns if isinstance(column.type, DateTime)
+    )
+
+    def to_dict(row) -> Dict[str, Any]:
+        return {
+            key: value.isoformat() if key in datetime_columns and value is not None else value
+            for key, value in row._mapping.items()
+        }
+
+    return to_dict
+
+
+def keyset_query(
+    model,
+    limit: int,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Select:
+    """
+    Construit la requête d'une page d'événements, du plus récemment ingéré au plus ancien
+
+    Ne nécessite pas de session : les paramètres invalides sont refusés
+    avant toute connexion à la base.
+
+    Args:
+        model: Modèle d'événement
+        limit: Nombre maximal d'événements de la page
+        cursor: Curseur retourné par la page précédente (None : première page)
+        since: Horodatage d'événement minimal (inclus)
+        until: Horodatage d'événement maximal (exclu)
+
+    Returns:
+        Requête à exécuter par `keyset_page`
+
+    Raises:
+        ValueError: Si la taille de page n'est pas strictement positive ou si le curseur est invalide
+    """
+    if limit <= 0:
+        raise ValueError(f"Taille de page invalide: {limit} (doit être strictement positive)")
+    table = model.__table__
+    statement = event_select(model, since, until)
+    if cursor is not None:
+        ingested_at, event_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(table.c.ingested_at, table.c.id) < tuple_(ingested_at, event_id))
+    # Une ligne de plus que la page : indique s'il reste des événements
+    return statement.order_by(table.c.ingested_at.desc(), table.c.id.desc()).limit(limit + 1)
+
+
+def keyset_page(session: Session, model, statement: Select, limit: int) -> EventPage:
+    """
+    Lit une page d'événements
+
+    Args:
+        session: Session SQLAlchemy
+        model: Modèle d'événement
+        statement: Requête construite par `keyset_query` avec la même taille de page
+        limit: Nombre maximal d'événements de la page
+
+    Returns:
+        EventPage (événements et curseur de la page suivante)
+    """
+    rows = session.execute(statement).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].ingested_at, rows[-1].id)
+    to_dict = _row_converter(model)
+    return EventPage(events=[to_dict(row) for row in rows], next_cursor=next_cursor)
+
+
+def iter_event_batches(
+    session: Session,
+    model,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: int = 10000
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lit tous les événements d'une période par lots, en mémoire constante
+
+    `yield_per` active un curseur côté serveur (PostgreSQL) : seules
+    `batch_size` lignes sont transférées et converties à la fois. Ordre
+    croissant (ingested_at, id), stable entre deux exports.
+
+    Yields:
+        Lots d'au plus `batch_size` événements (dictionnaires au format de `to_dict()`)
+    """
+    table = model.__table__
+    statement = (
+        event_select(model, since, until)
+        .order_by(table.c.ingested_at, table.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    to_dict = _row_converter(model)
+    for rows in session.execute(statement).partitions():
+        yield [to_dict(row) for row in rows]
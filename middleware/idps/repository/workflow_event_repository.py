@@ -1,7 +1,7 @@
 """
 Repository SQLAlchemy pour la table idps.workflow_events
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 from contextlib import contextmanager
 from datetime import datetime
@@ -12,6 +12,9 @@ from sqlalchemy.orm import Session
 from middleware.idps.config.database_config import IDPSDatabaseConfig
 from middleware.idps.config.sqlalchemy_config import get_session, init_database
 from middleware.idps.models.workflow_event_model import IDPSWorkflowEventModel
+from middleware.idps.models.event_page import EventPage
+from middleware.idps.repository.event_insert import insert_ignoring_duplicates
+from middleware.idps.repository.event_query import keyset_query, keyset_page
 from middleware.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
@@ -26,8 +29,8 @@ class WorkflowEventRepository:
         init_database(self.db_config)
 
     @contextmanager
-    def _get_session(self) -> Session:
-        session = get_session(self.db_config)
+    def _get_session(self, profile: str = 'interactive') -> Session:
+        session = get_session(self.db_config, profile)
         try:
             yield session
             session.commit()
@@ -45,10 +48,9 @@ class WorkflowEventRepository:
             return 0
 
         try:
-            with self._get_session() as session:
-                events = []
-                for row in data:
-                    event = IDPSWorkflowEventModel(
+            with self._get_session('bulk') as session:
+                events = [
+                    dict(
                         event_timestamp=row.get('event_timestamp', datetime.now()),
                         document_type=row.get('document_type', ''),
                         destination_code=row.get('destination_code', ''),
@@ -57,12 +59,11 @@ class WorkflowEventRepository:
                         file_name=row.get('file_name', ''),
                         ingested_at=row.get('ingested_at', datetime.now()),
                     )
-                    events.append(event)
-
-                session.bulk_save_objects(events)
-                session.flush()
+                    for row in data
+                ]
 
-                rows_inserted = len(events)
+                # Événements déjà présents (même clé naturelle) ignorés
+                rows_inserted = insert_ignoring_duplicates(session, IDPSWorkflowEventModel, events)
                 logger.info(f"{rows_inserted} événements insérés dans idps.workflow_events")
                 return rows_inserted
 
@@ -93,3 +94,16 @@ class WorkflowEventRepository:
             error_msg = f"Erreur SQLAlchemy lors de la récupération des événements de workflow: {e}"
             logger.error(error_msg)
             raise DatabaseError(error_msg, module=self.module, operation='get') from e
+
+    def get_events_page(self, limit: int = 100, cursor: Optional[str] = None) -> EventPage:
+        """Récupère une page d'événements de workflow récents (pagination par curseur sur (ingested_at, id))"""
+        # Taille de page et curseur vérifiés avant d'ouvrir la session (ValueError)
+        statement = keyset_query(IDPSWorkflowEventModel, limit, cursor)
+        try:
+            with self._get_session() as session:
+                return keyset_page(session, IDPSWorkflowEventModel, statement, limit)
+
+        except SQLAlchemyError as e:
+            error_msg = f"Erreur SQLAlchemy lors de la récupération des événements de workflow: {e}"
+            logger.error(error_msg)
+            raise DatabaseError(error_msg, module=self.module, operation='get') from e
@@ -1,7 +1,8 @@
 """
 Scheduler pour l'exécution automatique du micro-middleware IDPS
-Exécution planifiée via schedule (cron-like)
+Exécution planifiée via schedule (cron-like) ou surveillance continue du répertoire d'entrée
 """
+import os
 import schedule
 import time
 import logging
@@ -18,8 +19,15 @@ def main():
     """Configure et démarre le scheduler pour IDPS"""
     files_config = IDPSFilesConfig.from_env()
     
+    # Mode surveillance : traitement des fichiers dès leur dépôt
+    if os.getenv('SCHEDULER_MODE', 'daily').lower() == 'watch':
+        from middleware.idps.watcher import main as idps_watcher_main
+        logger.info(f"Scheduler IDPS en mode surveillance du répertoire {files_config.input_dir}")
+        idps_watcher_main()
+        return
+    
     # Configuration du scheduler (peut être spécifique à IDPS ou utiliser la config globale)
-    start_time = '03:00'  # TODO: Peut être chargé depuis la config
+    start_time = os.getenv('SCHEDULER_START_TIME', '03:00')
     
     # Planifier l'exécution quotidienne
     schedule.every().day.at(start_time).do(idps_main)
@@ -1,7 +1,13 @@
 """
 Script d'initialisation de la base de données IDPS avec SQLAlchemy
 Crée les tables si elles n'existent pas
+
+Migrations des tables d'événements existantes (étapes explicites) :
+    python middleware/idps/scripts/init_database.py --create-indexes [--dedupe] [--dry-run]
+    python middleware/idps/scripts/init_database.py --convert-partitions
+    python middleware/idps/scripts/init_database.py --drop-unpartitioned
 """
+import argparse
 import sys
 from pathlib import Path
 
@@ -9,18 +15,64 @@ from pathlib import Path
 root_dir = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
-from middleware.idps.config.sqlalchemy_config import init_database
+from middleware.idps.config.sqlalchemy_config import (
+    convert_event_tables,
+    drop_unpartitioned_tables,
+    init_database,
+    migrate_event_indexes,
+)
 from middleware.utils.logger import setup_logger
 
 logger = setup_logger('init_database')
 
 
-def main():
+def parse_args(argv=None):
+    """Analyse les arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Initialisation et migration de la base de données IDPS")
+    parser.add_argument(
+        '--create-indexes', action='store_true',
+        help="Créer les index absents des tables d'événements existantes (CONCURRENTLY sous PostgreSQL)"
+    )
+    parser.add_argument(
+        '--dedupe', action='store_true',
+        help="Supprimer les doublons de clé naturelle avant de créer l'index unique (implique --create-indexes)"
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help="Compter les doublons et lister les index à créer, sans rien modifier"
+    )
+    parser.add_argument(
+        '--convert-partitions', action='store_true',
+        help="Convertir les tables d'événements non partitionnées (DB_PARTITION_INTERVAL, ingestion arrêtée) ; "
+             "les anciennes tables sont conservées sous <table>_unpartitioned"
+    )
+    parser.add_argument(
+        '--drop-unpartitioned', action='store_true',
+        help="Supprimer les tables <table>_unpartitioned après vérification de leurs lignes"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Initialise la base de données IDPS"""
+    args = parse_args(argv)
     logger.info("Initialisation de la base de données IDPS...")
     
     try:
-        init_database()
+        if args.create_indexes or args.dedupe or args.dry_run:
+            indexes = migrate_event_indexes(dedupe=args.dedupe, dry_run=args.dry_run)
+            if args.dry_run:
+                logger.info(f"Index à créer: {', '.join(indexes) or 'aucun'} (aucune modification effectuée)")
+                return
+            logger.info(f"Index créé(s): {', '.join(indexes) or 'aucun'}")
+        if args.convert_partitions:
+            tables = convert_event_tables()
+            logger.info(f"Table(s) convertie(s): {', '.join(tables) or 'aucune'}")
+        if args.drop_unpartitioned:
+            tables = drop_unpartitioned_tables()
+            logger.info(f"Ancienne(s) table(s) supprimée(s): {', '.join(tables) or 'aucune'}")
+        # Vérification complète explicite, même si la version de schéma est déjà enregistrée
+        init_database(force=True)
         logger.info("Base de données IDPS initialisée avec succès")
     except Exception as e:
         logger.error(f"Erreur lors de l'initialisation de la base de données: {e}", exc_info=True)
@@ -29,4 +81,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
@@ -5,10 +5,14 @@ from middleware.idps.services.file_validation_service import FileValidationServi
 from middleware.idps.services.data_transformation_service import DataTransformationService
 from middleware.idps.services.file_detection_service import FileDetectionService
 from middleware.idps.services.file_archive_service import FileArchiveService
+from middleware.idps.services.processed_file_registry import ProcessedFileRegistry
+from middleware.idps.services.reject_file_service import RejectFileService
 
 __all__ = [
     'FileValidationService',
     'DataTransformationService',
     'FileDetectionService',
-    'FileArchiveService'
+    'FileArchiveService',
+    'ProcessedFileRegistry',
+    'RejectFileService'
 ]
@@ -8,8 +8,11 @@ from typing import List, Dict, Any, Optional
 
 from middleware.idps.interfaces import IDataTransformer
 from middleware.idps.models.transformation_result import TransformationResult
+from middleware.idps.models.constraint_validation_result import RejectedRow, SOURCE_FIELDS
 from middleware.idps.models.file_info import IDPSFileInfo
 from middleware.idps.config.files_config import IDPSFilesConfig
+from middleware.idps.timestamp_parser import IDPSTimestampParser
+from middleware.utils.logger import RowIssueAggregator
 from middleware.exceptions import DataTransformationError
 
 logger = logging.getLogger(__name__)
@@ -18,10 +21,30 @@ logger = logging.getLogger(__name__)
 class DataTransformationService(IDataTransformer):
     """Service de transformation et normalisation des données CSV pour IDPS"""
     
+    # Formats de date courants (par ordre de priorité)
+    DATE_FORMATS = (
+        '%Y-%m-%d',
+        '%Y-%m-%d %H:%M:%S',
+        '%Y-%m-%d %H:%M:%S.%f',
+        '%d/%m/%Y',
+        '%d/%m/%Y %H:%M:%S',
+        '%Y-%m-%dT%H:%M:%S',
+        '%Y-%m-%dT%H:%M:%S.%f',
+        '%Y/%m/%d',
+        '%d-%m-%Y'
+    )
+    
+    # Motifs identifiant une colonne de date
+    DATE_PATTERNS = ('date', 'timestamp', 'time', 'created', 'updated')
+    
+    # Motifs identifiant une colonne pouvant contenir du JSON
+    JSON_PATTERNS = ('json', 'data', 'payload', 'metadata')
+    
     def __init__(self, files_config: IDPSFilesConfig = None):
         """Initialise le service de transformation"""
         self.files_config = files_config or IDPSFilesConfig.from_env()
         self.date_format = self.files_config.date_format
+        self.timestamp_parser = IDPSTimestampParser(self.DATE_FORMATS)
     
     def transform(self, data: List[Dict[str, Any]], file_info: IDPSFileInfo) -> TransformationResult:
         """
@@ -39,19 +62,27 @@ class DataTransformationService(IDataTransformer):
         """
         original_count = len(data)
         transformed_data = []
-        errors = []
+        rejected_rows = []
+        # Lignes en erreur : les premières sont journalisées, les suivantes seulement comptées
+        row_issues = RowIssueAggregator(logger)
         
-        for row in data:
+        # Parser les colonnes de date en une fois (format inféré sur les premières lignes)
+        self.timestamp_parser.reset_stats()
+        parsed_dates = self._parse_date_columns(data)
+        
+        for index, row in enumerate(data):
             try:
-                transformed_row = self._transform_row(row, file_info)
+                row_dates = {key: values[index] for key, values in parsed_dates.items()}
+                transformed_row = self._transform_row(row, file_info, row_dates)
                 if transformed_row:
                     transformed_data.append(transformed_row)
             except Exception as e:
-                line_num = row.get('_line_number', 'unknown')
-                error_msg = f"Ligne {line_num}: {str(e)}"
-                errors.append(error_msg)
-                logger.warning(error_msg)
+                row_issues.record(row.get('_line_number', 'unknown'), e)
+                rejected_rows.append(RejectedRow(
+                    row.get('_line_number'), f"{type(e).__name__}: {e}", row, row.get('_raw_line')
+                ))
                 # Continuer avec les autres lignes
+        row_issues.log_summary(file_info.name)
         
         transformed_count = len(transformed_data)
         success_rate = (transformed_count / original_count * 100) if original_count > 0 else 0
@@ -61,14 +92,48 @@ class DataTransformationService(IDataTransformer):
             f"({success_rate:.1f}% de succès)"
         )
         
+        unparseable_dates = self.timestamp_parser.unparseable_count
+        if unparseable_dates:
+            logger.warning(f"{unparseable_dates} valeur(s) de date non reconnue(s), conservée(s) telles quelles")
+        
         return TransformationResult(
             transformed_data=transformed_data,
             original_count=original_count,
             transformed_count=transformed_count,
-            errors=errors
+            errors=row_issues.samples,
+            unparseable_dates=unparseable_dates,
+            error_count=row_issues.count,
+            rejected_rows=rejected_rows
         )
     
-    def _transform_row(self, row: Dict[str, Any], file_info: IDPSFileInfo) -> Optional[Dict[str, Any]]:
+    @classmethod
+    def is_date_column(cls, key: Any) -> bool:
+        """Indique si une colonne est traitée comme une date (d'après son nom)"""
+        return isinstance(key, str) and any(pattern in key.lower() for pattern in cls.DATE_PATTERNS)
+    
+    @classmethod
+    def is_json_column(cls, key: Any) -> bool:
+        """Indique si une colonne peut contenir du JSON (d'après son nom)"""
+        return isinstance(key, str) and any(pattern in key.lower() for pattern in cls.JSON_PATTERNS)
+    
+    def _parse_date_columns(self, data: List[Dict[str, Any]]) -> Dict[str, List[Optional[datetime]]]:
+        """Parse les colonnes de date de l'en-tête (première ligne) sur l'ensemble des lignes"""
+        if not data:
+            return {}
+        
+        parsed_dates = {}
+        for key in data[0].keys():
+            if self.is_date_column(key):
+                values = [row.get(key) for row in data]
+                parsed_dates[key] = self.timestamp_parser.parse_column(values)
+        return parsed_dates
+    
+    def _transform_row(
+        self,
+        row: Dict[str, Any],
+        file_info: IDPSFileInfo,
+        row_dates: Optional[Dict[str, Optional[datetime]]] = None
+    ) -> Optional[Dict[str, Any]]:
         """Transforme une ligne individuelle"""
         # Créer la structure de base
         transformed = {
@@ -81,69 +146,50 @@ class DataTransformationService(IDataTransformer):
             'raw_data': row.copy()
         }
         
-        # Supprimer le champ interne _line_number
-        if '_line_number' in transformed['raw_data']:
-            del transformed['raw_data']['_line_number']
+        # Supprimer les champs internes (_line_number, _raw_line)
+        for source_field in SOURCE_FIELDS:
+            transformed['raw_data'].pop(source_field, None)
         
         # Normaliser les dates
-        transformed = self._normalize_dates(transformed, row)
+        transformed = self._normalize_dates(transformed, row, row_dates)
         
         # Extraire et parser les champs JSON si présents
         transformed = self._extract_json_fields(transformed, row)
         
         return transformed
     
-    def _normalize_dates(self, transformed: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
-        """Normalise les champs de date dans les données brutes"""
-        date_patterns = ['date', 'timestamp', 'time', 'created', 'updated']
-        
+    def _normalize_dates(
+        self,
+        transformed: Dict[str, Any],
+        row: Dict[str, Any],
+        row_dates: Optional[Dict[str, Optional[datetime]]] = None
+    ) -> Dict[str, Any]:
+        """Normalise les champs de date dans les données brutes (dates déjà parsées par colonne si fournies)"""
         for key, value in row.items():
-            # Ignorer les clés non textuelles (par ex. None si le CSV a des colonnes vides)
-            if not isinstance(key, str):
-                continue
-            if any(pattern in key.lower() for pattern in date_patterns):
+            # Les clés non textuelles (par ex. None si le CSV a des colonnes vides) sont ignorées
+            if self.is_date_column(key):
                 if value and isinstance(value, str):
-                    normalized_date = self._parse_date(value)
+                    if row_dates is not None and key in row_dates:
+                        normalized_date = row_dates[key]
+                    else:
+                        normalized_date = self._parse_date(value)
                     if normalized_date:
                         transformed['raw_data'][key] = normalized_date.isoformat()
         
         return transformed
     
     def _parse_date(self, date_str: str) -> Optional[datetime]:
-        """Parse une chaîne de date en objet datetime"""
+        """Parse une chaîne de date en objet datetime (None si non reconnue)"""
         if not date_str or not isinstance(date_str, str):
             return None
         
-        # Formats de date courants
-        date_formats = [
-            '%Y-%m-%d',
-            '%Y-%m-%d %H:%M:%S',
-            '%d/%m/%Y',
-            '%d/%m/%Y %H:%M:%S',
-            '%Y-%m-%dT%H:%M:%S',
-            '%Y-%m-%dT%H:%M:%S.%f',
-            '%Y/%m/%d',
-            '%d-%m-%Y'
-        ]
-        
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(date_str.strip(), fmt)
-            except ValueError:
-                continue
-        
-        logger.debug(f"Impossible de parser la date: {date_str}")
-        return None
+        return self.timestamp_parser.parse(date_str)
     
     def _extract_json_fields(self, transformed: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
         """Extrait et parse les champs JSON"""
-        json_patterns = ['json', 'data', 'payload', 'metadata']
-        
         for key, value in row.items():
-            # Ignorer les clés non textuelles (par ex. None si le CSV a des colonnes en trop)
-            if not isinstance(key, str):
-                continue
-            if any(pattern in key.lower() for pattern in json_patterns):
+            # Les clés non textuelles (par ex. None si le CSV a des colonnes en trop) sont ignorées
+            if self.is_json_column(key):
                 if value and isinstance(value, str):
                     try:
                         parsed_json = json.loads(value)
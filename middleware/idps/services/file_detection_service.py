@@ -3,11 +3,12 @@ Service de détection de fichiers pour IDPS
 """
 import logging
 from pathlib import Path
-from typing import List, Set
+from typing import List, Set, Dict, Tuple, Optional
 
 from middleware.idps.config.files_config import IDPSFilesConfig
 from middleware.idps.file_pattern import IDPSFilePatternMatcher
 from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.services.processed_file_registry import ProcessedFileRegistry
 from middleware.exceptions import FileDetectionError
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,12 @@ class FileDetectionService:
         self.files_config = files_config or IDPSFilesConfig.from_env()
         self.pattern_matcher = IDPSFilePatternMatcher()
         self.processed_files: Set[str] = set()
+        
+        # Registre persistant (survit aux redémarrages) : clé nom + taille + empreinte du contenu
+        index_path = self.files_config.processed_index_path
+        self.registry: Optional[ProcessedFileRegistry] = ProcessedFileRegistry(index_path) if index_path else None
+        # Cache des empreintes par (nom, taille, mtime) pour ne pas relire un fichier inchangé
+        self._fingerprints: Dict[Tuple[str, int, float], str] = {}
     
     def detect_files(self, input_dir: Path = None) -> List[IDPSFileInfo]:
         """
@@ -49,21 +56,41 @@ class FileDetectionService:
         
         try:
             for file_path in scan_dir.glob('*.csv'):
-                if not self.pattern_matcher.matches(file_path.name):
-                    continue
-                
-                if self._is_already_processed(file_path):
-                    continue
-                
-                file_info = self._create_file_info(file_path)
+                file_info = self.detect_file(file_path)
                 if file_info:
                     detected_files.append(file_info)
-                    logger.info(f"Fichier IDPS détecté: {file_path.name}")
         except Exception as e:
             raise FileDetectionError(f"Erreur lors du scan du répertoire: {e}") from e
         
         return detected_files
     
+    def detect_file(self, file_path: Path) -> Optional[IDPSFileInfo]:
+        """
+        Détecte un fichier IDPS unique (utilisé par le mode surveillance)
+        
+        Args:
+            file_path: Chemin du fichier candidat
+        
+        Returns:
+            IDPSFileInfo si le fichier est un fichier IDPS à traiter, None sinon
+        """
+        if not self.pattern_matcher.matches(file_path.name):
+            return None
+        
+        if self._is_already_processed(file_path):
+            return None
+        
+        file_info = self._create_file_info(file_path)
+        if not file_info:
+            return None
+        
+        if self._is_registered(file_info):
+            logger.info(f"Fichier IDPS déjà chargé (registre des fichiers traités), ignoré: {file_path.name}")
+            return None
+        
+        logger.info(f"Fichier IDPS détecté: {file_path.name}")
+        return file_info
+    
     def _create_file_info(self, file_path: Path) -> IDPSFileInfo:
         """Crée un objet IDPSFileInfo à partir d'un fichier"""
         parsed = self.pattern_matcher.parse_file_name(file_path.name)
@@ -71,18 +98,35 @@ class FileDetectionService:
             return None
         
         try:
+            stat = file_path.stat()
             return IDPSFileInfo(
                 path=file_path,
                 name=file_path.name,
                 file_type=parsed['file_type'],
                 date=parsed['date'],
-                size=file_path.stat().st_size,
-                category=parsed['category']
+                size=stat.st_size,
+                category=parsed['category'],
+                fingerprint=self._get_fingerprint(file_path, stat) if self.registry is not None else None
             )
         except (OSError, KeyError) as e:
             logger.warning(f"Erreur lors de la création de IDPSFileInfo pour {file_path.name}: {e}")
             return None
     
+    def _get_fingerprint(self, file_path: Path, stat) -> str:
+        """Retourne l'empreinte du contenu (recalculée seulement si le fichier a changé)"""
+        cache_key = (file_path.name, stat.st_size, stat.st_mtime)
+        fingerprint = self._fingerprints.get(cache_key)
+        if fingerprint is None:
+            fingerprint = ProcessedFileRegistry.fingerprint(file_path)
+            self._fingerprints[cache_key] = fingerprint
+        return fingerprint
+    
+    def _is_registered(self, file_info: IDPSFileInfo) -> bool:
+        """Vérifie si le fichier figure dans le registre persistant des fichiers traités"""
+        if self.registry is None or not file_info.fingerprint:
+            return False
+        return self.registry.contains((file_info.name, file_info.size, file_info.fingerprint))
+    
     def _is_already_processed(self, file_path: Path) -> bool:
         """Vérifie si un fichier a déjà été traité"""
         try:
@@ -121,6 +165,10 @@ class FileDetectionService:
             return
         
         self.processed_files.add(file_id)
+        
+        if self.registry is not None and file_info and file_info.fingerprint:
+            self.registry.add((file_info.name, file_info.size, file_info.fingerprint))
+        
         file_name = file_info.name if file_info else (file_path.name if file_path else "unknown")
         logger.debug(f"Fichier marqué comme traité: {file_name}")
 
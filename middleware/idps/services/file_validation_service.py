@@ -4,14 +4,16 @@ Utilise pandas pour lire les CSV
 """
 import chardet
 import logging
+import time
 import pandas as pd
-from io import StringIO
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Iterable, Iterator
 
 from middleware.idps.interfaces import IFileValidator
 from middleware.idps.models.validation_result import ValidationResult
 from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.models.constraint_validation_result import RejectedRow, SOURCE_FIELDS
 from middleware.idps.config.files_config import IDPSFilesConfig
 from middleware.exceptions import FileValidationError
 
@@ -49,24 +51,33 @@ class FileValidationService(IFileValidator):
                 line_count=0
             )
         
+        stage_timings = {}
         try:
             # Détecter l'encodage
-            encoding = self._detect_encoding(file_path)
+            start = time.perf_counter()
+            encoding = self.detect_encoding(file_path)
+            stage_timings['encoding_detection'] = time.perf_counter() - start
             if not encoding:
                 return ValidationResult(
                     is_valid=False,
                     error_message="Impossible de détecter l'encodage du fichier",
-                    line_count=0
+                    line_count=0,
+                    stage_timings=stage_timings
                 )
             
             # Lire et valider le format CSV
-            data, csv_error = self._read_and_validate_csv(file_path, encoding)
+            start = time.perf_counter()
+            rejected_rows: List[RejectedRow] = []
+            data, csv_error = self._read_and_validate_csv(file_path, encoding, rejected_rows)
+            stage_timings['csv_read'] = time.perf_counter() - start
             if csv_error:
                 return ValidationResult(
                     is_valid=False,
                     error_message=csv_error,
                     encoding=encoding,
-                    line_count=0
+                    line_count=0,
+                    stage_timings=stage_timings,
+                    rejected_rows=rejected_rows
                 )
             
             logger.info(f"Fichier validé avec succès: {file_path.name} ({len(data)} lignes)")
@@ -74,7 +85,9 @@ class FileValidationService(IFileValidator):
                 is_valid=True,
                 data=data,
                 encoding=encoding,
-                line_count=len(data)
+                line_count=len(data),
+                stage_timings=stage_timings,
+                rejected_rows=rejected_rows
             )
             
         except Exception as e:
@@ -82,7 +95,7 @@ class FileValidationService(IFileValidator):
             logger.error(error_msg, exc_info=True)
             raise FileValidationError(error_msg, file_path=str(file_path)) from e
     
-    def _detect_encoding(self, file_path: Path) -> Optional[str]:
+    def detect_encoding(self, file_path: Path) -> Optional[str]:
         """Détecte l'encodage du fichier"""
         try:
             with open(file_path, 'rb') as f:
@@ -101,100 +114,280 @@ class FileValidationService(IFileValidator):
             logger.error(f"Erreur lors de la détection d'encodage: {e}")
             return self.files_config.csv_encoding
     
-    def _read_and_validate_csv(self, file_path: Path, encoding: str) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
-        """Lit et valide le format CSV en utilisant pandas"""
+    def iter_csv_chunks(
+        self,
+        file_path: Path,
+        encoding: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        rejected_rows: Optional[List[RejectedRow]] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Lit un fichier CSV en flux et produit des blocs de lignes de taille fixe
+        
+        Le préambule, les lignes de séparation et le compteur final sont retirés
+        à la volée : le fichier n'est jamais entièrement chargé en mémoire. Les
+        lignes mal formées (trop de champs) sont écartées des blocs.
+        
+        Args:
+            file_path: Chemin du fichier à lire
+            encoding: Encodage du fichier (détecté si None)
+            chunk_size: Nombre de lignes par bloc (utilise la config si None)
+            rejected_rows: Liste complétée, au fil de la lecture, des lignes mal formées
+                (avant la production du bloc qui les suit)
+        
+        Yields:
+            Listes de dictionnaires (une entrée par ligne, avec `_line_number`
+            et `_raw_line` : numéro de ligne physique et texte source tel quel)
+        
+        Raises:
+            FileValidationError: Si le fichier est vide ou mal formé
+        """
+        encoding = encoding or self.detect_encoding(file_path)
+        chunk_size = chunk_size or self.files_config.csv_chunk_size
+        
         try:
-            # Lire le fichier brut pour gérer les lignes hors données (preambule/compteur)
             with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
-                raw_lines = f.readlines()
-
-            # Normaliser les tabulations (souvent présentes comme indentation/alignement)
-            raw_lines = [ln.replace('\t', ' ') for ln in raw_lines]
-
-            if not raw_lines:
-                return None, "Le fichier CSV est vide"
-
-            def _is_separator_line(line: str) -> bool:
-                """Détecte une ligne de séparation composée uniquement de tirets/points-virgules (tabs/espaces ignorés)."""
-                cleaned = line.strip().replace('\t', ' ').replace(self.files_config.csv_separator, '')
-                cleaned = cleaned.replace(' ', '')
-                return bool(cleaned) and set(cleaned) <= {'-'}
-
-            # Supprimer les lignes vides en tête
-            while raw_lines and not raw_lines[0].strip():
-                raw_lines.pop(0)
-
-            skipped_header_lines = 0
-
-            # Si la première ligne ne contient pas le séparateur, la considérer comme préambule
-            if raw_lines and self.files_config.csv_separator not in raw_lines[0]:
-                raw_lines.pop(0)
-                skipped_header_lines += 1
-
-            # Supprimer les lignes vides après préambule éventuel
-            while raw_lines and not raw_lines[0].strip():
-                raw_lines.pop(0)
-                skipped_header_lines += 1
-
-            # Retirer d'éventuelles lignes de séparation (----;---;---)
-            raw_lines = [ln for ln in raw_lines if not _is_separator_line(ln)]
-
-            # Supprimer une éventuelle ligne compteur en fin de fichier (pas de séparateur ou juste un entier)
-            if raw_lines:
-                tail = raw_lines[-1].strip()
-                if (self.files_config.csv_separator not in tail) or tail.isdigit():
-                    raw_lines.pop()
-
-            if not raw_lines:
-                return None, "Le fichier CSV ne contient aucune donnée après nettoyage"
-
-            cleaned_content = ''.join(raw_lines)
-
-            # Lire le CSV nettoyé avec pandas
-            df = pd.read_csv(
-                StringIO(cleaned_content),
-                encoding=encoding,
-                sep=self.files_config.csv_separator,
-                dtype=str,  # Tout lire comme string pour éviter les problèmes de type
-                keep_default_na=False,  # Ne pas convertir les chaînes vides en NaN
-                na_values=[''],  # Traiter les chaînes vides comme NaN mais les garder comme chaînes
-                on_bad_lines='skip',  # Ignorer les lignes mal formées
-                engine='python'  # Nécessaire pour skip_footer implicite via nettoyage
-            )
-            
-            # Vérifier que le fichier n'est pas vide
-            if df.empty:
-                return None, "Le fichier CSV est vide ou ne contient aucune donnée"
-            
-            # Nettoyer les noms de colonnes (supprimer BOM, espaces, etc.)
-            df.columns = df.columns.str.strip().str.lstrip('\ufeff').str.strip()
-            
-            # Convertir le DataFrame en liste de dictionnaires
-            data = []
-            for idx, row in df.iterrows():
-                row_dict = row.to_dict()
-                # Convertir les NaN en None et les garder comme chaînes vides
-                cleaned_row = {}
-                for key, value in row_dict.items():
-                    if pd.isna(value):
-                        cleaned_row[key] = None
-                    else:
-                        cleaned_row[key] = str(value) if value is not None else None
-                # Calcule le numéro de ligne d'origine en tenant compte des lignes ignorées et de l'en-tête
-                cleaned_row['_line_number'] = skipped_header_lines + idx + 2  # +2 car idx commence à 0 et on compte l'en-tête
-                data.append(cleaned_row)
-            
-            if not data:
-                return None, "Le fichier CSV ne contient aucune donnée valide"
-            
-            logger.debug(f"Fichier lu avec succès: {len(data)} lignes, {len(df.columns)} colonnes")
-            logger.debug(f"Colonnes détectées: {list(df.columns)}")
-            return data, None
+                stream = _CleanedCsvLineStream(f, self.files_config.csv_separator, rejected_rows)
+                if stream.raw_line_count == 0:
+                    raise FileValidationError("Le fichier CSV est vide", file_path=str(file_path))
+                
+                try:
+                    reader = pd.read_csv(
+                        stream,
+                        encoding=encoding,
+                        sep=self.files_config.csv_separator,
+                        dtype=str,  # Tout lire comme string pour éviter les problèmes de type
+                        keep_default_na=False,  # Ne pas convertir les chaînes vides en NaN
+                        na_values=[''],  # Traiter les chaînes vides comme NaN mais les garder comme chaînes
+                        on_bad_lines=stream.drop_bad_line,  # Lignes mal formées rejetées
+                        engine='python',  # Lecture ligne à ligne depuis le flux nettoyé
+                        chunksize=chunk_size
+                    )
+                except pd.errors.EmptyDataError:
+                    if stream.yielded_line_count == 0:
+                        raise FileValidationError(
+                            "Le fichier CSV ne contient aucune donnée après nettoyage",
+                            file_path=str(file_path)
+                        )
+                    raise
                 
-        except pd.errors.EmptyDataError:
-            return None, "Le fichier CSV est vide"
+                with reader:
+                    for df in reader:
+                        if df.empty:
+                            continue
+                        # Nettoyer les noms de colonnes (supprimer BOM, espaces, etc.)
+                        df.columns = df.columns.str.strip().str.lstrip('\ufeff').str.strip()
+                        yield self._dataframe_to_records(df, stream.take_source_lines(len(df)))
+        
+        except FileValidationError:
+            raise
+        except pd.errors.EmptyDataError as e:
+            raise FileValidationError("Le fichier CSV est vide", file_path=str(file_path)) from e
         except pd.errors.ParserError as e:
-            return None, f"Erreur de format CSV: {str(e)}"
+            raise FileValidationError(f"Erreur de format CSV: {str(e)}", file_path=str(file_path)) from e
         except Exception as e:
-            return None, f"Erreur lors de la lecture du fichier: {str(e)}"
+            raise FileValidationError(
+                f"Erreur lors de la lecture du fichier: {str(e)}", file_path=str(file_path)
+            ) from e
+    
+    def _read_and_validate_csv(
+        self,
+        file_path: Path,
+        encoding: str,
+        rejected_rows: Optional[List[RejectedRow]] = None
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """Lit et valide le format CSV en utilisant pandas (lignes mal formées ajoutées à `rejected_rows`)"""
+        rejected_rows = [] if rejected_rows is None else rejected_rows
+        try:
+            data = []
+            for chunk in self.iter_csv_chunks(file_path, encoding, rejected_rows=rejected_rows):
+                data.extend(chunk)
+        except FileValidationError as e:
+            return None, e.message
+        
+        if not data:
+            if rejected_rows:
+                return None, f"Aucune ligne exploitable: {len(rejected_rows)} ligne(s) mal formée(s)"
+            return None, "Le fichier CSV est vide ou ne contient aucune donnée"
+        
+        columns = [key for key in data[0] if key not in SOURCE_FIELDS]
+        logger.debug(f"Fichier lu avec succès: {len(data)} lignes, {len(columns)} colonnes")
+        logger.debug(f"Colonnes détectées: {columns}")
+        return data, None
+    
+    def _dataframe_to_records(
+        self,
+        df: pd.DataFrame,
+        source_lines: List[Tuple[int, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Convertit un bloc DataFrame en liste de dictionnaires (conversion vectorisée par colonne)
+        
+        Produit exactement le même résultat que `_dataframe_to_records_rowwise`.
+        `source_lines` contient, pour chaque ligne du bloc, son numéro de ligne
+        physique et son texte source.
+        """
+        if not df.columns.is_unique:
+            # Colonnes dupliquées après nettoyage des noms : conserver la sémantique ligne à ligne
+            return self._dataframe_to_records_rowwise(df, source_lines)
+        
+        # Convertir les NaN en None sur des colonnes entières
+        records = df.astype(object).where(df.notna(), None).to_dict('records')
+        
+        for record, (line_number, raw_line) in zip(records, self._pad_source_lines(source_lines, len(records))):
+            record['_line_number'] = line_number
+            record['_raw_line'] = raw_line
+        return records
+    
+    def _dataframe_to_records_rowwise(
+        self,
+        df: pd.DataFrame,
+        source_lines: List[Tuple[int, str]]
+    ) -> List[Dict[str, Any]]:
+        """Convertit un bloc DataFrame en liste de dictionnaires, ligne par ligne"""
+        data = []
+        source_lines = self._pad_source_lines(source_lines, len(df))
+        for (_, row), (line_number, raw_line) in zip(df.iterrows(), source_lines):
+            row_dict = row.to_dict()
+            # Convertir les NaN en None et les garder comme chaînes vides
+            cleaned_row = {}
+            for key, value in row_dict.items():
+                if pd.isna(value):
+                    cleaned_row[key] = None
+                else:
+                    cleaned_row[key] = str(value) if value is not None else None
+            # Numéro de ligne physique et texte source (préambule et séparateurs compris)
+            cleaned_row['_line_number'] = line_number
+            cleaned_row['_raw_line'] = raw_line
+            data.append(cleaned_row)
+        return data
+    
+    @staticmethod
+    def _pad_source_lines(source_lines: List[Tuple[int, str]], count: int) -> List[Tuple[Optional[int], Optional[str]]]:
+        """Complète les lignes source manquantes (numéro et texte inconnus)"""
+        missing = count - len(source_lines)
+        return list(source_lines) + [(None, None)] * missing if missing > 0 else source_lines
+
 
+class _CleanedCsvLineStream:
+    """
+    Flux de lignes CSV nettoyées à la volée, lisible par pandas
+    
+    Applique les mêmes règles de nettoyage que la lecture complète :
+    tabulations normalisées, préambule et lignes vides de tête retirés,
+    lignes de séparation (----;----) ignorées et compteur final supprimé.
+    
+    Pour chaque ligne de données produite, le numéro de ligne physique et le
+    texte source (avant normalisation) sont conservés dans `source_lines`
+    jusqu'à leur consommation par `take_source_lines`. Une cellule entre
+    guillemets sur plusieurs lignes physiques décale cette correspondance.
+    Les lignes mal formées signalées par pandas sont ajoutées à `bad_lines`.
+    """
+    
+    def __init__(self, lines: Iterable[str], separator: str, bad_lines: Optional[List[RejectedRow]] = None):
+        self.separator = separator
+        self.raw_line_count = 0
+        self.yielded_line_count = 0
+        self.field_count: Optional[int] = None  # Nombre de champs de l'en-tête
+        self.source_lines: deque = deque()
+        self.bad_lines: List[RejectedRow] = [] if bad_lines is None else bad_lines
+        self._raw_lines = iter(lines)
+        self._source_text: Optional[str] = None
+        self._first_line = self._skip_preamble()
+        self._lines = self._clean_lines()
+    
+    def __iter__(self) -> 'Iterator[str]':
+        return self
+    
+    def __next__(self) -> str:
+        return next(self._lines)
+    
+    def readline(self) -> str:
+        return next(self._lines, '')
+    
+    def read(self, size: int = -1) -> str:
+        return ''.join(self._lines)
+    
+    def take_source_lines(self, count: int) -> List[Tuple[int, str]]:
+        """Retire et retourne les `count` premières lignes source (numéro physique, texte)"""
+        return [self.source_lines.popleft() for _ in range(min(count, len(self.source_lines)))]
+    
+    def drop_bad_line(self, fields: List[str]) -> None:
+        """
+        Rejette une ligne mal formée signalée par pandas et retire sa ligne source
+        
+        La ligne est retrouvée parmi les lignes non encore consommées à partir
+        de ses champs ; si elle ne l'est pas, la correspondance est conservée telle
+        quelle et la ligne est rejetée sans numéro, avec ses champs rejoints.
+        """
+        line_number, raw_line = None, self.separator.join(fields)
+        for index, (source_number, source_text) in enumerate(self.source_lines):
+            if source_text.replace('\t', ' ').split(self.separator) == fields:
+                del self.source_lines[index]
+                line_number, raw_line = source_number, source_text
+                break
+        
+        reason = f"Ligne mal formée: {len(fields)} champ(s) au lieu de {self.field_count}"
+        logger.debug(f"Ligne {line_number} rejetée: {reason}")
+        self.bad_lines.append(RejectedRow(
+            line_number, reason, {'_line_number': line_number, '_raw_line': raw_line}, raw_line
+        ))
+        return None
+    
+    def _next_raw_line(self) -> Optional[str]:
+        """Lit la ligne brute suivante en normalisant les tabulations"""
+        line = next(self._raw_lines, None)
+        if line is None:
+            return None
+        self.raw_line_count += 1
+        self._source_text = line.rstrip('\r\n')
+        # Normaliser les tabulations (souvent présentes comme indentation/alignement)
+        return line.replace('\t', ' ')
+    
+    def _skip_preamble(self) -> Optional[str]:
+        """Retire les lignes vides et le préambule, retourne la première ligne utile"""
+        # Supprimer les lignes vides en tête
+        line = self._next_raw_line()
+        while line is not None and not line.strip():
+            line = self._next_raw_line()
+        
+        # Si la première ligne ne contient pas le séparateur, la considérer comme préambule
+        if line is not None and self.separator not in line:
+            line = self._next_raw_line()
+            
+            # Supprimer les lignes vides après préambule éventuel
+            while line is not None and not line.strip():
+                line = self._next_raw_line()
+        
+        return line
+    
+    def _is_separator_line(self, line: str) -> bool:
+        """Détecte une ligne de séparation composée uniquement de tirets/points-virgules (tabs/espaces ignorés)."""
+        cleaned = line.strip().replace(self.separator, '').replace(' ', '')
+        return bool(cleaned) and set(cleaned) <= {'-'}
+    
+    def _clean_lines(self) -> Iterator[str]:
+        """Produit les lignes nettoyées en retenant la dernière (compteur éventuel)"""
+        pending = None
+        line = self._first_line
+        while line is not None:
+            if not self._is_separator_line(line):
+                if pending is not None:
+                    yield self._emit(*pending)
+                pending = (line, self.raw_line_count, self._source_text)
+            line = self._next_raw_line()
+        
+        # Supprimer une éventuelle ligne compteur en fin de fichier (pas de séparateur ou juste un entier)
+        if pending is not None:
+            tail = pending[0].strip()
+            if self.separator in tail and not tail.isdigit():
+                yield self._emit(*pending)
+    
+    def _emit(self, line: str, line_number: int, source_text: str) -> str:
+        """Compte une ligne produite et conserve sa ligne source (ni l'en-tête, ni les lignes vides ignorées par pandas)"""
+        if self.yielded_line_count == 0:
+            self.field_count = len(line.rstrip('\r\n').split(self.separator))
+        elif line.strip():
+            self.source_lines.append((line_number, source_text))
+        self.yielded_line_count += 1
+        return line
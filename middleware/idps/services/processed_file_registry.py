@@ -0,0 +1,103 @@
+"""
+Registre persistant des fichiers IDPS déjà traités
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Clé d'un fichier traité : (nom, taille, empreinte du contenu)
+FileKey = Tuple[str, int, str]
+
+
+class ProcessedFileRegistry:
+    """
+    Registre des fichiers traités, persisté dans une base SQLite locale
+
+    Les clés sont chargées en mémoire à l'ouverture : la vérification pendant
+    la détection est un simple test d'appartenance à un ensemble.
+    """
+
+    # Taille des blocs lus en début et fin de fichier pour l'empreinte
+    FINGERPRINT_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, db_path: Path):
+        """
+        Ouvre (ou crée) le registre
+
+        Args:
+            db_path: Chemin du fichier SQLite du registre
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS processed_files (
+                file_name TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                processed_at TEXT NOT NULL,
+                PRIMARY KEY (file_name, file_size, fingerprint)
+            )
+            """
+        )
+        self._connection.commit()
+        self._keys: Set[FileKey] = set(
+            self._connection.execute("SELECT file_name, file_size, fingerprint FROM processed_files")
+        )
+        logger.debug(f"Registre des fichiers traités chargé: {len(self._keys)} entrée(s) ({self.db_path})")
+
+    @classmethod
+    def fingerprint(cls, file_path: Path) -> str:
+        """
+        Calcule l'empreinte du contenu d'un fichier
+
+        Pour rester rapide sur les gros fichiers, seuls le premier et le dernier
+        bloc sont hachés (avec la taille, qui fait partie de la clé).
+
+        Args:
+            file_path: Chemin du fichier
+
+        Returns:
+            Empreinte hexadécimale (blake2b)
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        size = file_path.stat().st_size
+        with open(file_path, 'rb') as f:
+            digest.update(f.read(cls.FINGERPRINT_BLOCK_SIZE))
+            if size > cls.FINGERPRINT_BLOCK_SIZE:
+                f.seek(max(cls.FINGERPRINT_BLOCK_SIZE, size - cls.FINGERPRINT_BLOCK_SIZE))
+                digest.update(f.read(cls.FINGERPRINT_BLOCK_SIZE))
+        return digest.hexdigest()
+
+    def contains(self, key: FileKey) -> bool:
+        """Vérifie si un fichier a déjà été traité"""
+        return key in self._keys
+
+    def add(self, key: FileKey) -> None:
+        """Enregistre un fichier comme traité (idempotent)"""
+        with self._lock:
+            if key in self._keys:
+                return
+            self._connection.execute(
+                "INSERT OR IGNORE INTO processed_files (file_name, file_size, fingerprint, processed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (*key, datetime.now().isoformat())
+            )
+            self._connection.commit()
+            self._keys.add(key)
+
+    def close(self) -> None:
+        """Ferme la connexion au registre"""
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        return len(self._keys)
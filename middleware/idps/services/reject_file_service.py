@@ -0,0 +1,94 @@
+"""
+Service d'écriture des fichiers de rejet IDPS
+"""
+import csv
+import logging
+from pathlib import Path
+from typing import List
+
+from middleware.idps.config.files_config import IDPSFilesConfig
+from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.models.constraint_validation_result import RejectedRow, SOURCE_FIELDS
+from middleware.exceptions import ArchiveError
+
+logger = logging.getLogger(__name__)
+
+
+class RejectFileService:
+    """
+    Service pour mettre en quarantaine les lignes rejetées d'un fichier IDPS
+
+    Un fichier de rejet par fichier source, au format CSV compact
+    (`line_number;reason;raw_line`), écrit par lots : les bonnes lignes sont
+    chargées et seules les lignes rejetées sont à retraiter.
+    """
+
+    HEADER = ('line_number', 'reason', 'raw_line')
+
+    def __init__(self, files_config: IDPSFilesConfig = None):
+        """
+        Initialise le service de rejet
+
+        Args:
+            files_config: Configuration des fichiers (charge depuis env si None)
+        """
+        self.files_config = files_config or IDPSFilesConfig.from_env()
+
+    def get_reject_path(self, file_info: IDPSFileInfo) -> Path:
+        """Génère le chemin du fichier de rejet d'un fichier source"""
+        date_str = file_info.date.strftime('%Y-%m-%d')
+
+        # Structure: reject/YYYY-MM-DD/<nom>.rejects.csv
+        return self.files_config.reject_dir / date_str / f"{Path(file_info.name).stem}.rejects.csv"
+
+    def write_rejects(self, file_info: IDPSFileInfo, rejected_rows: List[RejectedRow], append: bool = False) -> Path:
+        """
+        Écrit un lot de lignes rejetées dans le fichier de rejet
+
+        Args:
+            file_info: Informations sur le fichier source
+            rejected_rows: Lignes rejetées (valeurs brutes du CSV et motif)
+            append: Ajouter au fichier existant (blocs suivants d'une lecture en flux)
+
+        Returns:
+            Chemin du fichier de rejet
+
+        Raises:
+            ArchiveError: Si l'écriture échoue
+        """
+        reject_path = self.get_reject_path(file_info)
+        separator = self.files_config.csv_separator
+
+        try:
+            reject_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(reject_path, 'a' if append else 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f, delimiter=separator, lineterminator='\n')
+                if not append:
+                    writer.writerow(self.HEADER)
+                writer.writerows(
+                    (rejected.line_number, rejected.reason, self._raw_line(rejected, separator))
+                    for rejected in rejected_rows
+                )
+        except OSError as e:
+            error_msg = f"Erreur lors de l'écriture du fichier de rejet {reject_path}: {e}"
+            logger.error(error_msg)
+            raise ArchiveError(error_msg, file_path=str(reject_path)) from e
+
+        logger.info(f"{len(rejected_rows)} ligne(s) rejetée(s) écrite(s) dans {reject_path}")
+        return reject_path
+
+    @staticmethod
+    def _raw_line(rejected: RejectedRow, separator: str) -> str:
+        """
+        Texte source de la ligne rejetée, tel que lu dans le fichier
+
+        À défaut (ligne construite hors lecture CSV), la ligne est reconstituée
+        à partir des valeurs lues (cellules vides pour les valeurs absentes).
+        """
+        if rejected.raw_line is not None:
+            return rejected.raw_line
+        return separator.join(
+            '' if value is None else str(value)
+            for key, value in rejected.data.items()
+            if key not in SOURCE_FIELDS
+        )
@@ -0,0 +1,63 @@
+"""
+Fixtures communes : répertoires de travail temporaires et base SQLite jetable
+"""
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+
+from middleware.idps.config.database_config import IDPSDatabaseConfig
+from middleware.idps.config.files_config import IDPSFilesConfig
+
+WORKFLOW_HEADER = "Timestamp;Service;Type de document;Code de destination;Request ID"
+
+
+@pytest.fixture
+def files_config(tmp_path: Path) -> IDPSFilesConfig:
+    """Configuration des fichiers sous un répertoire temporaire (sans index des fichiers traités)"""
+    return IDPSFilesConfig(
+        input_dir=tmp_path / 'input',
+        archive_dir=tmp_path / 'archive',
+        error_dir=tmp_path / 'error',
+        logs_dir=tmp_path / 'logs',
+        csv_encoding='utf-8',
+        csv_separator=';',
+        date_format='%Y-%m-%d',
+    )
+
+
+@pytest.fixture
+def sqlite_config(tmp_path: Path) -> IDPSDatabaseConfig:
+    """Configuration d'une base SQLite propre au test"""
+    return IDPSDatabaseConfig(
+        host='', port=0, database='', user='', password='',
+        backend='sqlite', sqlite_path=str(tmp_path / 'idps.sqlite'),
+    )
+
+
+@pytest.fixture
+def write_idps_file(files_config: IDPSFilesConfig) -> Callable[..., Path]:
+    """
+    Dépose un fichier IDPS dans le répertoire d'entrée
+
+    Le fichier reprend la mise en page des exports : titre, en-tête, ligne de soulignement puis
+    les lignes de données (la première ligne de données est donc la ligne physique 4).
+    """
+    def _write(lines: List[str], file_type: str = 'WO-BACKLOG', date: str = '2025-11-11',
+               header: str = WORKFLOW_HEADER) -> Path:
+        files_config.input_dir.mkdir(parents=True, exist_ok=True)
+        path = files_config.input_dir / f"IDPS-TG-EID-{file_type}-{date}.csv"
+        underline = ';'.join('-' * len(column) for column in header.split(';'))
+        content = [f"Export IDPS {file_type} du {date}", header, underline, *lines]
+        path.write_text('\n'.join(content) + '\n', encoding='utf-8')
+        return path
+
+    return _write
+
+
+def workflow_lines(count: int, start: int = 0) -> List[str]:
+    """Lignes WO-BACKLOG valides aux Request ID consécutifs"""
+    return [
+        f"2025-11-11 00:{index // 60 % 60:02d}:{index % 60:02d}.000;PERSO;CNI;TG82;REQ{index:05d}"
+        for index in range(start, start + count)
+    ]
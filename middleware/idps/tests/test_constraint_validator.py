@@ -0,0 +1,47 @@
+"""
+Tests de `IDPSConstraintValidator` (contraintes déduites des modèles)
+"""
+from datetime import datetime
+
+from middleware.idps.constraint_validator import IDPSConstraintValidator
+
+
+def _error_row(request_id='REQ1', service_name='Supervision', comment=None):
+    return {
+        'event_timestamp': datetime(2025, 11, 11),
+        'document_type': 'CNI',
+        'destination_code': 'TG82',
+        'request_id': request_id,
+        'service_name': service_name,
+        'error_category': 'SUP_ERROR',
+        'comment': comment,
+        'file_name': 'IDPS-TG-EID-SUP-ERROR-2025-11-11.csv',
+        'ingested_at': datetime(2025, 11, 12),
+    }
+
+
+def _sources(count):
+    return [{'_line_number': index + 4, '_raw_line': f"ligne {index + 4}"} for index in range(count)]
+
+
+def test_empty_required_value_is_rejected():
+    data = [_error_row(), _error_row(request_id=''), _error_row(service_name=None), _error_row(comment='')]
+
+    result = IDPSConstraintValidator().validate(data, 'error', _sources(len(data)))
+
+    # `comment` est nullable : une chaîne vide y est acceptée
+    assert result.valid_data == [data[0], data[3]]
+    assert [(rejected.line_number, rejected.reason) for rejected in result.rejected_rows] == [
+        (5, "request_id: valeur obligatoire manquante"),
+        (6, "service_name: valeur obligatoire manquante"),
+    ]
+    assert result.rejected_rows[0].raw_line == "ligne 5"
+
+
+def test_too_long_value_is_rejected():
+    data = [_error_row(), _error_row(request_id='R' * 51)]
+
+    result = IDPSConstraintValidator().validate(data, 'error', _sources(len(data)))
+
+    assert result.valid_data == [data[0]]
+    assert [rejected.reason for rejected in result.rejected_rows] == ["request_id: 51 caractères (maximum 50)"]
@@ -0,0 +1,50 @@
+"""
+Tests de la pagination par curseur des événements (base SQLite)
+"""
+import pytest
+
+from middleware.idps.orchestrator import IDPSOrchestrator
+from middleware.idps.repository.database_repository import IDPSDatabaseRepository
+from middleware.idps.tests.conftest import workflow_lines
+
+
+@pytest.fixture
+def repository(files_config, sqlite_config, write_idps_file):
+    """Repository sur une base contenant 23 événements WO-BACKLOG et 23 WO-FINISH"""
+    write_idps_file(workflow_lines(23))
+    write_idps_file(workflow_lines(23, start=100), file_type='WO-FINISH')
+    results = IDPSOrchestrator(files_config, sqlite_config).run()
+    assert [result.rows_inserted for result in results] == [23, 23]
+    return IDPSDatabaseRepository(sqlite_config)
+
+
+@pytest.mark.parametrize('limit', [1, 5, 23, 46, 100])
+def test_walking_all_pages_returns_every_event_once(repository, limit):
+    ids, cursor = [], None
+    while True:
+        page = repository.get_workflow_events_page(limit=limit, cursor=cursor)
+        assert len(page.events) <= limit
+        ids.extend(event['id'] for event in page.events)
+        if not page.has_more:
+            break
+        cursor = page.next_cursor
+
+    # Les événements d'un même fichier partagent `ingested_at` : l'id départage
+    assert len(ids) == len(set(ids)) == 46
+    assert sorted(ids) == list(range(1, 47))
+
+
+@pytest.mark.parametrize('cursor', ['pas-un-curseur', '', 'W10=', 'WyJ4IiwxXQ=='])
+def test_invalid_cursor_is_rejected_before_opening_a_session(repository, monkeypatch, cursor):
+    monkeypatch.setattr(repository, '_get_session', pytest.fail)
+
+    with pytest.raises(ValueError, match="Curseur de pagination invalide"):
+        repository.get_workflow_events_page(limit=10, cursor=cursor)
+
+
+@pytest.mark.parametrize('limit', [0, -1])
+def test_non_positive_limit_is_rejected(repository, monkeypatch, limit):
+    monkeypatch.setattr(repository, '_get_session', pytest.fail)
+
+    with pytest.raises(ValueError, match="Taille de page invalide"):
+        repository.get_error_events_page(limit=limit)
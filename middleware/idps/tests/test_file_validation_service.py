@@ -0,0 +1,39 @@
+"""
+Tests de la lecture en flux des fichiers CSV (`FileValidationService.iter_csv_chunks`)
+"""
+import pytest
+
+from middleware.idps.services.file_validation_service import FileValidationService
+from middleware.idps.tests.conftest import workflow_lines
+
+
+@pytest.fixture
+def csv_file(write_idps_file):
+    """
+    Fichier de 10 lignes de données (lignes physiques 4 à 16)
+
+    Une ligne de séparation (7), une ligne vide (11) et une ligne mal formée (14)
+    s'intercalent ; le compteur final (17) est retiré.
+    """
+    lines = workflow_lines(10)
+    return write_idps_file(
+        lines[:3] + ["----;----"] + lines[3:6] + [""] + lines[6:8] + ["a;b;c;d;e;f"] + lines[8:] + ["10"]
+    )
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 4, 50])
+def test_line_numbers_follow_the_physical_lines_across_chunks(files_config, csv_file, chunk_size):
+    rejected_rows = []
+
+    chunks = list(FileValidationService(files_config).iter_csv_chunks(
+        csv_file, 'utf-8', chunk_size=chunk_size, rejected_rows=rejected_rows
+    ))
+
+    assert all(len(chunk) <= chunk_size for chunk in chunks)
+    rows = [row for chunk in chunks for row in chunk]
+    assert [row['_line_number'] for row in rows] == [4, 5, 6, 8, 9, 10, 12, 13, 15, 16]
+    assert [row['Request ID'] for row in rows] == [f"REQ{index:05d}" for index in range(10)]
+    physical_lines = csv_file.read_text(encoding='utf-8').splitlines()
+    assert all(row['_raw_line'] == physical_lines[row['_line_number'] - 1] for row in rows)
+
+    assert [(rejected.line_number, rejected.raw_line) for rejected in rejected_rows] == [(14, "a;b;c;d;e;f")]
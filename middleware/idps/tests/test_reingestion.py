@@ -0,0 +1,43 @@
+"""
+Tests de l'idempotence des ré-ingestions (base SQLite)
+"""
+import dataclasses
+import sqlite3
+
+import pytest
+
+from middleware.idps.orchestrator import IDPSOrchestrator
+from middleware.idps.tests.conftest import workflow_lines
+
+
+@pytest.mark.parametrize('staging_threshold_bytes', [8 * 1024 * 1024, 1], ids=['direct', 'staging'])
+def test_reingesting_a_file_inserts_nothing(files_config, sqlite_config, write_idps_file, staging_threshold_bytes):
+    sqlite_config = dataclasses.replace(sqlite_config, staging_threshold_bytes=staging_threshold_bytes)
+    lines = workflow_lines(12)
+
+    write_idps_file(lines)
+    [first] = IDPSOrchestrator(files_config, sqlite_config).run()
+    # Même fichier déposé de nouveau (sans index des fichiers traités, il est retraité)
+    write_idps_file(lines)
+    [second] = IDPSOrchestrator(files_config, sqlite_config).run()
+
+    assert (first.status, first.rows_inserted, first.rows_duplicate) == ('success', 12, 0)
+    assert (second.status, second.rows_processed, second.rows_inserted, second.rows_duplicate) == (
+        'success', 12, 0, 12)
+
+    with sqlite3.connect(sqlite_config.sqlite_path) as connection:
+        [(event_count,)] = connection.execute("SELECT COUNT(*) FROM workflow_events").fetchall()
+        audit = connection.execute(
+            "SELECT status, records_expected, records_inserted, error_message FROM ingestion_audit_log"
+        ).fetchall()
+    assert event_count == 12
+    assert audit == [('success', 12, 0, '12 ligne(s) déjà présente(s) ignorée(s)')]
+
+
+def test_partially_known_file_inserts_only_new_rows(files_config, sqlite_config, write_idps_file):
+    write_idps_file(workflow_lines(8))
+    IDPSOrchestrator(files_config, sqlite_config).run()
+    write_idps_file(workflow_lines(12))
+    [result] = IDPSOrchestrator(files_config, sqlite_config).run()
+
+    assert (result.rows_processed, result.rows_inserted, result.rows_duplicate) == (12, 4, 8)
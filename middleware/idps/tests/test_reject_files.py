@@ -0,0 +1,42 @@
+"""
+Tests des fichiers de rejet et de l'audit des ingestions partielles (base SQLite)
+"""
+import csv
+import dataclasses
+import sqlite3
+
+import pytest
+
+from middleware.idps.orchestrator import IDPSOrchestrator
+from middleware.idps.tests.conftest import workflow_lines
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_malformed_and_incomplete_lines_are_rejected(files_config, sqlite_config, write_idps_file, streaming):
+    files_config = dataclasses.replace(files_config, streaming_enabled=streaming, csv_chunk_size=4)
+    lines = workflow_lines(10)
+    lines[3] = "2025-11-11 00:00:03.000;PERSO;CNI;TG82;"
+    lines[6] = "2025-11-11 00:00:06.000;PERSO;CNI;TG82;REQ00006;X;Y"
+    write_idps_file(lines)
+
+    [result] = IDPSOrchestrator(files_config, sqlite_config).run()
+
+    assert (result.status, result.rows_processed, result.rows_inserted, result.rows_rejected) == (
+        'partial_success', 10, 8, 2)
+
+    [reject_file] = (files_config.reject_dir / '2025-11-11').glob('*.rejects.csv')
+    with open(reject_file, encoding='utf-8', newline='') as f:
+        header, *rejects = csv.reader(f, delimiter=';')
+    assert header == ['line_number', 'reason', 'raw_line']
+    # Ligne physique = rang de la ligne de données + 4 (titre, en-tête et soulignement)
+    assert sorted(rejects, key=lambda reject: int(reject[0])) == [
+        ['7', "Request ID: valeur obligatoire manquante", "2025-11-11 00:00:03.000;PERSO;CNI;TG82;"],
+        ['10', "Ligne mal formée: 7 champ(s) au lieu de 5",
+         "2025-11-11 00:00:06.000;PERSO;CNI;TG82;REQ00006;X;Y"],
+    ]
+
+    with sqlite3.connect(sqlite_config.sqlite_path) as connection:
+        audit = connection.execute(
+            "SELECT status, records_expected, records_inserted, error_message FROM ingestion_audit_log"
+        ).fetchall()
+    assert audit == [('partial_success', 10, 8, '2 ligne(s) rejetée(s)')]
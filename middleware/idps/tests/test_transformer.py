@@ -0,0 +1,60 @@
+"""
+Tests du mapping IDPS et de son plan de colonnes
+"""
+from datetime import datetime
+from pathlib import Path
+
+from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.transformer import IDPSColumnPlan, IDPSTransformer
+
+FILE_INFO = IDPSFileInfo(
+    Path('IDPS-TG-EID-SUP-ERROR-2025-11-11.csv'), 'IDPS-TG-EID-SUP-ERROR-2025-11-11.csv',
+    'SUP-ERROR', datetime(2025, 11, 11), 0, 'error'
+)
+
+
+def _transformed(request_id: str, **columns):
+    return {
+        'source_file': FILE_INFO.name,
+        'ingestion_timestamp': datetime(2025, 11, 12),
+        'raw_data': {
+            '﻿Timestamp': '2025-11-11T00:00:00',
+            'Service': 'Supervision',
+            'Type de document': 'CNI',
+            'Code de destination': 'TG82',
+            'Request ID': request_id,
+            **columns,
+        },
+    }
+
+
+def test_column_plan_resolves_one_column_per_field():
+    header = ('﻿Timestamp', 'request_id', 'Request ID', 'Service')
+
+    plan = IDPSColumnPlan(header, IDPSTransformer.ERROR_FIELD_ALIASES)
+
+    assert plan.columns['event_timestamp'] == '﻿Timestamp'
+    assert plan.columns['request_id'] == 'Request ID'
+    assert plan.columns['comment'] is None
+    assert plan.get({'Request ID': '  REQ1 '}, 'request_id') == 'REQ1'
+    assert plan.get({'Request ID': ' ', 'request_id': 'REQ2'}, 'request_id') == ''
+    assert plan.get({}, 'comment', default=None) is None
+
+
+def test_rows_are_mapped_with_a_single_plan(monkeypatch):
+    transformer = IDPSTransformer()
+    rows = [_transformed('REQ1', infos_comment=''), _transformed('REQ2', infos_comment='{"raw": "carte expirée"}')]
+    expected = [transformer.map_to_module_schema(row, FILE_INFO) for row in rows]
+
+    resolved = []
+    get_column_plan = transformer.get_column_plan
+    monkeypatch.setattr(
+        transformer, 'get_column_plan', lambda *args: resolved.append(args) or get_column_plan(*args)
+    )
+    mapped = transformer.map_rows_to_module_schema(rows, FILE_INFO)
+
+    assert mapped == expected
+    assert len(resolved) == 1
+    assert [(row['request_id'], row['comment'], row['error_category']) for row in mapped] == [
+        ('REQ1', None, 'SUP_ERROR'), ('REQ2', 'carte expirée', 'SUP_ERROR'),
+    ]
@@ -0,0 +1,68 @@
+"""
+Tests du contrôle des valeurs obligatoires de `IDPSValidator`
+"""
+from datetime import datetime
+from pathlib import Path
+
+from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.validator import IDPSValidator
+
+
+def _file_info(file_type: str = 'WO-BACKLOG') -> IDPSFileInfo:
+    name = f"IDPS-TG-EID-{file_type}-2025-11-11.csv"
+    category = 'error' if file_type.endswith('ERROR') else 'workflow'
+    return IDPSFileInfo(Path(name), name, file_type, datetime(2025, 11, 11), 0, category)
+
+
+def _row(line_number: int, request_id, document_type='CNI', **columns):
+    return {
+        'Timestamp': '2025-11-11 00:00:00.000',
+        'Type de document': document_type,
+        'Code de destination': 'TG82',
+        'Request ID': request_id,
+        **columns,
+        '_line_number': line_number,
+        '_raw_line': f"ligne {line_number}",
+    }
+
+
+def test_rows_with_missing_required_values_are_rejected():
+    data = [_row(4, 'REQ1'), _row(5, ''), _row(6, 'REQ3', document_type=' \t '), _row(7, None), _row(8, 'REQ5')]
+
+    result = IDPSValidator().reject_missing_values(data, _file_info())
+
+    assert [row['_line_number'] for row in result.valid_data] == [4, 8]
+    assert [(rejected.line_number, rejected.reason, rejected.raw_line) for rejected in result.rejected_rows] == [
+        (5, "Request ID: valeur obligatoire manquante", "ligne 5"),
+        (6, "Type de document: valeur obligatoire manquante", "ligne 6"),
+        (7, "Request ID: valeur obligatoire manquante", "ligne 7"),
+    ]
+
+
+def test_values_are_read_from_the_column_the_transformer_reads():
+    # `Request ID` prime sur l'alias `RequestID` : seule sa valeur est contrôlée
+    data = [_row(4, '', RequestID='REQ1'), _row(5, 'REQ2', RequestID='')]
+
+    result = IDPSValidator().reject_missing_values(data, _file_info())
+
+    assert [row['_line_number'] for row in result.valid_data] == [5]
+    assert [rejected.line_number for rejected in result.rejected_rows] == [4]
+
+
+def test_alias_column_is_checked_when_it_is_the_only_variant():
+    data = [_row(4, None), _row(5, None)]
+    for row, request_id in zip(data, ('REQ1', ' ')):
+        del row['Request ID']
+        row['\ufeffrequest_id'] = request_id
+
+    result = IDPSValidator().reject_missing_values(data, _file_info())
+
+    assert [rejected.reason for rejected in result.rejected_rows] == ["Request ID: valeur obligatoire manquante"]
+
+
+def test_error_files_also_require_service():
+    data = [_row(4, 'REQ1', Service='Supervision'), _row(5, 'REQ2', Service='')]
+
+    result = IDPSValidator().reject_missing_values(data, _file_info('SUP-ERROR'))
+
+    assert [rejected.reason for rejected in result.rejected_rows] == ["Service: valeur obligatoire manquante"]
@@ -0,0 +1,160 @@
+"""
+Moteur de parsing des timestamps IDPS
+
+Partagé par `DataTransformationService` et `IDPSTransformer` :
+- inférence du format à partir des premières valeurs d'un fichier
+- parsing de colonnes entières (chaque valeur distincte n'est parsée qu'une fois)
+- cache LRU pour les valeurs répétées (timestamps à la seconde très fréquents)
+- comptage des valeurs non reconnues au lieu de les masquer
+"""
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from middleware.utils.logger import HotPathLogger
+
+logger = logging.getLogger(__name__)
+
+# Valeurs non reconnues : formatage différé et échantillonné en DEBUG (le total est compté)
+hot_path_logger = HotPathLogger(logger)
+
+# Format spécial : datetime.fromisoformat (avec 'T' ou espace, 'Z' accepté)
+ISO_FORMAT = 'iso'
+
+
+class IDPSTimestampParser:
+    """Parseur de timestamps avec inférence de format et mémoïsation"""
+
+    # Nombre de valeurs utilisées pour inférer le format d'un fichier
+    SAMPLE_SIZE = 20
+
+    def __init__(self, formats: Sequence[str], cache_size: int = 65536):
+        """
+        Initialise le parseur
+
+        Args:
+            formats: Formats candidats (strptime ou ISO_FORMAT), par ordre de priorité
+            cache_size: Nombre de valeurs distinctes conservées dans le cache LRU
+        """
+        self.formats = tuple(formats)
+        self.inferred_format: Optional[str] = None
+        self.unparseable_count = 0
+        self._candidates = self.formats
+        self._parse_cached = lru_cache(maxsize=cache_size)(self._parse_uncached)
+
+    def infer_format(self, values: Sequence[Any]) -> Optional[str]:
+        """
+        Déduit le format dominant à partir des premières valeurs non vides
+
+        Le format inféré est essayé en premier pour toutes les valeurs suivantes.
+
+        Args:
+            values: Valeurs de la colonne (les premières suffisent)
+
+        Returns:
+            Format inféré, ou None si aucun format ne reconnaît les échantillons
+        """
+        samples = []
+        for value in values:
+            if isinstance(value, str) and value.strip():
+                samples.append(value.strip())
+                if len(samples) >= self.SAMPLE_SIZE:
+                    break
+
+        best_format, best_score = None, 0
+        for fmt in self.formats:
+            score = sum(1 for sample in samples if self._try_format(sample, fmt) is not None)
+            if score > best_score:
+                best_format, best_score = fmt, score
+
+        self.inferred_format = best_format
+        if best_format is not None:
+            self._candidates = (best_format,) + tuple(fmt for fmt in self.formats if fmt != best_format)
+            logger.debug(f"Format de timestamp inféré: {best_format} ({best_score}/{len(samples)} échantillons)")
+        return best_format
+
+    def parse(self, value: Any) -> Optional[datetime]:
+        """
+        Parse une valeur unique (résultat mis en cache)
+
+        Returns:
+            datetime, ou None si la valeur est vide ou non reconnue (comptée)
+        """
+        if not isinstance(value, str) or not value.strip():
+            return None
+
+        parsed = self._parse_cached(value)
+        if parsed is None:
+            self.unparseable_count += 1
+            hot_path_logger.debug("Impossible de parser le timestamp: %s", value)
+        return parsed
+
+    def parse_column(self, values: Sequence[Any]) -> List[Optional[datetime]]:
+        """
+        Parse une colonne entière
+
+        Les valeurs sont factorisées : chaque valeur distincte est parsée une seule
+        fois puis le résultat est redistribué sur toute la colonne.
+
+        Args:
+            values: Valeurs de la colonne
+
+        Returns:
+            Liste de datetime (None pour les valeurs vides ou non reconnues)
+        """
+        if not len(values):
+            return []
+
+        if self.inferred_format is None:
+            self.infer_format(values)
+
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+
+        parsed_uniques = np.empty(len(uniques) + 1, dtype=object)
+        failed_uniques = np.zeros(len(uniques) + 1, dtype=bool)
+        for i, value in enumerate(uniques):
+            if isinstance(value, str) and value.strip():
+                parsed_uniques[i] = self._parse_cached(value)
+                failed_uniques[i] = parsed_uniques[i] is None
+        # Dernière case : valeurs manquantes (code -1)
+        parsed_uniques[-1] = None
+
+        failures = int(failed_uniques[codes].sum())
+        if failures:
+            self.unparseable_count += failures
+            logger.debug(f"{failures} timestamp(s) non reconnu(s) dans la colonne")
+
+        return parsed_uniques[codes].tolist()
+
+    def reset_stats(self) -> None:
+        """Réinitialise le format inféré et le compteur de valeurs non reconnues (nouveau fichier)"""
+        self.inferred_format = None
+        self.unparseable_count = 0
+        self._candidates = self.formats
+
+    def _parse_uncached(self, value: str) -> Optional[datetime]:
+        """Essaie les formats candidats, le format inféré en premier"""
+        stripped = value.strip()
+        for fmt in self._candidates:
+            parsed = self._try_format(stripped, fmt)
+            if parsed is not None:
+                return parsed
+        return None
+
+    @staticmethod
+    def _try_format(value: str, fmt: str) -> Optional[datetime]:
+        """Parse une valeur avec un format donné, None en cas d'échec"""
+        try:
+            if fmt == ISO_FORMAT:
+                # Format ISO avec T
+                if "T" in value:
+                    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+                # Format 'YYYY-MM-DD HH:MM:SS.sss' : remplacer l'espace par T pour fromisoformat
+                return datetime.fromisoformat(value.replace(" ", "T"))
+            return datetime.strptime(value, fmt)
+        except (ValueError, TypeError):
+            return None
@@ -8,16 +8,60 @@ Le transformer se base sur les modèles SQLAlchemy pour extraire les données.
 """
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Optional, Set
 from datetime import datetime
 
 from middleware.idps.domain_interfaces import IModuleTransformer
 from middleware.idps.models.file_info import IDPSFileInfo
 from middleware.idps.models.workflow_event_model import IDPSWorkflowEventModel
 from middleware.idps.models.error_event_model import IDPSErrorEventModel
+from middleware.idps.timestamp_parser import IDPSTimestampParser, ISO_FORMAT
+from middleware.utils.logger import HotPathLogger
+from middleware.exceptions import DataTransformationError
 
 logger = logging.getLogger(__name__)
 
+# Journalisation par ligne : formatage différé et échantillonné en DEBUG
+hot_path_logger = HotPathLogger(logger)
+
+
+class IDPSColumnPlan:
+    """
+    Plan d'extraction compilé pour un en-tête CSV donné
+    
+    Résout une seule fois, pour chaque champ du modèle, la colonne lue : la première
+    de ses variantes de noms (avec et sans BOM) présente dans l'en-tête, par ordre
+    de priorité. Les lignes ne sont ensuite lues que dans cette colonne.
+    """
+    
+    __slots__ = ('header', 'columns')
+    
+    def __init__(self, header: Tuple[Any, ...], field_aliases: Dict[str, Tuple[str, ...]]):
+        self.header = header
+        present = set(header)
+        self.columns: Dict[str, Optional[str]] = {
+            field_name: self.resolve_column(present, aliases) for field_name, aliases in field_aliases.items()
+        }
+    
+    @staticmethod
+    def resolve_column(present: Set[Any], aliases: Tuple[str, ...]) -> Optional[str]:
+        """Première variante de nom (ou sa forme préfixée par un BOM) présente dans l'en-tête, sinon None"""
+        for alias in aliases:
+            for name in (alias, f"\ufeff{alias}"):
+                if name in present:
+                    return name
+        return None
+    
+    def get(self, raw: Dict[str, Any], field_name: str, default: Optional[str] = "") -> Optional[str]:
+        """Retourne la valeur (nettoyée) du champ, ou `default` si elle est absente ou vide"""
+        column = self.columns[field_name]
+        if column is None:
+            return default
+        value = raw.get(column)
+        if value is None or value == "":
+            return default
+        return str(value).strip() or default
+
 
 class IDPSTransformer(IModuleTransformer):
     """
@@ -44,7 +88,56 @@ class IDPSTransformer(IModuleTransformer):
         'infos_comment': 'comment',
     }
     
-    def map_to_module_schema(self, transformed: Dict[str, Any], file_info: IDPSFileInfo) -> Dict[str, Any]:
+    # Variantes de noms de colonnes CSV acceptées pour chaque champ (par ordre de priorité)
+    WORKFLOW_FIELD_ALIASES = {
+        'event_timestamp': ('Timestamp', 'timestamp', 'TIMESTAMP'),
+        'document_type': ('Type de document', 'type_de_document', 'Document Type'),
+        'destination_code': ('Code de destination', 'code_de_destination', 'Destination Code'),
+        'request_id': ('Request ID', 'request_id', 'RequestID', 'requestId'),
+    }
+    
+    ERROR_FIELD_ALIASES = {
+        **WORKFLOW_FIELD_ALIASES,
+        'service_name': ('Service', 'service', 'service_name', 'SERVICE'),
+        'comment': ('infos_comment', 'comment', 'Comment'),
+    }
+    
+    # Nombre maximal de plans conservés (un par en-tête distinct)
+    _MAX_COLUMN_PLANS = 32
+    
+    def __init__(self):
+        """Initialise le transformateur IDPS"""
+        self._column_plans: Dict[Tuple[str, Tuple[Any, ...]], IDPSColumnPlan] = {}
+        self.timestamp_parser = IDPSTimestampParser((ISO_FORMAT,))
+    
+    def get_column_plan(self, header: Tuple[Any, ...], category: str) -> IDPSColumnPlan:
+        """
+        Retourne le plan d'extraction compilé pour un en-tête (compilé au premier appel)
+        
+        Args:
+            header: Noms des colonnes CSV, dans l'ordre du fichier
+            category: Catégorie ('workflow' ou 'error')
+        
+        Returns:
+            IDPSColumnPlan associé à l'en-tête
+        """
+        key = (category, header)
+        plan = self._column_plans.get(key)
+        if plan is None:
+            if len(self._column_plans) >= self._MAX_COLUMN_PLANS:
+                self._column_plans.clear()
+            aliases = self.ERROR_FIELD_ALIASES if category == "error" else self.WORKFLOW_FIELD_ALIASES
+            plan = IDPSColumnPlan(header, aliases)
+            self._column_plans[key] = plan
+            logger.debug(f"Plan de colonnes compilé pour {category}: {plan.columns}")
+        return plan
+    
+    def map_to_module_schema(
+        self,
+        transformed: Dict[str, Any],
+        file_info: IDPSFileInfo,
+        plan: Optional[IDPSColumnPlan] = None
+    ) -> Dict[str, Any]:
         """
         Mappe une ligne transformée vers le schéma cible basé sur les modèles SQLAlchemy.
 
@@ -55,24 +148,43 @@ class IDPSTransformer(IModuleTransformer):
           - category   ('workflow' ou 'error')
           - ingestion_timestamp
           - raw_data   (dictionnaire avec les colonnes CSV)
+
+        `plan` est le plan de colonnes de l'en-tête de la ligne ; il est résolu depuis
+        `raw_data` s'il n'est pas fourni. Pour un lot de lignes, `map_rows_to_module_schema`
+        ne le résout qu'une fois.
         """
         category = file_info.category
         raw = transformed.get("raw_data", {})
 
-        if category == "workflow":
-            return self._map_to_workflow_model(transformed, file_info, raw)
-        elif category == "error":
-            return self._map_to_error_model(transformed, file_info, raw)
-        else:
+        if category not in ("workflow", "error"):
             # Catégorie inconnue : on renvoie quand même la structure générique
             logger.warning(f"Catégorie inconnue: {category}, utilisation de la structure générique")
             return transformed
 
+        if plan is None:
+            plan = self.get_column_plan(tuple(raw), category)
+        if category == "workflow":
+            return self._map_to_workflow_model(transformed, file_info, raw, plan)
+        return self._map_to_error_model(transformed, file_info, raw, plan)
+
+    def map_rows_to_module_schema(self, rows: List[Dict[str, Any]], file_info: IDPSFileInfo) -> List[Dict[str, Any]]:
+        """
+        Mappe un lot de lignes transformées d'un même fichier vers le schéma cible
+
+        Les lignes partagent l'en-tête du fichier : le plan de colonnes est résolu
+        une seule fois, sur la première ligne, puis passé au mapping de chaque ligne.
+        """
+        if not rows or file_info.category not in ("workflow", "error"):
+            return [self.map_to_module_schema(row, file_info) for row in rows]
+        plan = self.get_column_plan(tuple(rows[0].get("raw_data", {})), file_info.category)
+        return [self.map_to_module_schema(row, file_info, plan) for row in rows]
+
     def _map_to_workflow_model(
         self, 
         base: Dict[str, Any], 
         file_info: IDPSFileInfo, 
-        raw: Dict[str, Any]
+        raw: Dict[str, Any],
+        plan: IDPSColumnPlan
     ) -> Dict[str, Any]:
         """
         Mappe les données CSV vers le modèle IDPSWorkflowEventModel
@@ -86,53 +198,18 @@ class IDPSTransformer(IModuleTransformer):
         - file_name (String(255))
         - ingested_at (DateTime)
         """
-        # Extraire les valeurs basées sur le mapping
         mapped_data = {}
         
-        # Helper pour obtenir une valeur avec plusieurs variantes de noms
-        def get_csv_value(*possible_names, default=""):
-            for name in possible_names:
-                # Essayer le nom exact
-                value = raw.get(name)
-                if value is not None and value != "" and str(value).strip() != "":
-                    return str(value).strip()
-                # Essayer avec BOM
-                bom_name = f"\ufeff{name}"
-                value = raw.get(bom_name)
-                if value is not None and value != "" and str(value).strip() != "":
-                    return str(value).strip()
-            return default
-        
-        # event_timestamp: depuis "Timestamp"
-        ts_value = get_csv_value("Timestamp", "timestamp", "TIMESTAMP", default=None)
-        if ts_value:
-            event_timestamp = self._parse_timestamp(ts_value)
-        else:
-            event_timestamp = base.get("ingestion_timestamp", datetime.now())
-        mapped_data["event_timestamp"] = event_timestamp
+        # event_timestamp: depuis "Timestamp" (ligne rejetée si absent ou non reconnu)
+        mapped_data["event_timestamp"] = self._parse_timestamp(plan.get(raw, "event_timestamp", default=None))
         
-        # document_type: depuis "Type de document"
-        mapped_data["document_type"] = get_csv_value(
-            "Type de document", "type_de_document", "Document Type", default=""
-        )
-        
-        # destination_code: depuis "Code de destination"
-        mapped_data["destination_code"] = get_csv_value(
-            "Code de destination", "code_de_destination", "Destination Code", default=""
-        )
-        
-        # request_id: depuis "Request ID"
-        mapped_data["request_id"] = get_csv_value(
-            "Request ID", "request_id", "RequestID", "requestId", default=""
-        )
+        # document_type, destination_code, request_id: colonnes résolues par le plan
+        mapped_data["document_type"] = plan.get(raw, "document_type")
+        mapped_data["destination_code"] = plan.get(raw, "destination_code")
+        mapped_data["request_id"] = plan.get(raw, "request_id")
         
         # status: dérivé de file_type
-        if file_info.file_type == "WO-BACKLOG":
-            mapped_data["status"] = "BACKLOG"
-        elif file_info.file_type == "WO-FINISH":
-            mapped_data["status"] = "FINISH"
-        else:
-            mapped_data["status"] = file_info.file_type
+        mapped_data["status"] = self.workflow_status(file_info.file_type)
         
         # file_name: depuis source_file ou file_info.name
         mapped_data["file_name"] = base.get("source_file", file_info.name)
@@ -140,14 +217,15 @@ class IDPSTransformer(IModuleTransformer):
         # ingested_at: timestamp d'ingestion
         mapped_data["ingested_at"] = base.get("ingestion_timestamp", datetime.now())
         
-        logger.debug(f"Mapping workflow: {mapped_data}")
+        hot_path_logger.debug("Mapping workflow: %s", mapped_data)
         return mapped_data
 
     def _map_to_error_model(
         self, 
         base: Dict[str, Any], 
         file_info: IDPSFileInfo, 
-        raw: Dict[str, Any]
+        raw: Dict[str, Any],
+        plan: IDPSColumnPlan
     ) -> Dict[str, Any]:
         """
         Mappe les données CSV vers le modèle IDPSErrorEventModel
@@ -163,63 +241,22 @@ class IDPSTransformer(IModuleTransformer):
         - file_name (String(255))
         - ingested_at (DateTime)
         """
-        # Extraire les valeurs basées sur le mapping
         mapped_data = {}
         
-        # Helper pour obtenir une valeur avec plusieurs variantes de noms
-        def get_csv_value(*possible_names, default=""):
-            for name in possible_names:
-                # Essayer le nom exact
-                value = raw.get(name)
-                if value is not None and value != "" and str(value).strip() != "":
-                    return str(value).strip()
-                # Essayer avec BOM
-                bom_name = f"\ufeff{name}"
-                value = raw.get(bom_name)
-                if value is not None and value != "" and str(value).strip() != "":
-                    return str(value).strip()
-            return default
-        
-        # event_timestamp: depuis "Timestamp"
-        ts_value = get_csv_value("Timestamp", "timestamp", "TIMESTAMP", default=None)
-        if ts_value:
-            event_timestamp = self._parse_timestamp(ts_value)
-        else:
-            event_timestamp = base.get("ingestion_timestamp", datetime.now())
-        mapped_data["event_timestamp"] = event_timestamp
-        
-        # document_type: depuis "Type de document"
-        mapped_data["document_type"] = get_csv_value(
-            "Type de document", "type_de_document", "Document Type", default=""
-        )
-        
-        # destination_code: depuis "Code de destination"
-        mapped_data["destination_code"] = get_csv_value(
-            "Code de destination", "code_de_destination", "Destination Code", default=""
-        )
+        # event_timestamp: depuis "Timestamp" (ligne rejetée si absent ou non reconnu)
+        mapped_data["event_timestamp"] = self._parse_timestamp(plan.get(raw, "event_timestamp", default=None))
         
-        # request_id: depuis "Request ID"
-        mapped_data["request_id"] = get_csv_value(
-            "Request ID", "request_id", "RequestID", "requestId", default=""
-        )
-        
-        # service_name: depuis "Service"
-        mapped_data["service_name"] = get_csv_value(
-            "Service", "service", "service_name", "SERVICE", default=""
-        )
+        # document_type, destination_code, request_id, service_name: colonnes résolues par le plan
+        mapped_data["document_type"] = plan.get(raw, "document_type")
+        mapped_data["destination_code"] = plan.get(raw, "destination_code")
+        mapped_data["request_id"] = plan.get(raw, "request_id")
+        mapped_data["service_name"] = plan.get(raw, "service_name")
         
         # error_category: dérivé de file_type
-        if file_info.file_type == "QC-ERROR":
-            mapped_data["error_category"] = "QC_ERROR"
-        elif file_info.file_type == "PERSO-ERROR":
-            mapped_data["error_category"] = "PERSO_ERROR"
-        elif file_info.file_type == "SUP-ERROR":
-            mapped_data["error_category"] = "SUP_ERROR"
-        else:
-            mapped_data["error_category"] = file_info.file_type
+        mapped_data["error_category"] = self.error_category(file_info.file_type)
         
         # comment: depuis "infos_comment" (peut être JSON)
-        infos_comment = get_csv_value("infos_comment", "comment", "Comment", default=None)
+        infos_comment = plan.get(raw, "comment", default=None)
         mapped_data["comment"] = self._parse_comment(infos_comment)
         
         # file_name: depuis source_file ou file_info.name
@@ -228,33 +265,54 @@ class IDPSTransformer(IModuleTransformer):
         # ingested_at: timestamp d'ingestion
         mapped_data["ingested_at"] = base.get("ingestion_timestamp", datetime.now())
         
-        logger.debug(f"Mapping error: {mapped_data}")
+        hot_path_logger.debug("Mapping error: %s", mapped_data)
         return mapped_data
     
+    @staticmethod
+    def workflow_status(file_type: str) -> str:
+        """Statut d'un événement workflow, dérivé du type de fichier"""
+        if file_type == "WO-BACKLOG":
+            return "BACKLOG"
+        if file_type == "WO-FINISH":
+            return "FINISH"
+        return file_type
+    
+    @staticmethod
+    def error_category(file_type: str) -> str:
+        """Catégorie d'un événement d'erreur, dérivée du type de fichier"""
+        if file_type == "QC-ERROR":
+            return "QC_ERROR"
+        if file_type == "PERSO-ERROR":
+            return "PERSO_ERROR"
+        if file_type == "SUP-ERROR":
+            return "SUP_ERROR"
+        return file_type
+    
     def _parse_timestamp(self, ts_value: str) -> datetime:
         """
         Parse une chaîne de timestamp en objet datetime
         
+        L'horodatage de l'événement fait partie de la clé naturelle : une valeur
+        de remplacement (heure courante) changerait à chaque ré-ingestion et la
+        ligne serait insérée de nouveau. Les valeurs absentes ou non reconnues
+        (comptées dans `timestamp_parser.unparseable_count`) rejettent donc la ligne.
+        
         Args:
             ts_value: Chaîne de timestamp (format: 'YYYY-MM-DD HH:MM:SS.sss')
         
         Returns:
             Objet datetime
+        
+        Raises:
+            DataTransformationError: Si la valeur est absente ou non reconnue
         """
         if not ts_value or not isinstance(ts_value, str):
-            return datetime.now()
+            raise DataTransformationError("Timestamp absent (horodatage de l'événement obligatoire)")
         
-        try:
-            # Format ISO avec T
-            if "T" in ts_value:
-                return datetime.fromisoformat(ts_value.replace("Z", "+00:00"))
-            # Format 'YYYY-MM-DD HH:MM:SS.sss'
-            else:
-                # Remplacer l'espace par T pour fromisoformat
-                return datetime.fromisoformat(ts_value.replace(" ", "T"))
-        except (ValueError, AttributeError) as e:
-            logger.warning(f"Impossible de parser le timestamp '{ts_value}': {e}")
-            return datetime.now()
+        parsed = self.timestamp_parser.parse(ts_value)
+        if parsed is None:
+            raise DataTransformationError(f"Timestamp non reconnu: {ts_value!r}")
+        return parsed
     
     def _parse_comment(self, comment_value: Any) -> str:
         """
@@ -1,44 +1,178 @@
 """
 Validateur spécifique au module IDPS
 """
-from typing import List, Dict, Any, Optional
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
 
 from middleware.idps.domain_interfaces import IModuleValidator
+from middleware.idps.models.constraint_validation_result import (
+    ConstraintValidationResult, RejectedRow, SOURCE_FIELDS
+)
 from middleware.idps.models.file_info import IDPSFileInfo
+from middleware.idps.transformer import IDPSTransformer, IDPSColumnPlan
+from middleware.utils.logger import RowIssueAggregator
+
+logger = logging.getLogger(__name__)
 
 
 class IDPSValidator(IModuleValidator):
-    """Validateur spécifique pour les fichiers IDPS"""
-    
+    """
+    Validateur spécifique pour les fichiers IDPS
+
+    Le schéma est validé sur l'en-tête (une fois par en-tête distinct) : les lignes
+    proviennent d'un même DataFrame et partagent toutes les mêmes colonnes. Les
+    valeurs des colonnes obligatoires sont contrôlées colonne par colonne : les
+    lignes dont une valeur est absente ou vide sont rejetées (`reject_missing_values`).
+    """
+
+    # Colonnes alimentant les champs obligatoires (non nullables) des modèles
+    WORKFLOW_REQUIRED_COLUMNS = ['Timestamp', 'Type de document', 'Code de destination', 'Request ID']
+    ERROR_REQUIRED_COLUMNS = WORKFLOW_REQUIRED_COLUMNS + ['Service']
+
     # Colonnes obligatoires selon le type de fichier
     REQUIRED_COLUMNS = {
-        'WO-BACKLOG': [],  # TODO: Définir les colonnes obligatoires
-        'WO-FINISH': [],
-        'QC-ERROR': [],
-        'PERSO-ERROR': [],
-        'SUP-ERROR': []
+        'WO-BACKLOG': WORKFLOW_REQUIRED_COLUMNS,
+        'WO-FINISH': WORKFLOW_REQUIRED_COLUMNS,
+        'QC-ERROR': ERROR_REQUIRED_COLUMNS,
+        'PERSO-ERROR': ERROR_REQUIRED_COLUMNS,
+        'SUP-ERROR': ERROR_REQUIRED_COLUMNS
     }
-    
+
+    # Nombre maximal d'en-têtes validés conservés
+    _MAX_VALIDATED_HEADERS = 32
+
+    def __init__(self):
+        """Initialise le validateur IDPS"""
+        # (type de fichier, en-tête) -> (message d'erreur ou None, colonne lue par colonne obligatoire)
+        self._header_results: Dict[Tuple[str, Tuple[Any, ...]], Tuple[Optional[str], Dict[str, str]]] = {}
+
     def validate_schema(self, data: List[Dict[str, Any]], file_info: IDPSFileInfo) -> Optional[str]:
         """Valide le schéma des données selon les règles IDPS"""
         if not data:
             return "Aucune donnée à valider"
-        
-        file_type = file_info.file_type
-        
-        # Validation basique: vérifier que toutes les lignes ont le même nombre de colonnes
-        first_row_keys = set(data[0].keys())
-        for i, row in enumerate(data[1:], start=2):
-            row_keys = set(row.keys())
-            if row_keys != first_row_keys:
-                return f"Ligne {i}: nombre de colonnes incohérent"
-        
-        # Validation spécifique selon le type de fichier
-        required_cols = self.REQUIRED_COLUMNS.get(file_type, [])
-        if required_cols:
-            missing_cols = [col for col in required_cols if col not in first_row_keys]
-            if missing_cols:
-                return f"Colonnes manquantes pour {file_type}: {', '.join(missing_cols)}"
-        
-        return None
 
+        header = tuple(key for key in data[0] if key not in SOURCE_FIELDS)
+        return self.validate_header(header, file_info.file_type)
+
+    def validate_header(self, header: Tuple[Any, ...], file_type: str) -> Optional[str]:
+        """
+        Valide l'en-tête d'un fichier (résultat mis en cache par en-tête)
+
+        Une colonne obligatoire est présente si l'une des variantes de nom acceptées
+        par `IDPSTransformer` figure dans l'en-tête.
+
+        Args:
+            header: Noms des colonnes CSV, dans l'ordre du fichier
+            file_type: Type de fichier IDPS
+
+        Returns:
+            Message d'erreur ou None si l'en-tête est valide
+        """
+        return self._header_result(header, file_type)[0]
+
+    def reject_missing_values(self, data: List[Dict[str, Any]], file_info: IDPSFileInfo) -> ConstraintValidationResult:
+        """
+        Écarte les lignes dont une colonne obligatoire est absente ou vide
+
+        Chaque colonne obligatoire est testée d'un bloc, dans la variante de son nom
+        que lira `IDPSColumnPlan` (la première présente par ordre de priorité).
+
+        Args:
+            data: Lignes CSV d'un même en-tête (schéma déjà validé)
+            file_info: Informations sur le fichier
+
+        Returns:
+            ConstraintValidationResult (lignes complètes, dans leur ordre, et lignes rejetées)
+        """
+        if not data:
+            return ConstraintValidationResult(valid_data=data)
+
+        header = tuple(key for key in data[0] if key not in SOURCE_FIELDS)
+        error, required_columns = self._header_result(header, file_info.file_type)
+        if error:
+            return ConstraintValidationResult(valid_data=data)
+
+        missing: Dict[str, np.ndarray] = {}
+        for col, name in required_columns.items():
+            mask = self._blank_mask([row.get(name) for row in data])
+            if mask.any():
+                missing[col] = mask
+
+        if not missing:
+            return ConstraintValidationResult(valid_data=data)
+
+        invalid = np.logical_or.reduce(list(missing.values()))
+        row_issues = RowIssueAggregator(logger)
+        rejected_rows = []
+        for index in np.flatnonzero(invalid):
+            row = data[index]
+            reason = '; '.join(
+                f"{col}: valeur obligatoire manquante" for col, mask in missing.items() if mask[index]
+            )
+            line_number = row.get('_line_number')
+            row_issues.record(line_number, reason)
+            rejected_rows.append(RejectedRow(line_number, reason, row, row.get('_raw_line')))
+        row_issues.log_summary(f"les colonnes obligatoires de {file_info.name}")
+
+        valid_data = [row for row, is_invalid in zip(data, invalid.tolist()) if not is_invalid]
+        logger.warning(
+            f"{len(rejected_rows)} ligne(s) rejetée(s) sur {len(data)} (valeurs obligatoires manquantes)"
+        )
+        return ConstraintValidationResult(valid_data=valid_data, rejected_rows=rejected_rows)
+
+    def _header_result(
+        self,
+        header: Tuple[Any, ...],
+        file_type: str
+    ) -> Tuple[Optional[str], Dict[str, str]]:
+        """Résultat de la validation d'un en-tête, mis en cache par (type de fichier, en-tête)"""
+        key = (file_type, header)
+        result = self._header_results.get(key)
+        if result is None:
+            if len(self._header_results) >= self._MAX_VALIDATED_HEADERS:
+                self._header_results.clear()
+            result = self._validate_header(header, file_type)
+            self._header_results[key] = result
+        return result
+
+    def _validate_header(
+        self,
+        header: Tuple[Any, ...],
+        file_type: str
+    ) -> Tuple[Optional[str], Dict[str, str]]:
+        """Résout chaque colonne obligatoire en la variante de son nom lue par `IDPSColumnPlan`"""
+        present = set(header)
+        required_columns = {}
+        missing_cols = []
+        for col in self.REQUIRED_COLUMNS.get(file_type, []):
+            found = IDPSColumnPlan.resolve_column(present, self._column_variants(col))
+            if found is not None:
+                required_columns[col] = found
+            else:
+                missing_cols.append(col)
+
+        if missing_cols:
+            return f"Colonnes manquantes pour {file_type}: {', '.join(missing_cols)}", {}
+
+        logger.debug(f"En-tête validé pour {file_type}: {list(header)}")
+        return None, required_columns
+
+    @staticmethod
+    def _column_variants(column: str) -> Tuple[str, ...]:
+        """Variantes de nom acceptées pour une colonne (celles du champ de modèle correspondant)"""
+        for aliases in IDPSTransformer.ERROR_FIELD_ALIASES.values():
+            if column in aliases:
+                return aliases
+        return (column,)
+
+    @staticmethod
+    def _blank_mask(values: List[Any]) -> np.ndarray:
+        """Masque des valeurs absentes (None) ou ne contenant que des espaces, calculé sur la colonne entière"""
+        column = np.array(values, dtype=object)
+        blank = np.equal(column, None)
+        present = ~blank
+        if present.any():
+            blank[present] = np.char.strip(column[present].astype(str)) == ''
+        return blank
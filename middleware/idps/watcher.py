@@ -0,0 +1,214 @@
+"""
+Mode surveillance du micro-middleware IDPS
+
+Surveille le répertoire d'entrée et traite chaque fichier dès qu'il est complet
+(taille et date de modification stables), au lieu d'attendre l'exécution quotidienne.
+Utilise inotify via `watchdog` s'il est installé, sinon un scan périodique.
+"""
+import queue
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from middleware.idps.orchestrator import IDPSOrchestrator
+from middleware.utils.logger import setup_logger
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog est optionnel : repli sur le scan périodique
+    FileSystemEventHandler = object
+    Observer = None
+
+# Configuration du logger
+logger = setup_logger('idps_watcher')
+
+
+class _InputDirEventHandler(FileSystemEventHandler):
+    """Transmet les chemins des fichiers CSV créés/modifiés/déplacés à la file du watcher"""
+
+    def __init__(self, events: 'queue.Queue[Path]'):
+        super().__init__()
+        self.events = events
+
+    def _enqueue(self, path: str) -> None:
+        if path.endswith('.csv'):
+            self.events.put(Path(path))
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._enqueue(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._enqueue(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._enqueue(event.dest_path)
+
+
+class IDPSDirectoryWatcher:
+    """
+    Surveille le répertoire d'entrée IDPS et alimente l'orchestrateur au fil de l'eau
+
+    Un fichier n'est traité qu'après être resté inchangé (taille et mtime)
+    pendant `stability_seconds`, afin de ne pas lire un dépôt en cours.
+    """
+
+    def __init__(
+        self,
+        orchestrator: Optional[IDPSOrchestrator] = None,
+        poll_interval: Optional[float] = None,
+        stability_seconds: Optional[float] = None,
+        use_inotify: bool = True
+    ):
+        """
+        Initialise le watcher
+
+        Args:
+            orchestrator: Orchestrateur utilisé pour traiter les fichiers (créé si None)
+            poll_interval: Intervalle entre deux vérifications, en secondes (config si None)
+            stability_seconds: Durée sans modification avant traitement (config si None)
+            use_inotify: Utiliser les notifications système si `watchdog` est disponible
+        """
+        self.orchestrator = orchestrator or IDPSOrchestrator()
+        files_config = self.orchestrator.files_config
+        self.input_dir = files_config.input_dir
+        self.poll_interval = poll_interval if poll_interval is not None else files_config.watch_poll_interval
+        self.stability_seconds = (
+            stability_seconds if stability_seconds is not None else files_config.watch_stability_seconds
+        )
+        self.use_inotify = use_inotify and Observer is not None
+
+        # Fichiers candidats : chemin -> (taille, mtime, instant du dernier changement observé)
+        self._pending: Dict[Path, Tuple[int, float, float]] = {}
+        # États (chemin, taille, mtime) déjà écartés par la détection (déjà traités, etc.)
+        self._ignored: Set[Tuple[Path, int, float]] = set()
+        self._events: 'queue.Queue[Path]' = queue.Queue()
+        self._observer = None
+        self._running = False
+
+    def start(self) -> None:
+        """Démarre la surveillance (notifications système si disponibles) et recense les fichiers déjà présents"""
+        if self.use_inotify:
+            self._observer = Observer()
+            self._observer.schedule(_InputDirEventHandler(self._events), str(self.input_dir), recursive=False)
+            self._observer.start()
+            logger.info(f"Surveillance de {self.input_dir} par notifications système (vérification toutes les {self.poll_interval}s)")
+        else:
+            logger.info(f"Surveillance de {self.input_dir} par scan périodique (toutes les {self.poll_interval}s)")
+
+        # Fichiers déposés pendant l'arrêt du service
+        self._scan_input_dir()
+        self._running = True
+
+    def stop(self) -> None:
+        """Arrête la surveillance"""
+        self._running = False
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        logger.info("Surveillance IDPS arrêtée")
+
+    def run_forever(self) -> None:
+        """Boucle principale : traite les fichiers au fur et à mesure qu'ils deviennent stables"""
+        self.start()
+        try:
+            while self._running:
+                self.poll_once()
+                time.sleep(self.poll_interval)
+        finally:
+            self.stop()
+
+    def poll_once(self) -> int:
+        """
+        Effectue une itération de surveillance
+
+        Returns:
+            Nombre de fichiers traités lors de cette itération
+        """
+        if self.use_inotify:
+            self._drain_events()
+        else:
+            self._scan_input_dir()
+
+        processed = 0
+        for file_path, size, mtime in self._collect_stable_files():
+            file_info = self.orchestrator.file_detection_service.detect_file(file_path)
+            if file_info is None:
+                self._ignored.add((file_path, size, mtime))
+                continue
+            result = self.orchestrator.process_file(file_info)
+            processed += 1
+            logger.info(
+                f"Fichier traité en mode surveillance: {file_path.name} "
+                f"({result.status}, {result.rows_inserted} lignes insérées)"
+            )
+        return processed
+
+    def _scan_input_dir(self) -> None:
+        """Ajoute les fichiers CSV présents dans le répertoire d'entrée aux candidats"""
+        for file_path in self.input_dir.glob('*.csv'):
+            self._track(file_path)
+
+    def _drain_events(self) -> None:
+        """Ajoute aux candidats les fichiers signalés par les notifications système"""
+        while True:
+            try:
+                file_path = self._events.get_nowait()
+            except queue.Empty:
+                return
+            self._track(file_path)
+
+    def _track(self, file_path: Path) -> None:
+        """Enregistre (ou met à jour) l'état observé d'un fichier candidat"""
+        if not self.orchestrator.file_detection_service.pattern_matcher.matches(file_path.name):
+            return
+
+        try:
+            stat = file_path.stat()
+        except OSError:
+            self._pending.pop(file_path, None)
+            return
+
+        if (file_path, stat.st_size, stat.st_mtime) in self._ignored:
+            return
+
+        previous = self._pending.get(file_path)
+        if previous is None or previous[:2] != (stat.st_size, stat.st_mtime):
+            self._pending[file_path] = (stat.st_size, stat.st_mtime, time.monotonic())
+
+    def _collect_stable_files(self) -> List[Tuple[Path, int, float]]:
+        """Retourne (et retire des candidats) les fichiers inchangés depuis `stability_seconds`"""
+        now = time.monotonic()
+        stable = []
+        for file_path, (size, mtime, changed_at) in list(self._pending.items()):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                # Fichier déplacé ou supprimé entre-temps
+                del self._pending[file_path]
+                continue
+
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                self._pending[file_path] = (stat.st_size, stat.st_mtime, now)
+            elif now - changed_at >= self.stability_seconds:
+                del self._pending[file_path]
+                stable.append((file_path, size, mtime))
+        return sorted(stable)
+
+
+def main():
+    """Point d'entrée du mode surveillance IDPS"""
+    watcher = IDPSDirectoryWatcher()
+    logger.info("Le watcher IDPS est en cours d'exécution. Appuyez sur Ctrl+C pour arrêter.")
+    try:
+        watcher.run_forever()
+    except KeyboardInterrupt:
+        logger.info("Arrêt du watcher IDPS demandé par l'utilisateur")
+
+
+if __name__ == '__main__':
+    main()
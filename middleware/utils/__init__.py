@@ -1,6 +1,6 @@
 """
 Utilitaires pour le middleware
 """
-from middleware.utils.logger import setup_logger
+from middleware.utils.logger import setup_logger, HotPathLogger, RowIssueAggregator
 
-__all__ = ['setup_logger']
+__all__ = ['setup_logger', 'HotPathLogger', 'RowIssueAggregator']
@@ -1,19 +1,145 @@
 """
 Configuration centralisée du logger
+
+Par défaut les handlers (console et fichier sous `logs/`) sont synchrones.
+Avec `LOG_ASYNC=true`, les messages passent par une file traitée par un thread
+dédié (QueueHandler/QueueListener) : l'appelant ne bloque plus sur les E/S, les
+flux sont vidés une fois par lot et la file est vidée à la sortie du processus.
+`LOG_FORMAT=json` produit une ligne JSON par message.
 """
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Listeners des loggers asynchrones, arrêtés (file vidée) à la sortie du processus
+_queue_listeners: List[QueueListener] = []
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Lit un booléen depuis l'environnement ('1', 'true', 'yes')"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes')
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Formate chaque message en une ligne JSON (logs structurés)"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _BatchFlushMixin:
+    """Handler dont le vidage du flux est différé : le listener le vide une fois par lot"""
+    
+    def flush(self) -> None:
+        pass
+    
+    def flush_batch(self) -> None:
+        super().flush()
+
+
+class _BatchStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    pass
+
 
+class _BatchFileHandler(_BatchFlushMixin, logging.FileHandler):
+    pass
 
-def setup_logger(name: str, log_level: int = logging.INFO) -> logging.Logger:
+
+class _ThreadQueueHandler(QueueHandler):
+    """
+    QueueHandler pour une file consommée dans le même processus
+    
+    Seul le message est figé dans le thread appelant (ses arguments peuvent être
+    modifiés ensuite) ; horodatage, traceback et mise en forme sont produits par
+    le thread du listener. Pas de copie ni de sérialisation de l'enregistrement.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    QueueListener traitant les messages par lots
+    
+    Les messages déjà en file (jusqu'à `batch_size`) sont écrits d'un coup, puis
+    chaque flux n'est vidé qu'une fois : aucune attente n'est ajoutée quand la
+    file est vide, et les rafales de messages coûtent un seul vidage.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, batch_size: int = 100):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = max(1, batch_size)
+    
+    def _monitor(self) -> None:
+        log_queue = self.queue
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size and batch[-1] is not self._sentinel:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            for record in batch:
+                if record is not self._sentinel:
+                    self.handle(record)
+            for handler in self.handlers:
+                getattr(handler, 'flush_batch', handler.flush)()
+            for _ in batch:
+                log_queue.task_done()
+            
+            if batch[-1] is self._sentinel:
+                break
+
+
+def _stop_queue_listeners() -> None:
+    """Vide les files des loggers asynchrones et arrête leurs threads"""
+    while _queue_listeners:
+        listener = _queue_listeners.pop()
+        if listener._thread is not None:
+            listener.stop()
+
+
+atexit.register(_stop_queue_listeners)
+
+
+def setup_logger(
+    name: str,
+    log_level: int = logging.INFO,
+    async_logging: Optional[bool] = None,
+    json_format: Optional[bool] = None,
+    batch_size: Optional[int] = None
+) -> logging.Logger:
     """
     Configure et retourne un logger
     
     Args:
         name: Nom du logger
         log_level: Niveau de log (par défaut: INFO)
+        async_logging: Écrire via une file et un thread dédié (env LOG_ASYNC si None)
+        json_format: Une ligne JSON par message (env LOG_FORMAT=json si None)
+        batch_size: Nombre maximal de messages écrits par lot en mode asynchrone (env LOG_BATCH_SIZE si None)
     
     Returns:
         Logger configuré
@@ -26,30 +152,146 @@ def setup_logger(name: str, log_level: int = logging.INFO) -> logging.Logger:
     
     logger.setLevel(log_level)
     
+    if async_logging is None:
+        async_logging = _env_flag('LOG_ASYNC')
+    if json_format is None:
+        json_format = os.getenv('LOG_FORMAT', 'text').strip().lower() == 'json'
+    if batch_size is None:
+        batch_size = int(os.getenv('LOG_BATCH_SIZE', 100))
+    
     # Format des logs
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    if json_format:
+        formatter = JsonLineFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+    
+    # En mode asynchrone, les flux sont vidés par lot par le listener
+    stream_handler_class = _BatchStreamHandler if async_logging else logging.StreamHandler
+    file_handler_class = _BatchFileHandler if async_logging else logging.FileHandler
     
     # Handler pour la console
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = stream_handler_class(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # Handler pour le fichier (optionnel)
+    file_handler_error = None
     try:
         log_dir = Path('logs')
         log_dir.mkdir(exist_ok=True)
         
         log_file = log_dir / f"{name}_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler = file_handler_class(log_file, encoding='utf-8')
         file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
     except Exception as e:
+        file_handler_error = e
+    
+    if async_logging:
+        log_queue = queue.Queue(-1)
+        listener = BatchingQueueListener(log_queue, *handlers, batch_size=batch_size)
+        listener.start()
+        _queue_listeners.append(listener)
+        logger.addHandler(_ThreadQueueHandler(log_queue))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+    
+    if file_handler_error is not None:
         # Si on ne peut pas créer le fichier de log, continuer sans
-        logger.warning(f"Impossible de créer le fichier de log: {e}")
+        logger.warning(f"Impossible de créer le fichier de log: {file_handler_error}")
     
     return logger
+
+
+class HotPathLogger:
+    """
+    Journalisation dans les boucles par ligne (mapping, parsing)
+    
+    Le niveau est vérifié avant tout formatage et les arguments ne sont formatés
+    (style %) que pour les messages réellement émis ; en DEBUG, seul un appel
+    sur `sample_every` est journalisé.
+    """
+    
+    def __init__(self, logger: logging.Logger, sample_every: int = 1000):
+        """
+        Args:
+            logger: Logger sous-jacent
+            sample_every: Un message DEBUG émis tous les `sample_every` appels
+        """
+        self.logger = logger
+        self.sample_every = max(1, sample_every)
+        self._debug_calls = 0
+    
+    def debug(self, msg: str, *args: Any) -> None:
+        """Message DEBUG échantillonné (formatage différé)"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        self._debug_calls += 1
+        if (self._debug_calls - 1) % self.sample_every == 0:
+            self.logger.debug(msg, *args)
+
+
+class RowIssueAggregator:
+    """
+    Agrège les anomalies par ligne d'un fichier au lieu de les journaliser une à une
+    
+    Seules les `max_logged` premières anomalies sont journalisées individuellement
+    et seules les `max_samples` premières sont conservées ; les suivantes sont
+    uniquement comptées (par type). `log_summary` émet un message unique par fichier.
+    """
+    
+    def __init__(
+        self,
+        logger: logging.Logger,
+        level: int = logging.WARNING,
+        max_logged: int = 10,
+        max_samples: int = 100
+    ):
+        """
+        Args:
+            logger: Logger sous-jacent
+            level: Niveau des messages individuels et du résumé
+            max_logged: Nombre maximal d'anomalies journalisées individuellement
+            max_samples: Nombre maximal d'anomalies conservées dans `samples`
+        """
+        self.logger = logger
+        self.level = level
+        self.max_logged = max_logged
+        self.max_samples = max_samples
+        self.count = 0
+        self.samples: List[str] = []
+        self.counts_by_type: Dict[str, int] = {}
+    
+    def record(self, line_number: Any, error: Any) -> None:
+        """
+        Enregistre une anomalie sur une ligne
+        
+        Args:
+            line_number: Numéro de ligne dans le fichier source
+            error: Exception ou description de l'anomalie
+        """
+        self.count += 1
+        error_type = type(error).__name__ if isinstance(error, BaseException) else 'anomalie'
+        self.counts_by_type[error_type] = self.counts_by_type.get(error_type, 0) + 1
+        
+        if self.count <= self.max_samples:
+            self.samples.append(f"Ligne {line_number}: {error}")
+        if self.count <= self.max_logged and self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "Ligne %s: %s", line_number, error)
+    
+    def log_summary(self, context: str) -> None:
+        """Journalise le total des anomalies (si certaines n'ont pas été journalisées individuellement)"""
+        if self.count <= self.max_logged:
+            return
+        by_type = ', '.join(f"{error_type}: {count}" for error_type, count in sorted(self.counts_by_type.items()))
+        self.logger.log(
+            self.level,
+            "%d ligne(s) en anomalie pour %s (%d journalisée(s) individuellement) - %s",
+            self.count, context, self.max_logged, by_type
+        )